@@ -1,52 +1,275 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
 from transformers import AutoTokenizer, AutoModelForSequenceClassification, AutoConfig
 from bertopic import BERTopic
 import torch
 import torch.nn.functional as F
 from safetensors.torch import load_file
+from tokenization import MODES, padding_stats, predict_logits
+from metrics import (MODEL_BATCH_SIZE, CACHE_LOOKUPS, DOCUMENTS, MODEL_LOAD_SECONDS, TRIAGE, call_profiled,
+                     observe_request, render, stage)
+from triage import HashedNgramClassifier
+from topic_updates import TopicUpdater
+from rollups import RollupStore, analytics_params
+from registry import KINDS, ModelRegistry, ModelSlot, RegistryWatcher, Shadow
+from artifacts import load_embeddings, load_rep_docs
+from near_dup import NearDuplicateIndex
 import json
-import pickle
+import os
+import time
 
 app = Flask(__name__)
 CORS(app)
 
-# Load models at startup
-try:
-    print("🔄 Loading models...")
+# "chunk" scores long reviews window by window instead of cutting them at 512 tokens
+LONG_TEXT_MODE = os.environ.get("LONG_TEXT_MODE", "chunk")
+if LONG_TEXT_MODE not in MODES:
+    raise RuntimeError(f"❌ LONG_TEXT_MODE must be one of {MODES}")
+
+# "triage" lets the distilled n-gram student (triage.py) answer the reviews it is
+# confident about and only runs DistilBERT on the rest; "distilbert" runs it on all
+CLASSIFIER_TIER = os.environ.get("CLASSIFIER_TIER", "distilbert")
+if CLASSIFIER_TIER not in ("distilbert", "triage"):
+    raise RuntimeError("❌ CLASSIFIER_TIER must be 'distilbert' or 'triage'")
 
-    # Classification model
-    model_weights_path = './models/classification/finalReviewClassifier.safetensors'
-    config_path = './models/classification/finalReviewClassifierConfig.json'
+# "queue" records reviews no topic claims for topic_updates.py; "auto" also folds
+# them into the topic model in the background as they pile up
+TOPIC_UPDATES = os.environ.get("TOPIC_UPDATES", "off")
+if TOPIC_UPDATES not in ("off", "queue", "auto"):
+    raise RuntimeError("❌ TOPIC_UPDATES must be 'off', 'queue' or 'auto'")
 
-    with open(config_path, 'r') as f:
+# Sample reviews run through a newly loaded model version before it serves traffic
+WARMUP_TEXTS = [
+    "The course was great and the teacher explained everything clearly.",
+    "Registration was a mess and nobody answered our emails for weeks.",
+]
+
+
+def load_classifier(path, role="serve"):
+    with open(os.path.join(path, 'finalReviewClassifierConfig.json'), 'r') as f:
         config_dict = json.load(f)
 
     config = AutoConfig.from_pretrained("distilbert-base-uncased", **config_dict)
-    classification_model = AutoModelForSequenceClassification.from_config(config)
-    classification_model.load_state_dict(load_file(model_weights_path))
+    model = AutoModelForSequenceClassification.from_config(config)
+    model.load_state_dict(load_file(os.path.join(path, 'finalReviewClassifier.safetensors')))
+    model.eval()
+    return model
+
+def load_topics(path, role="serve"):
+    labeling_model = BERTopic.load(os.path.join(path, "final"))
+    # Memory mapped, so workers and model versions share the pages (see artifacts.py)
+    rep_docs = load_rep_docs(path)
+    reduced_embeddings = load_embeddings(path)
+    # Topic assignment and the topic ID to label map; topic_updates.py publishes
+    # updated versions to the registry. A shadowed candidate never queues outliers.
+    return TopicUpdater(labeling_model, rep_docs, path, reduced_embeddings=reduced_embeddings,
+                        record_outliers=role == "serve" and TOPIC_UPDATES != "off", registry=registry)
+
+def warm_classifier(model):
+    with torch.inference_mode():
+        model(**tokenizer(WARMUP_TEXTS, padding=True, truncation=True, return_tensors="pt"))
 
+def warm_topics(topics):
+    topics.model.embedding_model.embed_documents(WARMUP_TEXTS)
+
+
+# Load models at startup
+try:
+    print("🔄 Loading models...")
+    registry = ModelRegistry()
     tokenizer = AutoTokenizer.from_pretrained("distilbert-base-uncased")
 
+    # Classification model, swappable through the model registry
+    start = time.perf_counter()
+    version = registry.current("classifier")
+    classifier_slot = ModelSlot("classifier", version, load_classifier(registry.path("classifier", version)),
+                                on_swap=lambda: clear_near_dups())
+    MODEL_LOAD_SECONDS.labels("classifier").set(time.perf_counter() - start)
+
+    # Distilled fast tier; the threshold defaults to the one picked at distillation
+    triage_model = None
+    triage_threshold = None
+    if CLASSIFIER_TIER == "triage":
+        triage_model = HashedNgramClassifier.load('./models/triage/student.npz')
+        triage_threshold = float(os.environ.get("TRIAGE_THRESHOLD", triage_model.threshold))
+
     # BERTopic model
-    labeling_model = BERTopic.load("./models/labeling/final")
-    with open('./models/labeling/rep_docs.pickle', 'rb') as handle:
-        rep_docs = pickle.load(handle)
-    with open('./models/labeling/reduced_embeddings.pickle', 'rb') as handle:
-        reduced_embeddings = pickle.load(handle)
-
-    # Topic ID to label map
-    id_to_label = {
-        tid: label for tid, label in zip(
-            labeling_model.topic_labels_.keys(), labeling_model.custom_labels_
-        )
-    }
+    start = time.perf_counter()
+    version = registry.current("topic")
+    topic_slot = ModelSlot("topic", version, load_topics(registry.path("topic", version)),
+                           on_swap=lambda: clear_near_dups())
+    MODEL_LOAD_SECONDS.labels("topic").set(time.perf_counter() - start)
+
+    shadows = {kind: Shadow(kind) for kind in KINDS}
+    watcher = RegistryWatcher(
+        registry,
+        {"classifier": classifier_slot, "topic": topic_slot},
+        {"classifier": load_classifier, "topic": load_topics},
+        {"classifier": warm_classifier, "topic": warm_topics},
+        shadows,
+    )
 
     print("✅ Models loaded successfully!")
 
 except Exception as e:
     raise RuntimeError(f"❌ Error loading models or data: {e}")
 
+rollups = RollupStore()
+
+
+def model_versions():
+    return f"{classifier_slot.version}/{topic_slot.version}/{CLASSIFIER_TIER}"
+
+near_dups = NearDuplicateIndex(version=model_versions())
+
+
+def clear_near_dups():
+    # After a model swap or topic update the stored labels may be stale
+    near_dups.clear(model_versions())
+
+def start_model_watcher():
+    # Called once the serving process runs (after the gunicorn fork), since
+    # threads started in the preloading master don't survive into the workers
+    watcher.start()
+
+
+# Inference helpers shared by the Flask routes and the ASGI app (asgi.py)
+def sentiment_probs(texts):
+    """Class probabilities per text, from the student where it is confident enough."""
+    probs = torch.empty(len(texts), 2)
+    escalate = list(range(len(texts)))
+    if triage_model is not None:
+        with stage("triage"):
+            positive = torch.from_numpy(triage_model.predict_proba(texts))
+        probs[:, 0], probs[:, 1] = 1 - positive, positive
+        escalate = (torch.maximum(positive, 1 - positive) < triage_threshold).nonzero().flatten().tolist()
+        TRIAGE.labels("student").inc(len(texts) - len(escalate))
+    if escalate:
+        escalated = [texts[i] for i in escalate]
+        with classifier_slot.use() as model:
+            start = time.perf_counter()
+            logits = predict_logits(model, tokenizer, escalated, mode=LONG_TEXT_MODE)
+            seconds = time.perf_counter() - start
+        probs[escalate] = F.softmax(logits, dim=-1)
+        TRIAGE.labels("distilbert").inc(len(escalate))
+        shadows["classifier"].maybe_run(shadow_classify, escalated, torch.argmax(logits, dim=-1).tolist(), seconds)
+    return probs
+
+def shadow_classify(model, texts):
+    return torch.argmax(predict_logits(model, tokenizer, texts, mode=LONG_TEXT_MODE), dim=-1).tolist()
+
+def shadow_topics(topics, texts):
+    return [topics.label(topic_id) for topic_id in topics.assign(texts)]
+
+def classifier_info():
+    return {"tier": CLASSIFIER_TIER, "triage_threshold": triage_threshold}
+
+def topic_info():
+    return dict(topic_slot.model.stats(), mode=TOPIC_UPDATES)
+
+def model_info():
+    return watcher.snapshot()
+
+def classify_text(text):
+    probs = sentiment_probs([text])
+    pred_id = torch.argmax(probs, dim=-1).item()
+    prediction = "positive" if pred_id else "negative"
+
+    return {
+        "text": text,
+        "prediction": prediction,
+        "probabilities": probs.tolist()
+    }
+
+def label_texts(texts, topics):
+    """
+    (sentiment id, topic id, near-duplicate flag) per review text, from the
+    near-duplicate index where possible.
+    """
+    results = [None] * len(texts)
+
+    # Close variants of reviews labeled before reuse their result
+    with stage("near_dup"):
+        reused, signatures = near_dups.lookup(texts)
+    CACHE_LOOKUPS.labels("near_dup", "hit").inc(sum(result is not None for result in reused))
+    for i, result in enumerate(reused):
+        if result is not None:
+            results[i] = result + (True,)
+    signatures = [signature for signature, result in zip(signatures, reused) if result is None]
+    misses = [i for i, result in enumerate(reused) if result is None]
+    CACHE_LOOKUPS.labels("near_dup", "miss").inc(len(misses))
+    if not misses:
+        return results
+    new_docs = [texts[i] for i in misses]
+
+    # Sentiment classification: student first when triaging, DistilBERT batched by length
+    pred_ids = torch.argmax(sentiment_probs(new_docs), dim=-1).tolist()
+
+    # Topic labeling, one embedding pass for the whole request
+    MODEL_BATCH_SIZE.labels("topic").observe(len(new_docs))
+    with stage("topic_assign"):
+        start = time.perf_counter()
+        topic_ids = topics.assign(new_docs)
+        seconds = time.perf_counter() - start
+    if TOPIC_UPDATES == "auto":
+        topics.maybe_update()
+    shadows["topic"].maybe_run(shadow_topics, new_docs, [topics.label(topic_id) for topic_id in topic_ids], seconds)
+
+    for i, pred_id, topic_id in zip(misses, pred_ids, topic_ids):
+        results[i] = (pred_id, int(topic_id), False)
+    near_dups.add(signatures, [result[:2] for result in (results[i] for i in misses)])
+    return results
+
+def label_documents(docs):
+    # Documents are review strings, or objects with the text plus the university
+    # (and optionally date and id) that the analytics rollups are kept by
+    texts = [doc.get("text", "") if isinstance(doc, dict) else doc for doc in docs]
+    # Ids and labels from the same topic model version, even across a swap
+    with topic_slot.use(with_version=True) as (topic_version, topics):
+        labels = label_texts(texts, topics)
+        topic_labels = [topics.label(topic_id) for _, topic_id, _ in labels]
+
+    # Stored with the version and label, since topic ids change meaning between versions
+    tracked = [
+        dict(doc, sentiment=pred_id, topic_version=topic_version, topic_id=topic_id, topic_label=topic_label)
+        for doc, (pred_id, topic_id, _), topic_label in zip(docs, labels, topic_labels)
+        if isinstance(doc, dict) and doc.get("university")
+    ]
+    if tracked:
+        with stage("rollups"):
+            try:
+                rollups.record(tracked)
+            except ValueError as e:
+                print(f"⚠️ Reviews not added to the rollups: {e}")
+
+    # Results with sentiment, topic label and whether they were reused from a near-duplicate
+    return [
+        {"sentiment": "positive" if pred_id else "negative", "topic_label": topic_label, "near_duplicate": near}
+        for (pred_id, _, near), topic_label in zip(labels, topic_labels)
+    ]
+
+def analytics_report(params):
+    """Rollup rows for the /analytics query params; raises ValueError on bad params."""
+    query = analytics_params(params)
+    rows = rollups.query(**query)
+    return {"start": query["start"], "end": query["end"], "group_by": query["group_by"], "rows": rows}
+
+def load_reviews_json():
+    json_file_path = './to_send_reviews.json'  # Specify your JSON file path here
+    with open(json_file_path, 'r') as json_file:
+        return json.load(json_file)
+
+
+@app.before_request
+def start_timer():
+    g.start = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    if "start" in g:
+        observe_request(request.endpoint or "other", response.status_code, time.perf_counter() - g.start)
+    return response
+
 
 @app.route("/classify", methods=["GET", "POST"])
 def classify():
@@ -56,20 +279,10 @@ def classify():
     if not text:
         return jsonify({"error": "Missing 'text' field"}), 400
 
-    inputs = tokenizer(text, return_tensors="pt")
-
-    with torch.no_grad():
-        outputs = classification_model(**inputs)
-        logits = outputs.logits
-        probs = F.softmax(logits, dim=-1)
-        pred_id = torch.argmax(probs, dim=-1).item()
-        prediction = "positive" if pred_id else "negative"
-
-    return jsonify({
-        "text": text,
-        "prediction": prediction,
-        "probabilities": probs.tolist()
-    })
+    DOCUMENTS.labels("classify").inc()
+    result = call_profiled("classify", classify_text, text)
+    with stage("serialize"):
+        return jsonify(result)
 
 @app.route("/", methods=["GET" , "POST"])
 def topic():
@@ -83,39 +296,40 @@ def label():
     if not isinstance(docs, list) or not docs:
         return jsonify({"error": "Missing or invalid 'documents' list"}), 400
 
-    results = []
-    for doc in docs:
-        # Sentiment classification
-        inputs = tokenizer(doc, return_tensors="pt")
-        with torch.no_grad():
-            outputs = classification_model(**inputs)
-            logits = outputs.logits
-            pred_id = torch.argmax(logits, dim=-1).item()
-            sentiment = "positive" if pred_id else "negative"
-
-        # Topic labeling
-        topic_array = labeling_model.transform([doc])
-        topic_id = topic_array[0].item()  # Get the first item
-        topic_label = id_to_label.get(topic_id, "Unknown Topic")
-
-        # Append results with only sentiment and topic label
-        results.append({
-            "sentiment": sentiment,
-            "topic_label": topic_label
-        })
-
-    return jsonify(results)
+    DOCUMENTS.labels("label").inc(len(docs))
+    results = call_profiled("label", label_documents, docs)
+    with stage("serialize"):
+        return jsonify(results)
+
+@app.route("/analytics", methods=["GET"])
+def analytics():
+    try:
+        report = analytics_report(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(report)
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    return jsonify({"tokenization": padding_stats.snapshot(), "classifier": classifier_info(), "topics": topic_info(),
+                    "rollups": rollups.totals(), "models": model_info(),
+                    "near_duplicates": near_dups.snapshot()})
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    body, content_type = render()
+    return Response(body, content_type=content_type)
 
 @app.route("/get_json", methods=["GET" , "POST"])
 def get_json():
-    json_file_path = './to_send_reviews.json'  # Specify your JSON file path here
     try:
-        with open(json_file_path, 'r') as json_file:
-            data = json.load(json_file)
-        return jsonify(data)
+        return jsonify(load_reviews_json())
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    # Development server only; the reloader would load every model twice.
+    # Production serving goes through asgi.py (see gunicorn.conf.py).
+    start_model_watcher()
+    app.run(host="0.0.0.0", port=5000, debug=True, use_reloader=False)
@@ -0,0 +1,171 @@
+"""
+Pickle-free storage for the topic model's side artifacts.
+
+    reduced_embeddings.npy          the 2D document projection, opened with mmap_mode="r"
+    rep_docs-<hash>.bin/.idx.npy    representative docs as one UTF-8 blob plus
+                                    an index of (topic, start, end) byte offsets
+    rep_docs.json                   names the blob and index pair to read
+
+The blob and index are named after their content and rep_docs.json is
+switched to a new pair in one os.replace, so a reader never pairs an index
+with another save's blob. Directories written before rep_docs.json are read
+from rep_docs.bin and rep_docs.idx.npy.
+
+Nothing is deserialized at load time: the arrays and the blob are memory
+mapped, so every worker (and every model version loaded by a hot swap)
+shares the same page-cache pages, and a doc is decoded only when read.
+np.load runs with allow_pickle=False, so a tampered file can't run code.
+
+The loaders never read pickles: a model directory that only has the old
+.pickle files is refused, and has to be converted offline first:
+
+    python artifacts.py ./models/labeling        # convert in place (keeps the pickles)
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import pickle
+from collections.abc import Mapping
+
+import numpy as np
+
+EMBEDDINGS_FILE = "reduced_embeddings.npy"
+REP_DOCS_MANIFEST = "rep_docs.json"
+REP_DOCS_BLOB = "rep_docs.bin"
+REP_DOCS_INDEX = "rep_docs.idx.npy"
+INDEX_DTYPE = np.dtype([("topic", "<i8"), ("start", "<i8"), ("end", "<i8")])
+
+
+def _replace(path, write):
+    tmp = path + ".tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def save_embeddings(directory, embeddings):
+    def write(tmp):
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(embeddings))
+    _replace(os.path.join(directory, EMBEDDINGS_FILE), write)
+
+
+def rep_docs_files(directory):
+    """{"blob": name, "index": name} of the representative docs in `directory`."""
+    path = os.path.join(directory, REP_DOCS_MANIFEST)
+    if not os.path.exists(path):
+        return {"blob": REP_DOCS_BLOB, "index": REP_DOCS_INDEX}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_rep_docs(directory, rep_docs):
+    """Write {topic: [doc, ...]} as the blob and its offset index, then point rep_docs.json at them."""
+    rows, chunks, offset = [], [], 0
+    for topic in sorted(rep_docs):
+        for doc in rep_docs[topic]:
+            data = doc.encode("utf-8")
+            rows.append((int(topic), offset, offset + len(data)))
+            chunks.append(data)
+            offset += len(data)
+    index = np.array(rows, dtype=INDEX_DTYPE)
+    digest = hashlib.sha1(index.tobytes())
+    for chunk in chunks:
+        digest.update(chunk)
+    name = f"rep_docs-{digest.hexdigest()[:16]}"
+    files = {"blob": name + ".bin", "index": name + ".idx.npy"}
+
+    def write_blob(tmp):
+        with open(tmp, "wb") as f:
+            f.writelines(chunks)
+
+    def write_index(tmp):
+        with open(tmp, "wb") as f:
+            np.save(f, index)
+
+    def write_manifest(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(files, f)
+
+    previous = rep_docs_files(directory)
+    _replace(os.path.join(directory, files["blob"]), write_blob)
+    _replace(os.path.join(directory, files["index"]), write_index)
+    _replace(os.path.join(directory, REP_DOCS_MANIFEST), write_manifest)
+    # Readers that already opened the old pair keep their open files
+    for old in set(previous.values()) - set(files.values()):
+        if os.path.exists(os.path.join(directory, old)):
+            os.remove(os.path.join(directory, old))
+
+
+class RepDocs(Mapping):
+    """Read-only {topic: [doc, ...]} backed by the memory-mapped blob."""
+
+    def __init__(self, directory):
+        files = rep_docs_files(directory)
+        self.index = np.load(os.path.join(directory, files["index"]), mmap_mode="r", allow_pickle=False)
+        with open(os.path.join(directory, files["blob"]), "rb") as f:
+            # mmap can't map an empty file
+            self.blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        topics = np.asarray(self.index["topic"])
+        # Rows are written sorted by topic, so each topic is one contiguous run
+        self.topics, self.first = np.unique(topics, return_index=True)
+        self.last = np.append(self.first[1:], len(topics))
+
+    def __getitem__(self, topic):
+        i = np.searchsorted(self.topics, topic)
+        if i == len(self.topics) or self.topics[i] != topic:
+            raise KeyError(topic)
+        rows = self.index[self.first[i]:self.last[i]]
+        return [self.blob[start:end].decode("utf-8") for start, end in zip(rows["start"], rows["end"])]
+
+    def __iter__(self):
+        return (int(topic) for topic in self.topics)
+
+    def __len__(self):
+        return len(self.topics)
+
+
+def _missing(directory, name):
+    return FileNotFoundError(f"{directory} has no {name}; if it holds the old pickles, convert them "
+                             f"offline with: python artifacts.py {directory}")
+
+
+def load_embeddings(directory):
+    path = os.path.join(directory, EMBEDDINGS_FILE)
+    if not os.path.exists(path):
+        raise _missing(directory, EMBEDDINGS_FILE)
+    return np.load(path, mmap_mode="r", allow_pickle=False)
+
+
+def load_rep_docs(directory):
+    index = rep_docs_files(directory)["index"]
+    if not os.path.exists(os.path.join(directory, index)):
+        raise _missing(directory, index)
+    return RepDocs(directory)
+
+
+def convert(directory, remove=False):
+    """Write the .npy/blob files next to the pickles of a topic model directory."""
+    for name, save in (("reduced_embeddings.pickle", save_embeddings), ("rep_docs.pickle", save_rep_docs)):
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as handle:
+            save(directory, pickle.load(handle))
+        if remove:
+            os.remove(path)
+        print(f"✅ Converted {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a topic model directory's pickles to mmap-able files")
+    parser.add_argument("directories", nargs="+", help="directories holding rep_docs.pickle / reduced_embeddings.pickle")
+    parser.add_argument("--remove", action="store_true", help="delete the pickles once converted")
+    args = parser.parse_args()
+    for directory in args.directories:
+        convert(directory, args.remove)
+
+
+if __name__ == "__main__":
+    main()
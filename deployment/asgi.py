@@ -0,0 +1,201 @@
+"""
+Production ASGI entry point for the review service.
+
+Keeps the routes and payloads of app.py but serves them from async
+handlers. Model work runs on a fixed-size thread pool, so a slow /label no
+longer blocks other requests, and requests beyond the queue limit get a 503
+instead of piling up.
+
+    gunicorn -c gunicorn.conf.py asgi:app
+    uvicorn asgi:app --port 5000          # single process
+"""
+import asyncio
+import gc
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import torch
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+from metrics import DOCUMENTS, call_profiled, observe_request, render, stage
+
+# Inference threads per worker process, and torch intra-op threads per inference
+# thread. Keep INFERENCE_THREADS * TORCH_THREADS * workers <= CPU cores.
+INFERENCE_THREADS = int(os.environ.get("INFERENCE_THREADS", 2))
+TORCH_THREADS = int(os.environ.get("TORCH_THREADS", max(1, (os.cpu_count() or 1) // INFERENCE_THREADS)))
+# Requests allowed to wait for (or hold) an inference thread before we answer 503
+MAX_PENDING = int(os.environ.get("MAX_PENDING", 32))
+
+torch.set_num_threads(TORCH_THREADS)
+
+# Loads the models. Under gunicorn --preload this happens once in the master
+# and the forked workers share the weights copy-on-write.
+import app as service  # noqa: E402
+
+# Keep the loaded objects out of the cyclic GC so collections in the workers
+# don't touch (and un-share) their pages.
+gc.freeze()
+
+
+class ServerBusy(Exception):
+    pass
+
+
+class InferenceExecutor:
+    """Thread pool with a bound on queued work; `run` raises ServerBusy when full."""
+
+    def __init__(self, threads=INFERENCE_THREADS, max_pending=MAX_PENDING):
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="inference")
+        self.max_pending = max_pending
+        self.pending = 0  # only touched from the event loop thread
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise ServerBusy()
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+        finally:
+            self.pending -= 1
+
+
+executor = InferenceExecutor()
+
+
+class RequestMetrics:
+    """ASGI middleware recording request counts and latency per route."""
+
+    def __init__(self, app, endpoints):
+        self.app = app
+        self.endpoints = endpoints
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            endpoint = self.endpoints.get(scope["path"], "other")
+            observe_request(endpoint, status, time.perf_counter() - start)
+
+
+async def _json_body(request):
+    try:
+        data = await request.json()
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+async def classify(request):
+    data = await _json_body(request)
+    if data is None:
+        return JSONResponse({"error": "Invalid JSON body"}, status_code=400)
+    text = data.get("text", "")
+
+    if not text:
+        return JSONResponse({"error": "Missing 'text' field"}, status_code=400)
+
+    DOCUMENTS.labels("classify").inc()
+    result = await executor.run(call_profiled, "classify", service.classify_text, text)
+    with stage("serialize"):
+        return JSONResponse(result)
+
+
+async def topic(request):
+    return PlainTextResponse("hello world")
+
+
+async def label(request):
+    data = await _json_body(request)
+    if data is None:
+        return JSONResponse({"error": "Invalid JSON body"}, status_code=400)
+    docs = data.get("documents", [])
+
+    if not isinstance(docs, list) or not docs:
+        return JSONResponse({"error": "Missing or invalid 'documents' list"}, status_code=400)
+
+    DOCUMENTS.labels("label").inc(len(docs))
+    results = await executor.run(call_profiled, "label", service.label_documents, docs)
+    with stage("serialize"):
+        return JSONResponse(results)
+
+
+async def analytics(request):
+    try:
+        report = await asyncio.to_thread(service.analytics_report, request.query_params)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return JSONResponse(report)
+
+
+async def stats(request):
+    return JSONResponse({
+        "tokenization": service.padding_stats.snapshot(),
+        "classifier": service.classifier_info(),
+        "topics": service.topic_info(),
+        "rollups": service.rollups.totals(),
+        "models": service.model_info(),
+        "near_duplicates": service.near_dups.snapshot(),
+        "executor": {"pending": executor.pending, "max_pending": executor.max_pending},
+    })
+
+
+async def metrics(request):
+    body, content_type = render()
+    return Response(body, media_type=content_type)
+
+
+async def get_json(request):
+    try:
+        return JSONResponse(await asyncio.to_thread(service.load_reviews_json))
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+async def server_busy(request, exc):
+    return JSONResponse({"error": "Server busy, retry later"}, status_code=503,
+                        headers={"Retry-After": "1"})
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Runs in each worker after the fork, unlike the module-level model loading
+    service.start_model_watcher()
+    yield
+
+
+routes = [
+    Route("/classify", classify, methods=["GET", "POST"]),
+    Route("/", topic, methods=["GET", "POST"]),
+    Route("/label", label, methods=["GET", "POST"]),
+    Route("/analytics", analytics, methods=["GET"]),
+    Route("/stats", stats, methods=["GET"]),
+    Route("/metrics", metrics, methods=["GET"]),
+    Route("/get_json", get_json, methods=["GET", "POST"]),
+]
+
+app = Starlette(
+    routes=routes,
+    middleware=[
+        Middleware(RequestMetrics, endpoints={route.path: route.name for route in routes}),
+        Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]),
+    ],
+    exception_handlers={ServerBusy: server_busy},
+    lifespan=lifespan,
+)
@@ -0,0 +1,44 @@
+# gunicorn -c gunicorn.conf.py asgi:app
+import os
+import shutil
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_WORKERS", 2))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import asgi.py (and load every model) once in the master before forking,
+# so the workers share the weights instead of each loading its own copy.
+preload_app = True
+
+# Model loading and long /label batches can take a while
+timeout = int(os.environ.get("WORKER_TIMEOUT", 120))
+graceful_timeout = 30
+
+# Workers write their metrics to files here and /metrics sums them (metrics.py).
+# Set before the app is preloaded, and emptied so a restart doesn't add the last run's counts.
+multiproc_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "./metrics-multiproc")
+shutil.rmtree(multiproc_dir, ignore_errors=True)
+os.makedirs(multiproc_dir)
+
+
+def post_fork(server, worker):
+    # Split the cores between workers; asgi.py sized torch for a single process
+    import torch
+    from asgi import INFERENCE_THREADS
+
+    cores = os.cpu_count() or 1
+    threads = int(os.environ.get("TORCH_THREADS", max(1, cores // (workers * INFERENCE_THREADS))))
+    torch.set_num_threads(threads)
+
+
+def when_ready(server):
+    # The master served nothing; drop its live gauges (the versions it preloaded)
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(os.getpid())
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
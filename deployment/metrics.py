@@ -0,0 +1,110 @@
+"""
+Prometheus metrics for the review service, exposed on /metrics.
+
+Under gunicorn (see gunicorn.conf.py) PROMETHEUS_MULTIPROC_DIR is set and
+every worker writes its values to files there; /metrics, whichever worker
+answers it, reports the counters and histograms summed over all workers.
+Process metrics (CPU, RSS) are only exported by a single-process server.
+"""
+import cProfile
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+                               multiprocess)
+
+# Sampled profiling: profile PROFILE_SAMPLE_RATE of inference calls and keep
+# the cProfile dump of those slower than PROFILE_SLOW_MS.
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+PROFILE_SLOW_MS = float(os.environ.get("PROFILE_SLOW_MS", 1000))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "./profiles")
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUESTS = Counter("review_requests_total", "HTTP requests", ["endpoint", "status"])
+REQUEST_LATENCY = Histogram("review_request_seconds", "End-to-end request latency",
+                            ["endpoint"], buckets=LATENCY_BUCKETS)
+STAGE_LATENCY = Histogram("review_stage_seconds",
+                          "Latency per inference stage (tokenize, classify, topic_assign, serialize)",
+                          ["stage"], buckets=LATENCY_BUCKETS)
+DOCUMENTS = Counter("review_documents_total", "Documents received", ["endpoint"])
+MODEL_BATCH_SIZE = Histogram("review_batch_size", "Documents per model batch", ["model"],
+                             buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+CACHE_LOOKUPS = Counter("review_cache_lookups_total", "Result cache lookups", ["cache", "result"])
+# Gauges say how values from several workers combine: the latest load, the
+# version any live worker serves, and padding waste per live worker
+MODEL_LOAD_SECONDS = Gauge("review_model_load_seconds", "Time taken to load each model", ["model"],
+                           multiprocess_mode="mostrecent")
+TOKENS = Counter("review_tokens", "Tokens fed to the classifier", ["kind"])
+TRIAGE = Counter("review_triage_total", "Reviews scored per classifier tier", ["tier"])
+PADDING_WASTE = Gauge("review_padding_waste_ratio", "Share of classifier tokens that are padding",
+                      multiprocess_mode="liveall")
+MODEL_VERSION = Gauge("review_model_version", "1 for the model version being served", ["model", "version"],
+                      multiprocess_mode="livemax")
+SHADOW_LATENCY = Histogram("review_shadow_seconds", "Model latency on shadowed requests, served vs candidate",
+                           ["model", "role"], buckets=LATENCY_BUCKETS)
+SHADOW_DOCUMENTS = Counter("review_shadow_documents_total", "Shadowed documents by agreement with the served model",
+                           ["model", "result"])
+PROFILES = Counter("review_slow_profiles_total", "cProfile dumps written for slow requests", ["endpoint"])
+
+
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(name).observe(time.perf_counter() - start)
+
+
+def observe_padding(lengths, waste):
+    """Tokens of one padded batch, and the process's padding waste so far."""
+    TOKENS.labels("real").inc(sum(lengths))
+    TOKENS.labels("padded").inc(max(lengths) * len(lengths))
+    PADDING_WASTE.set(waste)
+
+
+def observe_request(endpoint, status, seconds):
+    REQUESTS.labels(endpoint, str(status)).inc()
+    REQUEST_LATENCY.labels(endpoint).observe(seconds)
+
+
+_profile_lock = threading.Lock()
+
+
+def call_profiled(endpoint, fn, *args):
+    """
+    Run `fn(*args)`, profiling a sample of calls in the current thread and
+    dumping the stats of slow ones to PROFILE_DIR (view with snakeviz/pstats).
+    """
+    # Only one profiler can be active per interpreter
+    if PROFILE_SAMPLE_RATE <= 0 or random.random() >= PROFILE_SAMPLE_RATE \
+            or not _profile_lock.acquire(blocking=False):
+        return fn(*args)
+    try:
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            return profiler.runcall(fn, *args)
+        finally:
+            if (time.perf_counter() - start) * 1000 >= PROFILE_SLOW_MS:
+                os.makedirs(PROFILE_DIR, exist_ok=True)
+                name = f"{endpoint}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.prof"
+                profiler.dump_stats(os.path.join(PROFILE_DIR, name))
+                PROFILES.labels(endpoint).inc()
+    finally:
+        _profile_lock.release()
+
+
+def render():
+    """(body, content type) of the text exposition format."""
+    if MULTIPROC_DIR:
+        # A fresh registry per scrape, reading what every worker wrote
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
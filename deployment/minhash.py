@@ -0,0 +1,75 @@
+"""
+MinHash signatures of word shingles, indexed by LSH bands.
+
+Shared by the near-duplicate index in front of /label (near_dup.py) and the
+duplicate filter of generate_synthetic_data.py. NUM_PERM = BANDS * ROWS.
+Two texts whose shingle sets have Jaccard similarity s share a band with
+probability 1 - (1 - s**ROWS)**BANDS, about 0.98 at s = 0.8 and 0.2 at
+s = 0.4; callers check the candidates against their own threshold.
+"""
+import hashlib
+import re
+
+import numpy as np
+
+SHINGLE = 3
+BANDS = 16
+ROWS = 4
+NUM_PERM = BANDS * ROWS
+_PRIME = (1 << 31) - 1  # a * x + b stays below 2**64 for 32-bit shingle hashes
+WORD_RE = re.compile(r"\w+")
+
+
+def words(text):
+    return WORD_RE.findall(text.lower())
+
+
+class MinHashLSH:
+    """Signatures numbered in the order they are added, with one bucket map per band."""
+
+    def __init__(self, seed=0):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+        self.b = rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+        self.reset()
+
+    def reset(self, signatures=None):
+        """Drop every entry, or re-index `signatures` (e.g. loaded from disk) as the only ones."""
+        self.signatures = np.zeros((0, NUM_PERM), dtype=np.uint32) if signatures is None else signatures
+        self.count = len(self.signatures)
+        self.buckets = [dict() for _ in range(BANDS)]
+        for index in range(self.count):
+            self._index(index, self.signatures[index])
+
+    def _index(self, index, signature):
+        for band, bucket in enumerate(self.buckets):
+            bucket.setdefault(signature[band * ROWS:(band + 1) * ROWS].tobytes(), []).append(index)
+
+    def signature(self, words):
+        shingles = {" ".join(words[i:i + SHINGLE]) for i in range(max(1, len(words) - SHINGLE + 1))}
+        hashes = np.array([int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little")
+                           for s in shingles], dtype=np.uint64)
+        # One universal hash (a * x + b) mod p per permutation, minimum over the shingles
+        return ((self.a[:, None] * hashes[None, :] + self.b[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+    def best_match(self, signature, threshold):
+        """Index of the entry most similar to `signature`, if its estimated Jaccard is at least `threshold`."""
+        candidates = set()
+        for band, bucket in enumerate(self.buckets):
+            candidates.update(bucket.get(signature[band * ROWS:(band + 1) * ROWS].tobytes(), ()))
+        best, best_sim = None, threshold
+        for index in candidates:
+            sim = np.count_nonzero(self.signatures[index] == signature) / NUM_PERM
+            if sim >= best_sim:
+                best, best_sim = index, sim
+        return best
+
+    def add(self, signature):
+        """Index `signature`; returns its entry number."""
+        if self.count == len(self.signatures):
+            self.signatures = np.resize(self.signatures, (max(1024, 2 * self.count), NUM_PERM))
+        index = self.count
+        self.signatures[index] = signature
+        self._index(index, signature)
+        self.count += 1
+        return index
@@ -0,0 +1,136 @@
+"""
+Near-duplicate index in front of /label inference.
+
+Reviews (and the synthetic ones in particular) repeat themselves with small
+edits: a changed word, different punctuation, a sentence added. Every
+review that went through the models is indexed by a MinHash signature of
+its word 3-shingles, with LSH bands for lookup (minhash.py, shared with
+the filter in generate_synthetic_data.py). A new review whose estimated Jaccard
+similarity to an indexed one is at least NEAR_DUP_THRESHOLD reuses that
+review's sentiment and topic instead of running the models, and its result
+is flagged "near_duplicate".
+
+Only reviews that were actually run through the models are indexed, so
+reused results never chain off each other. The index is saved to
+NEAR_DUP_INDEX (plain arrays, no pickle) every SAVE_EVERY new entries and
+at exit. It is tagged with the model versions its results came from and
+discarded when they change.
+"""
+import atexit
+import os
+import threading
+
+import numpy as np
+
+from minhash import MinHashLSH, words
+
+INDEX_PATH = os.environ.get("NEAR_DUP_INDEX", "./near_dup_index.npz")
+# Estimated Jaccard similarity of the shingle sets above which a result is reused; 0 disables the index
+THRESHOLD = float(os.environ.get("NEAR_DUP_THRESHOLD", 0.9))
+MAX_ENTRIES = int(os.environ.get("NEAR_DUP_MAX_ENTRIES", 200000))
+SAVE_EVERY = 500
+
+
+class NearDuplicateIndex:
+    def __init__(self, path=INDEX_PATH, threshold=THRESHOLD, version="", max_entries=MAX_ENTRIES, seed=0):
+        self.lsh = MinHashLSH(seed)
+        self.path = path
+        self.threshold = threshold
+        self.version = version
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.stats = {"lookups": 0, "near_duplicates": 0, "added": 0}
+        self._reset()
+        if threshold > 0:
+            self.load()
+            atexit.register(self.save)
+
+    @property
+    def enabled(self):
+        return self.threshold > 0
+
+    @property
+    def count(self):
+        return self.lsh.count
+
+    def _reset(self, signatures=None, results=None):
+        self.lsh.reset(signatures)
+        # (sentiment id, topic id) per LSH entry
+        self.results = np.zeros((0, 2), dtype=np.int64) if results is None else results
+        self.unsaved = 0
+
+    def lookup(self, texts):
+        """(reused result or None per text, signatures to pass to `add` for the misses)."""
+        if not self.enabled:
+            return [None] * len(texts), [None] * len(texts)
+        signatures = [self.lsh.signature(words(text)) for text in texts]
+        found = []
+        with self.lock:
+            for signature in signatures:
+                best = self.lsh.best_match(signature, self.threshold)
+                found.append(tuple(int(v) for v in self.results[best]) if best is not None else None)
+            self.stats["lookups"] += len(texts)
+            self.stats["near_duplicates"] += sum(result is not None for result in found)
+        return found, signatures
+
+    def add(self, signatures, results):
+        """Index reviews that went through the models, with their (sentiment id, topic id)."""
+        if not self.enabled or not signatures:
+            return
+        with self.lock:
+            if self.count + len(signatures) > self.max_entries:
+                # Keep the newer half rather than growing without bound
+                keep = self.max_entries // 2
+                self._reset(self.lsh.signatures[self.count - keep:self.count].copy(),
+                            self.results[self.count - keep:self.count].copy())
+            if self.count + len(signatures) > len(self.results):
+                self.results = np.resize(self.results, (max(1024, 2 * (self.count + len(signatures))), 2))
+            for signature, result in zip(signatures, results):
+                self.results[self.lsh.add(signature)] = result
+            self.stats["added"] += len(signatures)
+            self.unsaved += len(signatures)
+            save = self.unsaved >= SAVE_EVERY
+        if save:
+            self.save()
+
+    def clear(self, version=None):
+        """Forget every result, e.g. when the models that produced them changed."""
+        with self.lock:
+            if version is not None:
+                self.version = version
+            self._reset()
+            self.unsaved = 1
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data["version"]) != self.version:
+                    print("⚠️ Near-duplicate index was built with other model versions, starting empty")
+                    return
+                self._reset(data["signatures"], data["results"])
+        except (OSError, KeyError, ValueError) as e:
+            print(f"⚠️ Could not read the near-duplicate index: {e}")
+
+    def save(self):
+        with self.lock:
+            if not self.unsaved:
+                return
+            signatures, results = self.lsh.signatures[:self.count].copy(), self.results[:self.count].copy()
+            version = self.version
+            self.unsaved = 0
+        tmp = self.path + ".tmp.npz"
+        np.savez(tmp, signatures=signatures, results=results, version=np.array(version))
+        os.replace(tmp, self.path)
+
+    def snapshot(self):
+        with self.lock:
+            lookups = self.stats["lookups"]
+            return {
+                "enabled": self.enabled,
+                "threshold": self.threshold,
+                "entries": self.count,
+                **self.stats,
+                "reuse_rate": round(self.stats["near_duplicates"] / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,375 @@
+"""
+Versioned model registry with hot-swapping and shadow evaluation.
+
+Layout on disk:
+
+    models/registry/classifier/<version>/    finalReviewClassifier.safetensors + ...Config.json
+    models/registry/topic/<version>/         final/ + rep_docs.json (+ its blob/index) + reduced_embeddings.npy
+    models/registry/<kind>/CURRENT           version served
+    models/registry/<kind>/CANDIDATE         version shadowed (optional)
+
+A kind without a CURRENT pointer serves the "legacy" version, the
+models/classification and models/labeling directories the app always used.
+
+The app polls the pointers. When CURRENT changes, the new version is
+loaded and warmed up in a background thread, then swapped in atomically.
+Requests already running keep the old model until they finish, and the old
+one is freed once they have drained. When CANDIDATE is set and
+SHADOW_RATE > 0, that share of requests is also run through the candidate,
+off the request path, and its latency and agreement with the served
+version are recorded (review_shadow_* metrics and /stats).
+
+Each worker process loads the new version itself, so a swap briefly holds
+two copies of the model per worker.
+
+    python registry.py list
+    python registry.py publish classifier ../models/classification-new
+    python registry.py promote classifier 20250101-120000
+    python registry.py shadow topic 20250101-120000     # or "none"
+"""
+import argparse
+import gc
+import os
+import random
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from metrics import MODEL_LOAD_SECONDS, MODEL_VERSION, SHADOW_DOCUMENTS, SHADOW_LATENCY
+
+REGISTRY_DIR = os.environ.get("MODEL_REGISTRY", "./models/registry")
+LEGACY_DIRS = {"classifier": "./models/classification", "topic": "./models/labeling"}
+LEGACY = "legacy"
+KINDS = tuple(LEGACY_DIRS)
+
+POLL_INTERVAL = float(os.environ.get("MODEL_POLL_INTERVAL", 10))
+DRAIN_TIMEOUT = float(os.environ.get("MODEL_DRAIN_TIMEOUT", 60))
+SHADOW_RATE = float(os.environ.get("SHADOW_RATE", 0))
+SHADOW_MAX_PENDING = 4
+
+
+class ModelRegistry:
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = root
+
+    def _pointer(self, kind, name):
+        path = os.path.join(self.root, kind, name)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return f.read().strip() or None
+
+    def _set_pointer(self, kind, name, version):
+        os.makedirs(os.path.join(self.root, kind), exist_ok=True)
+        path = os.path.join(self.root, kind, name)
+        if version is None:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(version + "\n")
+        os.replace(tmp, path)
+
+    def current(self, kind):
+        return self._pointer(kind, "CURRENT") or LEGACY
+
+    def candidate(self, kind):
+        return self._pointer(kind, "CANDIDATE")
+
+    def path(self, kind, version):
+        return LEGACY_DIRS[kind] if version == LEGACY else os.path.join(self.root, kind, version)
+
+    def versions(self, kind):
+        directory = os.path.join(self.root, kind)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name for name in os.listdir(directory)
+                      if os.path.isdir(os.path.join(directory, name)) and not name.startswith("."))
+
+    def publish(self, kind, source, version=None):
+        """Copy a model directory into the registry as a new version (not served yet)."""
+        version = version or time.strftime("%Y%m%d-%H%M%S")
+        target = self.path(kind, version)
+        if os.path.exists(target):
+            raise ValueError(f"{kind} version '{version}' already exists")
+        # Copy next to the target first, so the poller never sees a partial version
+        staging = os.path.join(self.root, kind, f".{version}.tmp")
+        shutil.copytree(source, staging)
+        os.rename(staging, target)
+        return version
+
+    def promote(self, kind, version):
+        if version != LEGACY and version not in self.versions(kind):
+            raise ValueError(f"Unknown {kind} version '{version}'")
+        self._set_pointer(kind, "CURRENT", version)
+
+    def shadow(self, kind, version):
+        if version is not None and version not in self.versions(kind):
+            raise ValueError(f"Unknown {kind} version '{version}'")
+        self._set_pointer(kind, "CANDIDATE", version)
+
+
+class _Loaded:
+    def __init__(self, version, model):
+        self.version = version
+        self.model = model
+        self.active = 0
+
+
+class ModelSlot:
+    """The served version of one kind of model, swappable while requests use it."""
+
+    def __init__(self, kind, version, model, on_swap=None):
+        self.kind = kind
+        self.on_swap = on_swap
+        self.condition = threading.Condition()
+        self.loaded = _Loaded(version, model)
+        self.swaps = 0
+        MODEL_VERSION.labels(kind, version).set(1)
+
+    @property
+    def version(self):
+        return self.loaded.version
+
+    @property
+    def model(self):
+        return self.loaded.model
+
+    @contextmanager
+    def use(self, with_version=False):
+        """
+        The current model (or (version, model) with `with_version`), kept
+        alive and not freed by a swap until the block exits.
+        """
+        with self.condition:
+            loaded = self.loaded
+            loaded.active += 1
+        try:
+            yield (loaded.version, loaded.model) if with_version else loaded.model
+        finally:
+            with self.condition:
+                loaded.active -= 1
+                self.condition.notify_all()
+
+    def swap(self, version, model, drain_timeout=DRAIN_TIMEOUT):
+        """Serve `model` from now on; returns once requests on the old one have drained."""
+        with self.condition:
+            old, self.loaded = self.loaded, _Loaded(version, model)
+            self.swaps += 1
+        MODEL_VERSION.labels(self.kind, old.version).set(0)
+        MODEL_VERSION.labels(self.kind, version).set(1)
+        if self.on_swap:
+            self.on_swap()
+        with self.condition:
+            drained = self.condition.wait_for(lambda: old.active == 0, timeout=drain_timeout)
+        if not drained:
+            print(f"⚠️ {self.kind} {old.version}: {old.active} requests still running after {drain_timeout}s")
+        del old
+        gc.collect()
+
+
+class Shadow:
+    """Runs a candidate version on a sample of requests, off the request path."""
+
+    def __init__(self, kind, rate=SHADOW_RATE, max_pending=SHADOW_MAX_PENDING):
+        self.kind = kind
+        self.rate = rate
+        self.max_pending = max_pending
+        self.candidate = None
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"shadow-{kind}")
+        self.pending = 0
+        self.stats = {"requests": 0, "documents": 0, "agree": 0, "primary_seconds": 0.0, "candidate_seconds": 0.0}
+
+    @property
+    def version(self):
+        candidate = self.candidate
+        return candidate.version if candidate else None
+
+    def set_candidate(self, version, model):
+        with self.lock:
+            self.candidate = _Loaded(version, model) if version else None
+            self.stats = dict.fromkeys(self.stats, 0)
+
+    def maybe_run(self, predict, inputs, primary, primary_seconds):
+        """
+        With probability `rate`, queue `predict(candidate_model, inputs)` and
+        compare it with the served model's `primary` outputs.
+        """
+        candidate = self.candidate
+        if candidate is None or random.random() >= self.rate:
+            return
+        with self.lock:
+            # Drop samples rather than let the shadow fall behind
+            if self.pending >= self.max_pending:
+                return
+            self.pending += 1
+        self.pool.submit(self._run, candidate, predict, inputs, primary, primary_seconds)
+
+    def _run(self, candidate, predict, inputs, primary, primary_seconds):
+        try:
+            start = time.perf_counter()
+            outputs = predict(candidate.model, inputs)
+            seconds = time.perf_counter() - start
+            agree = sum(a == b for a, b in zip(outputs, primary))
+            SHADOW_LATENCY.labels(self.kind, "primary").observe(primary_seconds)
+            SHADOW_LATENCY.labels(self.kind, "candidate").observe(seconds)
+            SHADOW_DOCUMENTS.labels(self.kind, "agree").inc(agree)
+            SHADOW_DOCUMENTS.labels(self.kind, "disagree").inc(len(primary) - agree)
+            with self.lock:
+                if self.candidate is candidate:
+                    self.stats["requests"] += 1
+                    self.stats["documents"] += len(primary)
+                    self.stats["agree"] += agree
+                    self.stats["primary_seconds"] += primary_seconds
+                    self.stats["candidate_seconds"] += seconds
+        except Exception as e:
+            print(f"⚠️ Shadow {self.kind} {candidate.version} failed: {e}")
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats)
+        requests, documents = stats["requests"], stats["documents"]
+        return {
+            "candidate": self.version,
+            "rate": self.rate,
+            "requests": requests,
+            "agreement": round(stats["agree"] / documents, 4) if documents else None,
+            "primary_ms": round(1000 * stats["primary_seconds"] / requests, 2) if requests else None,
+            "candidate_ms": round(1000 * stats["candidate_seconds"] / requests, 2) if requests else None,
+        }
+
+
+class RegistryWatcher:
+    """
+    Polls the registry pointers and deploys what they point to.
+
+    `loaders[kind](path, role)` loads a version ("serve" or "shadow") and
+    `warmups[kind](model)` runs sample inputs through it before it is used.
+    """
+
+    def __init__(self, registry, slots, loaders, warmups, shadows, interval=POLL_INTERVAL):
+        self.registry = registry
+        self.slots = slots
+        self.loaders = loaders
+        self.warmups = warmups
+        self.shadows = shadows
+        self.interval = interval
+        self.failed = set()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            # Gauges set in the preloading master aren't carried into a worker's metrics
+            for kind, slot in self.slots.items():
+                MODEL_VERSION.labels(kind, slot.version).set(1)
+            self.thread = threading.Thread(target=self.run, name="model-registry", daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception as e:
+                print(f"⚠️ Model registry check failed: {e}")
+
+    def load(self, kind, version, role):
+        start = time.perf_counter()
+        model = self.loaders[kind](self.registry.path(kind, version), role)
+        self.warmups[kind](model)
+        return model, time.perf_counter() - start
+
+    def check(self):
+        for kind, slot in self.slots.items():
+            version = self.registry.current(kind)
+            if version != slot.version and (kind, version) not in self.failed:
+                self.deploy(kind, slot, version)
+
+            shadow = self.shadows.get(kind)
+            candidate = self.registry.candidate(kind) if shadow and shadow.rate > 0 else None
+            if shadow and candidate != shadow.version and (kind, candidate) not in self.failed:
+                try:
+                    model = self.load(kind, candidate, "shadow")[0] if candidate else None
+                except Exception as e:
+                    self.failed.add((kind, candidate))
+                    print(f"❌ Could not load {kind} candidate {candidate}: {e}")
+                    continue
+                shadow.set_candidate(candidate, model)
+                print(f"✅ Shadowing {kind} {candidate}" if candidate else f"🔄 Stopped shadowing {kind}")
+
+    def deploy(self, kind, slot, version):
+        print(f"🔄 Loading {kind} {version}...")
+        try:
+            model, seconds = self.load(kind, version, "serve")
+        except Exception as e:
+            # Keep serving the old version; retried only if the pointer changes again
+            self.failed.add((kind, version))
+            print(f"❌ Could not load {kind} {version}: {e}")
+            return
+        MODEL_LOAD_SECONDS.labels(kind).set(seconds)
+        previous = slot.version
+        slot.swap(version, model)
+        print(f"✅ {kind} {previous} -> {version} (loaded and warmed in {seconds:.1f}s)")
+
+    def snapshot(self):
+        return {
+            kind: {
+                "version": slot.version,
+                "swaps": slot.swaps,
+                **({"shadow": self.shadows[kind].snapshot()} if kind in self.shadows else {}),
+            }
+            for kind, slot in self.slots.items()
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the versioned model registry")
+    parser.add_argument("--root", default=REGISTRY_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list")
+    publish = commands.add_parser("publish", help="copy a model directory in as a new version")
+    publish.add_argument("kind", choices=KINDS)
+    publish.add_argument("source")
+    publish.add_argument("--version")
+    publish.add_argument("--promote", action="store_true", help="serve it right away")
+    promote = commands.add_parser("promote", help="serve a version")
+    promote.add_argument("kind", choices=KINDS)
+    promote.add_argument("version")
+    shadow = commands.add_parser("shadow", help="shadow a version (\"none\" to stop)")
+    shadow.add_argument("kind", choices=KINDS)
+    shadow.add_argument("version")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    try:
+        if args.command == "publish":
+            version = registry.publish(args.kind, args.source, args.version)
+            print(f"✅ Published {args.kind} {version}")
+            if args.promote:
+                registry.promote(args.kind, version)
+                print(f"✅ {args.kind} {version} is now current")
+        elif args.command == "promote":
+            registry.promote(args.kind, args.version)
+            print(f"✅ {args.kind} {args.version} is now current")
+        elif args.command == "shadow":
+            registry.shadow(args.kind, None if args.version == "none" else args.version)
+            print(f"✅ {args.kind} candidate set to {args.version}")
+    except ValueError as e:
+        parser.error(str(e))
+
+    for kind in KINDS:
+        current, candidate = registry.current(kind), registry.candidate(kind)
+        print(f"{kind}: current={current} candidate={candidate or '-'}")
+        for version in registry.versions(kind):
+            print(f"  {version}")
+
+
+if __name__ == "__main__":
+    main()
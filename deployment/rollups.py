@@ -0,0 +1,208 @@
+"""
+Sentiment/topic rollups for the analytics dashboard.
+
+Every review labeled through /label with a university is stored once (keyed
+by its id, or by university + date + text) in a SQLite database, and a
+trigger adds it to the per university x topic x day counters in the same
+transaction. /analytics then answers "which topics are trending negative at
+which university this week" by summing those counters; it never runs the
+models again.
+
+Topic ids are only meaningful within one topic model version (a refit
+numbers its topics afresh), so each review is stored with the version that
+labeled it, counters are kept per version, and the label each version gave
+a topic id is stored alongside.
+
+The database is opened in WAL mode with one connection per thread, so the
+gunicorn workers and their inference threads can write to it concurrently.
+"""
+import datetime
+import hashlib
+import os
+import sqlite3
+import threading
+
+ROLLUP_DB = os.environ.get("ROLLUP_DB", "./rollups.sqlite")
+DEFAULT_DAYS = 7
+MAX_DAYS = 3660
+MAX_ROWS = 1000
+# Larger integers don't fit an SQLite INTEGER parameter
+SQLITE_MAX_INT = 2 ** 63 - 1
+
+SCHEMA = """
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS reviews (
+    id TEXT PRIMARY KEY,
+    university TEXT NOT NULL,
+    day TEXT NOT NULL,
+    sentiment INTEGER NOT NULL,
+    topic_version TEXT NOT NULL,
+    topic_id INTEGER NOT NULL,
+    topic_label TEXT
+);
+CREATE TABLE IF NOT EXISTS daily (
+    university TEXT NOT NULL,
+    topic_version TEXT NOT NULL,
+    topic_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    positive INTEGER NOT NULL DEFAULT 0,
+    negative INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (university, topic_version, topic_id, day)
+);
+CREATE INDEX IF NOT EXISTS daily_day ON daily (day);
+CREATE TABLE IF NOT EXISTS topics (
+    topic_version TEXT NOT NULL,
+    topic_id INTEGER NOT NULL,
+    label TEXT,
+    PRIMARY KEY (topic_version, topic_id)
+);
+CREATE TRIGGER IF NOT EXISTS reviews_rollup AFTER INSERT ON reviews
+BEGIN
+    INSERT INTO daily (university, topic_version, topic_id, day, positive, negative)
+    VALUES (NEW.university, NEW.topic_version, NEW.topic_id, NEW.day, NEW.sentiment, 1 - NEW.sentiment)
+    ON CONFLICT (university, topic_version, topic_id, day) DO UPDATE SET
+        positive = positive + excluded.positive,
+        negative = negative + excluded.negative;
+    INSERT OR IGNORE INTO topics (topic_version, topic_id, label)
+    VALUES (NEW.topic_version, NEW.topic_id, NEW.topic_label);
+END;
+"""
+
+# group_by -> (GROUP BY columns, period expression)
+GROUPINGS = {
+    "total": ("university, topic_version, topic_id", "NULL"),
+    "day": ("university, topic_version, topic_id, period", "day"),
+    "week": ("university, topic_version, topic_id, period", "strftime('%Y-W%W', day)"),
+}
+
+
+def parse_day(value, default=None):
+    """YYYY-MM-DD for an ISO date or datetime string; `default` when missing, ValueError when malformed."""
+    if not value:
+        return default
+    return datetime.date.fromisoformat(str(value)[:10]).isoformat()
+
+
+def bounded_int(params, name, default, low, high):
+    """Integer request param in [low, high]; ValueError otherwise."""
+    value = int(params.get(name, default))
+    if not low <= value <= high:
+        raise ValueError(f"'{name}' must be between {low} and {high}")
+    return value
+
+
+def today():
+    return datetime.datetime.now(datetime.timezone.utc).date()
+
+
+def review_id(university, day, text):
+    return hashlib.sha1("\x1f".join((university, day, text)).encode("utf-8")).hexdigest()
+
+
+class RollupStore:
+    def __init__(self, path=ROLLUP_DB):
+        self.path = path
+        self.local = threading.local()
+        self.connection().executescript(SCHEMA)
+
+    def connection(self):
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.row_factory = sqlite3.Row
+            self.local.db = db
+        return db
+
+    def record(self, reviews):
+        """
+        Store labeled reviews, given as dicts with university, date, text,
+        sentiment (1 = positive), topic_version, topic_id and topic_label,
+        plus an optional id. Returns how many were new; reviews already
+        stored are not counted twice.
+        """
+        rows = []
+        default_day = today().isoformat()
+        for review in reviews:
+            day = parse_day(review.get("date"), default_day)
+            rows.append((str(review.get("id") or review_id(review["university"], day, review.get("text", ""))),
+                         review["university"], day, int(review["sentiment"]), str(review["topic_version"]),
+                         int(review["topic_id"]), review.get("topic_label")))
+        db = self.connection()
+        with db:
+            # rowcount leaves out the trigger's changes, and ignored duplicates
+            return db.executemany("INSERT OR IGNORE INTO reviews (id, university, day, sentiment, topic_version, "
+                                  "topic_id, topic_label) VALUES (?, ?, ?, ?, ?, ?, ?)", rows).rowcount
+
+    def query(self, start=None, end=None, university=None, topic_version=None, topic_id=None, group_by="total",
+              min_reviews=1, limit=MAX_ROWS):
+        """
+        Counts per university x topic version x topic (x day or week) between
+        start and end, most negative first, with the label that version gave the topic.
+        """
+        group, period = GROUPINGS[group_by]
+        where, params = ["day BETWEEN ? AND ?"], [start, end]
+        if university:
+            where.append("university = ? COLLATE NOCASE")
+            params.append(university)
+        if topic_version:
+            where.append("topic_version = ?")
+            params.append(topic_version)
+        if topic_id is not None:
+            where.append("topic_id = ?")
+            params.append(topic_id)
+        sql = (f"SELECT university, topic_version, topic_id, {period} AS period, SUM(positive) AS positive, "
+               f"SUM(negative) AS negative, (SELECT label FROM topics t WHERE t.topic_version = d.topic_version "
+               f"AND t.topic_id = d.topic_id) AS topic_label "
+               f"FROM daily d WHERE {' AND '.join(where)} GROUP BY {group} "
+               f"HAVING SUM(positive + negative) >= ? "
+               f"ORDER BY 1.0 * SUM(negative) / SUM(positive + negative) DESC, SUM(negative) DESC LIMIT ?")
+        rows = self.connection().execute(sql, params + [min_reviews, limit]).fetchall()
+        return [
+            {
+                "university": row["university"],
+                "topic_version": row["topic_version"],
+                "topic_id": row["topic_id"],
+                "topic_label": row["topic_label"],
+                **({"period": row["period"]} if group_by != "total" else {}),
+                "reviews": row["positive"] + row["negative"],
+                "positive": row["positive"],
+                "negative": row["negative"],
+                "negative_ratio": round(row["negative"] / (row["positive"] + row["negative"]), 4),
+            }
+            for row in rows
+        ]
+
+    def totals(self):
+        row = self.connection().execute("SELECT COUNT(*), MIN(day), MAX(day) FROM reviews").fetchone()
+        return {"reviews": row[0], "first_day": row[1], "last_day": row[2]}
+
+
+def analytics_params(params):
+    """Validated query arguments for RollupStore.query from request params; raises ValueError."""
+    end = parse_day(params.get("end"), today().isoformat())
+    days = bounded_int(params, "days", DEFAULT_DAYS, 1, MAX_DAYS)
+    start = params.get("start")
+    if start:
+        start = parse_day(start)
+    else:
+        try:
+            start = (datetime.date.fromisoformat(end) - datetime.timedelta(days=days - 1)).isoformat()
+        except OverflowError:
+            raise ValueError("'days' reaches before year 1")
+    if start > end:
+        raise ValueError("'start' must not be after 'end'")
+    group_by = params.get("group_by", "total")
+    if group_by not in GROUPINGS:
+        raise ValueError(f"'group_by' must be one of {', '.join(GROUPINGS)}")
+    topic_id = params.get("topic_id")
+    topic_id = bounded_int(params, "topic_id", None, -1, SQLITE_MAX_INT) if topic_id not in (None, "") else None
+    return {
+        "start": start,
+        "end": end,
+        "university": params.get("university"),
+        "topic_version": params.get("topic_version"),
+        "topic_id": topic_id,
+        "group_by": group_by,
+        "min_reviews": bounded_int(params, "min_reviews", 1, 1, SQLITE_MAX_INT),
+        "limit": bounded_int(params, "limit", MAX_ROWS, 1, MAX_ROWS),
+    }
@@ -0,0 +1,369 @@
+from flask import Flask, request, jsonify
+from flask_cors import CORS
+from sentence_transformers import SentenceTransformer
+from functools import lru_cache
+from text_index import BM25Index, reciprocal_rank_fusion
+import numpy as np
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+
+SCRAPER_DIR = os.environ.get("SCRAPER_DIR", "../scraper")
+INDEX_DIR = "./models/search"
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"  # same embeddings as KnowledgeMap.ipynb
+REFRESH_INTERVAL = 30  # seconds between background checks of the scraped files
+MAX_TOP_K = 100
+SEARCH_MODES = ("hybrid", "keyword", "vector")
+FEEDBACK_DOCS = 5        # keyword hits averaged into the hybrid query vector
+FUSION_CANDIDATES = 50   # vector ranks considered when fusing with BM25
+
+
+def _text(value):
+    # Scraped cells are either plain strings or {"text": ..., "link": ...} dicts
+    if isinstance(value, dict):
+        value = value.get("text", "")
+    if not value or value == "N/A":
+        return ""
+    return str(value).strip()
+
+
+def _doc(university, doc_type, title, body="", url=""):
+    title = _text(title)
+    if not title:
+        return None
+    return {
+        "university": university,
+        "type": doc_type,
+        "title": title,
+        "text": " ".join(part for part in (title, _text(body)) if part),
+        "url": _text(url),
+    }
+
+
+def docs_from_database(data):
+    """Universities in the consolidated `database.json` / unified scraper layout."""
+    docs = []
+    for univ in data.get("universities", []):
+        name = univ.get("name", "")
+        for fac in univ.get("faculties", []):
+            if isinstance(fac, str):
+                fac = {"name": fac}
+            docs.append(_doc(name, "faculty", fac.get("name"), url=fac.get("url", "")))
+        for spec in univ.get("specialties", []):
+            docs.append(_doc(name, "specialty", spec.get("name"),
+                             spec.get("department", ""), spec.get("url", "")))
+        for item in univ.get("news", []):
+            docs.append(_doc(name, "news", item.get("title"),
+                             item.get("description") or item.get("content"),
+                             item.get("link") or item.get("url")))
+        for item in univ.get("events", []):
+            docs.append(_doc(name, "event", item.get("title"), item.get("content"),
+                             item.get("link") or item.get("url")))
+    return docs
+
+
+def docs_from_articles(university, doc_type):
+    def load(data):
+        return [
+            _doc(university, doc_type, item.get("title"),
+                 item.get("description") or item.get("content"),
+                 item.get("link") or item.get("url"))
+            for item in data
+        ]
+    return load
+
+
+def docs_from_ensia_programs(data):
+    docs = []
+    for table in data:
+        for row in table:
+            unit = row.get("unite_enseignement")
+            link = unit.get("link", "") if isinstance(unit, dict) else ""
+            docs.append(_doc("ENSIA", "specialty", unit, url=link))
+    return docs
+
+
+def docs_from_ghardaia(data):
+    docs = [_doc("University of Ghardaia", "faculty", fac.get("name"), url=fac.get("url", ""))
+            for fac in data.get("faculties", [])]
+    docs += [_doc("University of Ghardaia", "event", evt.get("title"), evt.get("content"), evt.get("link"))
+             for evt in data.get("featured_events", [])]
+    return docs
+
+
+def docs_from_faculty_schedule(path):
+    # El Oued schedules are stored one file per faculty, named after the faculty
+    faculty = os.path.splitext(os.path.basename(path))[0]
+
+    def load(data):
+        docs = [_doc("University of El Oued", "faculty", faculty)]
+        docs += [_doc("University of El Oued", "specialty", spec.get("specialty_name"),
+                      faculty, spec.get("specialty_url", ""))
+                 for spec in data]
+        return docs
+    return load
+
+
+def discover_sources():
+    """Map every scraped JSON file we know how to read to its document extractor."""
+    sources = {
+        "database.json": docs_from_database,
+        "el_oued/eloued_news.json": docs_from_articles("University of El Oued", "news"),
+        "el_oued/eloued_events.json": docs_from_articles("University of El Oued", "event"),
+        "ensia/ensia_news.json": docs_from_articles("ENSIA", "news"),
+        "ensia/ensia_programs.json": docs_from_ensia_programs,
+        "ghardaia/faculties.json": docs_from_ghardaia,
+    }
+    sources = {os.path.join(SCRAPER_DIR, path): loader for path, loader in sources.items()}
+
+    # Only the latest unified scrape; its timestamped name sorts chronologically
+    unified = glob.glob(os.path.join(SCRAPER_DIR, "unified_scraper", "unified_university_data_*.json"))
+    if unified:
+        sources[max(unified)] = docs_from_database
+
+    schedules_dir = os.path.join(SCRAPER_DIR, "el_oued", "faculty_schedules")
+    if os.path.isdir(schedules_dir):
+        for name in sorted(os.listdir(schedules_dir)):
+            if name.endswith(".json"):
+                path = os.path.join(schedules_dir, name)
+                sources[path] = docs_from_faculty_schedule(path)
+
+    return {path: loader for path, loader in sources.items() if os.path.exists(path)}
+
+
+def _doc_key(doc):
+    raw = "\x1f".join((doc["university"], doc["type"], doc["text"]))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class SearchIndex:
+    """
+    Vector index over the scraped university data.
+
+    Documents are re-extracted only from files whose mtime/size changed since
+    the last refresh, and only documents whose text is new get embedded; the
+    rest come from the on-disk embedding cache in INDEX_DIR. After the first
+    build, `start` rescans in a background thread, so requests never wait on it.
+    """
+
+    def __init__(self, model, index_dir=INDEX_DIR):
+        self.model = model
+        self.index_dir = index_dir
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.file_state = {}   # path -> (mtime_ns, size)
+        self.file_docs = {}    # path -> list of documents
+        self.cache = {}        # doc key -> embedding row
+        self.docs = []
+        self.matrix = np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+        self.masks = {}
+        self.bm25 = BM25Index([])
+        self.thread = None
+        self._load_cache()
+
+    def _load_cache(self):
+        keys_path = os.path.join(self.index_dir, "keys.json")
+        vectors_path = os.path.join(self.index_dir, "embeddings.npy")
+        if not (os.path.exists(keys_path) and os.path.exists(vectors_path)):
+            return
+        with open(keys_path, "r") as f:
+            keys = json.load(f)
+        vectors = np.load(vectors_path)
+        self.cache = dict(zip(keys, vectors))
+
+    def _save_cache(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        keys = list(self.cache)
+        vectors = np.stack([self.cache[k] for k in keys]) if keys else self.matrix[:0]
+        np.save(os.path.join(self.index_dir, "embeddings.npy"), vectors)
+        with open(os.path.join(self.index_dir, "keys.json"), "w") as f:
+            json.dump(keys, f)
+
+    def refresh(self):
+        """Pick up new or changed scraper outputs. Returns True if the index changed."""
+        with self.refresh_lock:
+            return self._refresh_sources()
+
+    def start(self, interval=REFRESH_INTERVAL):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, args=(interval,), name="search-refresh", daemon=True)
+            self.thread.start()
+
+    def _run(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Search index refresh failed: {e}")
+
+    def _refresh_sources(self):
+        sources = discover_sources()
+        changed = False
+        for path, loader in sources.items():
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                # Removed or being replaced by a scraper; the last version read stays indexed
+                print(f"⚠️ Skipping {path}: {e}")
+                continue
+            state = (stat.st_mtime_ns, stat.st_size)
+            if self.file_state.get(path) == state:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    docs = [doc for doc in loader(json.load(f)) if doc]
+            except OSError as e:
+                print(f"⚠️ Skipping {path}: {e}")
+                continue
+            except (ValueError, AttributeError, TypeError) as e:
+                print(f"⚠️ Skipping {path}: {e}")
+                docs = []
+            self.file_state[path] = state
+            self.file_docs[path] = docs
+            changed = True
+        for path in set(self.file_docs) - set(sources):
+            del self.file_docs[path]
+            del self.file_state[path]
+            changed = True
+
+        if changed:
+            self._rebuild()
+        return changed
+
+    def _rebuild(self):
+        docs, seen = [], set()
+        for path in sorted(self.file_docs):
+            for doc in self.file_docs[path]:
+                key = _doc_key(doc)
+                if key in seen:
+                    continue
+                seen.add(key)
+                docs.append(dict(doc, id=key))
+
+        missing = [doc for doc in docs if doc["id"] not in self.cache]
+        if missing:
+            vectors = self.model.encode(
+                [doc["text"] for doc in missing], batch_size=64,
+                normalize_embeddings=True, convert_to_numpy=True,
+            ).astype(np.float32)
+            self.cache.update(zip((doc["id"] for doc in missing), vectors))
+            print(f"🔄 Embedded {len(missing)} new documents")
+
+        # Drop embeddings of documents that disappeared from the scraped files
+        self.cache = {doc["id"]: self.cache[doc["id"]] for doc in docs}
+        self._save_cache()
+
+        if docs:
+            matrix = np.ascontiguousarray(np.stack([self.cache[doc["id"]] for doc in docs]))
+        else:
+            matrix = self.matrix[:0]
+        masks = {}
+        for field in ("university", "type"):
+            values = np.array([doc[field] for doc in docs], dtype=object)
+            for value in set(values):
+                masks[(field, value.lower())] = values == value
+
+        bm25 = BM25Index([doc["text"] for doc in docs])
+
+        # Swap everything at once so concurrent queries never see a half-built index
+        with self.lock:
+            self.docs, self.matrix, self.masks, self.bm25 = docs, matrix, masks, bm25
+
+    def search(self, query, embed, top_k=10, university=None, doc_type=None, mode="hybrid"):
+        """
+        Rank documents for `query`.
+
+        "keyword" uses BM25 only. "hybrid" fuses BM25 with vector scores, where
+        the query vector is the centroid of the best keyword hits, so no
+        transformer runs unless nothing matched lexically. "vector" always
+        embeds the query with `embed`.
+        """
+        with self.lock:
+            docs, matrix, masks, bm25 = self.docs, self.matrix, self.masks, self.bm25
+        if not docs:
+            return []
+
+        if mode == "vector":
+            scores = matrix @ embed(query)
+        else:
+            keyword_scores = bm25.scores(query)
+            if mode == "keyword":
+                scores = np.where(keyword_scores > 0, keyword_scores, -np.inf)
+            elif keyword_scores.any():
+                top_hits = np.argsort(-keyword_scores)[:FEEDBACK_DOCS]
+                top_hits = top_hits[keyword_scores[top_hits] > 0]
+                centroid = matrix[top_hits].mean(axis=0)
+                centroid /= max(np.linalg.norm(centroid), 1e-12)
+                scores = reciprocal_rank_fusion(
+                    [keyword_scores, matrix @ centroid], limit=FUSION_CANDIDATES
+                )
+                scores = np.where(scores > 0, scores, -np.inf)
+            else:
+                scores = matrix @ embed(query)
+
+        for field, value in (("university", university), ("type", doc_type)):
+            if value:
+                mask = masks.get((field, value.lower()))
+                if mask is None:
+                    return []
+                scores = np.where(mask, scores, -np.inf)
+
+        top_k = min(top_k, len(docs))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            dict(docs[i], score=round(float(scores[i]), 4))
+            for i in top if np.isfinite(scores[i])
+        ]
+
+
+app = Flask(__name__)
+CORS(app)
+
+try:
+    print("🔄 Building search index...")
+    embedding_model = SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+    index = SearchIndex(embedding_model)
+    index.refresh()
+    index.start()
+    print(f"✅ Indexed {len(index.docs)} documents")
+except Exception as e:
+    raise RuntimeError(f"❌ Error building search index: {e}")
+
+
+@lru_cache(maxsize=1024)
+def embed_query(query):
+    # Repeated queries (autocomplete, paging) skip the encoder entirely
+    vector = embedding_model.encode(query, normalize_embeddings=True, convert_to_numpy=True)
+    vector = vector.astype(np.float32)
+    vector.setflags(write=False)
+    return vector
+
+
+@app.route("/search", methods=["GET", "POST"])
+def search():
+    params = request.get_json(silent=True) or request.args
+    query = (params.get("q") or params.get("query") or "").strip()
+    if not query:
+        return jsonify({"error": "Missing 'q' field"}), 400
+    try:
+        top_k = max(1, min(int(params.get("k", 10)), MAX_TOP_K))
+    except (TypeError, ValueError):
+        return jsonify({"error": "'k' must be an integer"}), 400
+    mode = params.get("mode", "hybrid")
+    if mode not in SEARCH_MODES:
+        return jsonify({"error": f"'mode' must be one of {', '.join(SEARCH_MODES)}"}), 400
+
+    results = index.search(
+        query, lambda q: embed_query(q.lower()), top_k,
+        university=params.get("university"), doc_type=params.get("type"), mode=mode,
+    )
+    return jsonify({"query": query, "mode": mode, "results": results})
+
+
+if __name__ == "__main__":
+    app.run(host="0.0.0.0", port=5001)
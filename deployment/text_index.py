@@ -0,0 +1,112 @@
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+import numpy as np
+
+# Arabic letter variants folded to a single form before indexing
+ARABIC_FOLD = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ى": "ي", "ئ": "ي", "ؤ": "و", "ة": "ه",
+    "ـ": None,  # tatweel
+})
+ARABIC_PREFIXES = ("وال", "بال", "كال", "فال", "لل", "ال")
+ARABIC_RE = re.compile(r"[؀-ۿ]")
+# Underscores split too, so program keys like `unite_enseignement` become two tokens
+TOKEN_RE = re.compile(r"[^\W_]+")
+
+STOPWORDS = {
+    # English
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "the", "to", "with",
+    # French (accents already stripped)
+    "au", "aux", "ce", "d", "dans", "de", "des", "du", "en", "et", "l", "la",
+    "le", "les", "par", "pour", "sur", "un", "une",
+    # Arabic (after normalization)
+    "في", "من", "علي", "الي", "عن", "مع", "و", "هذا", "هذه",
+}
+
+
+def normalize(text):
+    """Lowercase, strip Latin accents and Arabic diacritics, fold Arabic letter variants."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return text.translate(ARABIC_FOLD)
+
+
+def _stem(token):
+    if ARABIC_RE.match(token):
+        for prefix in ARABIC_PREFIXES:
+            if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+                return token[len(prefix):]
+        return token
+    # Light plural folding, shared by English and French ("sciences", "travaux")
+    if len(token) > 4 and token[-1] in "sx":
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    return [
+        _stem(token) for token in TOKEN_RE.findall(normalize(text))
+        if token not in STOPWORDS
+    ]
+
+
+class BM25Index:
+    """
+    Inverted BM25 index. Postings are kept as numpy arrays per term so a query
+    costs one vectorised update per query term, independent of the language.
+    """
+
+    def __init__(self, texts, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(texts)
+
+        postings = defaultdict(lambda: ([], []))
+        lengths = np.zeros(self.size, dtype=np.float32)
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                ids, tfs = postings[term]
+                ids.append(doc_id)
+                tfs.append(tf)
+
+        avg_length = lengths.mean() if self.size else 0.0
+        norm = k1 * (1 - b + b * lengths / max(avg_length, 1.0))
+
+        # Precompute the full BM25 weight of every posting at build time
+        self.postings = {}
+        for term, (ids, tfs) in postings.items():
+            ids = np.array(ids, dtype=np.int32)
+            tfs = np.array(tfs, dtype=np.float32)
+            idf = math.log(1 + (self.size - len(ids) + 0.5) / (len(ids) + 0.5))
+            self.postings[term] = (ids, idf * tfs * (k1 + 1) / (tfs + norm[ids]))
+
+    def scores(self, query):
+        """Dense array of BM25 scores for `query`; zero for documents sharing no term."""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is not None:
+                ids, weights = posting
+                scores[ids] += weights
+        return scores
+
+
+def reciprocal_rank_fusion(score_lists, k=60, limit=None):
+    """
+    Fuse several dense score arrays by reciprocal rank. Only entries with a
+    positive score take part in each ranking.
+    """
+    fused = np.zeros(len(score_lists[0]), dtype=np.float32)
+    for scores in score_lists:
+        candidates = np.flatnonzero(scores > 0)
+        if limit is not None and len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        order = candidates[np.argsort(-scores[candidates])]
+        fused[order] += 1.0 / (k + np.arange(1, len(order) + 1))
+    return fused
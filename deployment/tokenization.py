@@ -0,0 +1,103 @@
+import threading
+import time
+
+import torch
+
+from metrics import MODEL_BATCH_SIZE, STAGE_LATENCY, observe_padding
+
+MAX_LENGTH = 512      # DistilBERT position embeddings
+BATCH_SIZE = 16
+CHUNK_STRIDE = 64     # tokens shared by consecutive chunks of a long review
+MODES = ("truncate", "chunk")
+
+
+class PaddingStats:
+    """Running count of real vs. padded tokens fed to the model."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.real_tokens = 0
+        self.padded_tokens = 0
+
+    def record(self, lengths):
+        with self.lock:
+            self.batches += 1
+            self.real_tokens += sum(lengths)
+            self.padded_tokens += max(lengths) * len(lengths)
+
+    def snapshot(self):
+        with self.lock:
+            waste = 1 - self.real_tokens / self.padded_tokens if self.padded_tokens else 0.0
+            return {
+                "batches": self.batches,
+                "real_tokens": self.real_tokens,
+                "padded_tokens": self.padded_tokens,
+                "padding_waste": round(waste, 4),
+            }
+
+
+padding_stats = PaddingStats()
+
+
+def encode(tokenizer, texts, max_length=MAX_LENGTH, mode="truncate"):
+    """
+    Tokenize without padding. Returns (doc_index, input_ids) pieces: one per
+    text when truncating, or one per overlapping window in chunk mode.
+    """
+    if mode == "chunk":
+        encoded = tokenizer(texts, truncation=True, max_length=max_length, stride=CHUNK_STRIDE,
+                            return_overflowing_tokens=True)
+        owners = encoded["overflow_to_sample_mapping"]
+    else:
+        encoded = tokenizer(texts, truncation=True, max_length=max_length)
+        owners = range(len(texts))
+    return list(zip(owners, encoded["input_ids"]))
+
+
+def length_buckets(pieces, batch_size=BATCH_SIZE):
+    """Group pieces of similar length so each batch pads to a near-equal length."""
+    order = sorted(range(len(pieces)), key=lambda i: len(pieces[i][1]))
+    for start in range(0, len(order), batch_size):
+        yield order[start:start + batch_size]
+
+
+def predict_logits(model, tokenizer, texts, max_length=MAX_LENGTH, batch_size=BATCH_SIZE, mode="truncate"):
+    """
+    Logits for `texts`, in input order.
+
+    Inputs are capped at `max_length` tokens. In chunk mode long reviews are
+    split into overlapping windows and their logits are averaged, weighted by
+    window length. Pieces are run in length-sorted batches.
+    """
+    start = time.perf_counter()
+    pieces = encode(tokenizer, texts, max_length, mode)
+    tokenize_seconds = time.perf_counter() - start
+    classify_seconds = 0.0
+    num_labels = model.config.num_labels
+    totals = torch.zeros(len(texts), num_labels)
+    weights = torch.zeros(len(texts), 1)
+
+    for bucket in length_buckets(pieces, batch_size):
+        ids = [pieces[i][1] for i in bucket]
+        lengths = [len(x) for x in ids]
+        padding_stats.record(lengths)
+        observe_padding(lengths, padding_stats.snapshot()["padding_waste"])
+        MODEL_BATCH_SIZE.labels("classifier").observe(len(bucket))
+
+        start = time.perf_counter()
+        batch = tokenizer.pad({"input_ids": ids}, return_tensors="pt")
+        padded = time.perf_counter()
+        with torch.no_grad():
+            logits = model(**batch).logits
+        tokenize_seconds += padded - start
+        classify_seconds += time.perf_counter() - padded
+
+        owners = torch.tensor([pieces[i][0] for i in bucket])
+        sizes = torch.tensor(lengths, dtype=torch.float32).unsqueeze(1)
+        totals.index_add_(0, owners, logits * sizes)
+        weights.index_add_(0, owners, sizes)
+
+    STAGE_LATENCY.labels("tokenize").observe(tokenize_seconds)
+    STAGE_LATENCY.labels("classify").observe(classify_seconds)
+    return totals / weights.clamp(min=1)
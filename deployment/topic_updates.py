@@ -0,0 +1,333 @@
+"""
+Incremental updates for the BERTopic review labeler.
+
+The served topic model (see registry.py) was fitted once on the whole
+corpus. Instead of refitting it (fit_topics.py at the repo root), new
+reviews are handled like this:
+
+  * `TopicUpdater.assign` puts each review in its closest existing topic
+    (the same topic-embedding similarity the saved model's transform uses).
+    Reviews that land in the outlier topic, or that are not similar enough
+    to any topic, are appended to outliers.jsonl, one queue shared by all
+    workers (appends hold an flock, so none are lost);
+  * once enough outliers have piled up, `update` clusters only that batch
+    and folds the new clusters into the model with BERTopic.merge_models.
+    Clusters too close to an existing topic are not added. Only the reviews
+    HDBSCAN leaves as noise stay queued for the next round;
+  * new topics are labeled from their keywords and get their
+    representative docs. The merged model is published to the registry as
+    a new topic version and promoted, so every worker's registry watcher
+    loads it and swaps it in. Published versions are never modified.
+
+Only one process updates at a time: an update holds an flock on
+outliers.jsonl.update, and is skipped when another process holds it or
+has already published a newer version.
+
+An update costs one embedding pass and one UMAP/HDBSCAN fit over the
+outlier batch, plus a comparison against the existing topic embeddings;
+it does not depend on how many reviews the model was originally fitted on.
+
+TOPIC_UPDATES=queue only records the outliers, for a nightly
+`python topic_updates.py` run (the app can keep serving meanwhile);
+TOPIC_UPDATES=auto also runs the updates in a background thread of the app.
+
+    python topic_updates.py             # run one update from the saved outliers
+"""
+import argparse
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from bertopic import BERTopic
+from bertopic.representation import KeyBERTInspired
+from hdbscan import HDBSCAN
+from sklearn.metrics.pairwise import cosine_similarity
+from umap import UMAP
+
+from artifacts import EMBEDDINGS_FILE, load_rep_docs, save_rep_docs
+from registry import REGISTRY_DIR, ModelRegistry
+
+# Not inside a model version: the queue outlives the versions it leads to
+OUTLIERS_FILE = os.environ.get("TOPIC_OUTLIERS", "./models/labeling/outliers.jsonl")
+
+# A review is an outlier when its best topic similarity is below this
+OUTLIER_SIMILARITY = float(os.environ.get("TOPIC_OUTLIER_SIMILARITY", 0.0))
+# Outliers needed before an update clusters them, and the minimum time between updates
+UPDATE_MIN_DOCS = int(os.environ.get("TOPIC_UPDATE_MIN_DOCS", 200))
+UPDATE_INTERVAL = float(os.environ.get("TOPIC_UPDATE_INTERVAL", 3600))
+# New clusters at least this similar to an existing topic are not added (merge_models' min_similarity)
+MERGE_SIMILARITY = 0.7
+MIN_CLUSTER_SIZE = 6
+MAX_PENDING = 20000
+
+
+def keyword_label(topic_model, topic_id):
+    """Label from the topic's top KeyBERT keywords, else its c-TF-IDF words."""
+    aspects = topic_model.topic_aspects_ or {}
+    words = aspects.get("KeyBERT", {}).get(topic_id) or topic_model.topic_representations_.get(topic_id) or []
+    label = " / ".join(word for word, _ in words[:3] if word).title()
+    return label or topic_model.topic_labels_.get(topic_id, "Unknown Topic")
+
+
+@contextmanager
+def file_lock(path, blocking=True):
+    """Exclusive flock on `path` across processes; yields False if not blocking and it is taken."""
+    with open(path, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class OutlierStore:
+    """
+    Reviews no topic claimed yet, in a JSON Lines file every worker appends
+    to. The file is the only state: appends and rewrites hold an flock on
+    <path>.lock, and a rewrite replaces the file whole.
+    """
+
+    def __init__(self, path=OUTLIERS_FILE, max_pending=MAX_PENDING):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.max_pending = max_pending
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.recent = set()     # texts this process queued, so repeats skip the file
+        self.counted = (None, 0, 0)     # (inode, bytes, lines) of the file as last counted
+
+    def __len__(self):
+        """Queued lines, reading only what was appended since the last call."""
+        with self.lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return 0
+            inode, size, lines = self.counted
+            if st.st_ino != inode or st.st_size < size:
+                size, lines = 0, 0
+            if st.st_size > size:
+                with open(self.path, "rb") as f:
+                    f.seek(size)
+                    lines += f.read(st.st_size - size).count(b"\n")
+            self.counted = (st.st_ino, st.st_size, lines)
+            return lines
+
+    def add(self, texts):
+        with self.lock:
+            new = [text for text in dict.fromkeys(texts) if text not in self.recent]
+            if len(self.recent) > self.max_pending:
+                self.recent.clear()
+            self.recent.update(new)
+        if not new:
+            return
+        lines = "".join(json.dumps({"text": text}, ensure_ascii=False) + "\n" for text in new)
+        with file_lock(self.lock_path):
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        # Some slack, so a full queue isn't rewritten on every append
+        if len(self) > self.max_pending * 1.1:
+            self._rewrite(lambda texts: texts)
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding="utf-8") as f:
+            # Several workers may have queued the same review
+            return list(dict.fromkeys(json.loads(line)["text"] for line in f if line.strip()))
+
+    def snapshot(self):
+        with file_lock(self.lock_path):
+            return self._read()
+
+    def _rewrite(self, keep):
+        """Replace the file with keep(queued texts), newest `max_pending` only."""
+        with file_lock(self.lock_path):
+            texts = keep(self._read())[-self.max_pending:]
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps({"text": text}, ensure_ascii=False) + "\n" for text in texts)
+            os.replace(tmp, self.path)
+
+    def remove(self, texts):
+        """Drop `texts` (clustered by an update), keeping anything added meanwhile."""
+        done = set(texts)
+        self._rewrite(lambda queued: [text for text in queued if text not in done])
+
+
+class TopicUpdater:
+    """Serves topic assignments and folds clusters of outliers into the model."""
+
+    def __init__(self, model, rep_docs, model_dir, outlier_similarity=OUTLIER_SIMILARITY,
+                 record_outliers=True, reduced_embeddings=None, registry=None, outliers=None):
+        self.model = model
+        self.rep_docs = rep_docs
+        self.reduced_embeddings = reduced_embeddings
+        self.model_dir = model_dir
+        self.outlier_similarity = outlier_similarity
+        self.record_outliers = record_outliers
+        self.registry = registry or ModelRegistry()
+        self.id_to_label = self.labels(model)
+        self.outliers = outliers or OutlierStore()
+        self.update_lock = threading.Lock()
+        self.last_update = time.monotonic()
+        self.updates = 0
+        self.topics_added = 0
+
+    @staticmethod
+    def labels(model):
+        custom = model.custom_labels_ or [keyword_label(model, tid) for tid in model.topic_labels_]
+        return dict(zip(model.topic_labels_.keys(), custom))
+
+    def label(self, topic_id):
+        return self.id_to_label.get(int(topic_id), "Unknown Topic")
+
+    def assign(self, docs):
+        """Topic id per review; outliers are queued for the next update."""
+        model = self.model
+        embeddings = model.embedding_model.embed_documents(docs)
+        sims = cosine_similarity(embeddings, np.asarray(model.topic_embeddings_))
+        best = sims.argmax(axis=1)
+        topic_ids = best - model._outliers
+        unassigned = (topic_ids == -1) | (sims[np.arange(len(docs)), best] < self.outlier_similarity)
+        topic_ids[unassigned] = -1
+        if self.record_outliers and unassigned.any():
+            self.outliers.add([doc for doc, outlier in zip(docs, unassigned) if outlier])
+        return topic_ids.tolist()
+
+    def maybe_update(self):
+        """Start an update in the background when enough outliers are waiting."""
+        if time.monotonic() - self.last_update < UPDATE_INTERVAL or len(self.outliers) < UPDATE_MIN_DOCS:
+            return False
+        # Only one update at a time; assignments keep using the current model meanwhile
+        if not self.update_lock.acquire(blocking=False):
+            return False
+        self.last_update = time.monotonic()
+        threading.Thread(target=self._update_locked, name="topic-update", daemon=True).start()
+        return True
+
+    def _update_locked(self):
+        try:
+            self._update()
+        except Exception as e:
+            print(f"⚠️ Topic update failed: {e}")
+        finally:
+            self.update_lock.release()
+
+    def update(self):
+        """Cluster the queued outliers now and merge new topics. Returns the number added."""
+        with self.update_lock:
+            return self._update()
+
+    def _update(self):
+        with file_lock(self.outliers.path + ".update", blocking=False) as locked:
+            if not locked:
+                print("🔄 Topic update skipped: another process is running one")
+                return 0
+            current = self.registry.path("topic", self.registry.current("topic"))
+            if os.path.abspath(current) != os.path.abspath(self.model_dir):
+                # A newer version was published; this model is about to be swapped out
+                return 0
+            return self._merge_outliers()
+
+    def _merge_outliers(self):
+        texts = self.outliers.snapshot()
+        if len(texts) < max(MIN_CLUSTER_SIZE * 2, 10):
+            return 0
+        start = time.perf_counter()
+        base = self.model
+        embeddings = base.embedding_model.embed_documents(texts)
+
+        batch_model = BERTopic(
+            embedding_model=base.embedding_model,
+            umap_model=UMAP(n_neighbors=min(15, len(texts) - 1), n_components=min(6, len(texts) - 2),
+                            min_dist=0.0, metric="cosine", random_state=42, low_memory=True),
+            hdbscan_model=HDBSCAN(min_cluster_size=MIN_CLUSTER_SIZE, metric="euclidean",
+                                  cluster_selection_method="eom"),
+            representation_model={"KeyBERT": KeyBERTInspired()},
+            top_n_words=7,
+        )
+        batch_topics, _ = batch_model.fit_transform(texts, embeddings)
+
+        # Which batch topics merge_models will add, in the order it numbers them
+        sims = cosine_similarity(np.asarray(batch_model.topic_embeddings_),
+                                 np.asarray(base.topic_embeddings_)).max(axis=1)
+        added = [i - batch_model._outliers for i, sim in enumerate(sims)
+                 if sim < MERGE_SIMILARITY and i - batch_model._outliers != -1]
+        clustered = [text for text, topic in zip(texts, batch_topics) if topic != -1]
+        if not added:
+            self.outliers.remove(clustered)
+            print(f"🔄 Topic update: {len(texts)} outliers, no new topics")
+            return 0
+
+        merged = BERTopic.merge_models([base, batch_model], min_similarity=MERGE_SIMILARITY)
+        new_ids = sorted(set(merged.topic_labels_) - set(base.topic_labels_))
+        id_to_label = dict(self.id_to_label)
+        rep_docs = dict(self.rep_docs)
+        for batch_id, topic_id in zip(added, new_ids):
+            id_to_label[topic_id] = keyword_label(batch_model, batch_id)
+            rep_docs[topic_id] = batch_model.representative_docs_.get(batch_id, [])
+        merged.set_topic_labels([id_to_label.get(tid, merged.topic_labels_[tid]) for tid in merged.topic_labels_])
+
+        version = self.publish(merged, rep_docs)
+        self.outliers.remove(clustered)
+        self.updates += 1
+        self.topics_added += len(new_ids)
+        print(f"✅ Topic update: {len(new_ids)} new topics from {len(texts)} outliers "
+              f"in {time.perf_counter() - start:.1f}s, serving topic {version}")
+        return len(new_ids)
+
+    def publish(self, model, rep_docs):
+        """Publish the merged model as a new topic version and promote it; returns the version."""
+        os.makedirs(self.registry.root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".topic-update-", dir=self.registry.root)
+        try:
+            # The merged model has no c-TF-IDF matrix to save; transform doesn't need it
+            model.save(os.path.join(staging, "final"), serialization="safetensors", save_ctfidf=False)
+            save_rep_docs(staging, rep_docs)
+            # The document projection doesn't change with the new topics
+            shutil.copy2(os.path.join(self.model_dir, EMBEDDINGS_FILE), staging)
+            version = self.registry.publish("topic", staging)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        # Every worker's registry watcher (this one's included) swaps it in
+        self.registry.promote("topic", version)
+        return version
+
+    def stats(self):
+        return {
+            "topics": len(self.id_to_label),
+            "pending_outliers": len(self.outliers),
+            "updates": self.updates,
+            "topics_added": self.topics_added,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fold the queued outlier reviews into the topic model")
+    parser.add_argument("--registry", default=REGISTRY_DIR)
+    parser.add_argument("--outliers", default=OUTLIERS_FILE)
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.registry)
+    model_dir = registry.path("topic", registry.current("topic"))
+    model = BERTopic.load(os.path.join(model_dir, "final"))
+    updater = TopicUpdater(model, load_rep_docs(model_dir), model_dir, registry=registry,
+                           outliers=OutlierStore(args.outliers))
+    print(f"🔄 {len(updater.outliers)} outlier reviews queued")
+    added = updater.update()
+    print(f"✅ {added} topics added" if added else "⚠️ No new topics")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Fast sentiment tier: a hashed n-gram logistic regression distilled from the
+DistilBERT classifier (see distill_classifier.py at the repo root).
+
+Reviews are turned into word unigrams, bigrams and in-word character
+4-grams, hashed into a fixed number of buckets and L2-normalised, so
+scoring is a sparse dot product: microseconds per review on one core.
+
+With CLASSIFIER_TIER=triage the app lets the student answer the reviews it
+is confident about (max probability >= TRIAGE_THRESHOLD) and escalates the
+rest to DistilBERT.
+"""
+import json
+import re
+import zlib
+
+import numpy as np
+
+NUM_FEATURES = 1 << 18
+CHAR_NGRAM = 4
+WORD_RE = re.compile(r"[^\W_]+|[!?]")
+DEFAULT_THRESHOLD = 0.9
+
+
+def features(text, num_features=NUM_FEATURES):
+    """(indices, values) of the L2-normalised hashed n-gram counts of `text`."""
+    words = WORD_RE.findall(text.lower())
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    grams += [f"#{w[i:i + CHAR_NGRAM]}" for w in words if len(w) > CHAR_NGRAM
+              for i in range(len(w) - CHAR_NGRAM + 1)]
+    if not grams:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    # crc32 rather than hash(): it has to match between training and serving processes
+    hashed = np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.int64, count=len(grams))
+    indices, counts = np.unique(hashed % num_features, return_counts=True)
+    return indices, (counts / np.sqrt(np.dot(counts, counts))).astype(np.float32)
+
+
+class HashedNgramClassifier:
+    def __init__(self, weights, bias=0.0, threshold=DEFAULT_THRESHOLD, meta=None):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = float(bias)
+        self.threshold = float(threshold)
+        self.meta = meta or {}
+
+    def logits(self, texts):
+        out = np.empty(len(texts), dtype=np.float32)
+        for i, text in enumerate(texts):
+            indices, values = features(text, len(self.weights))
+            out[i] = np.dot(self.weights[indices], values) + self.bias
+        return out
+
+    def predict_proba(self, texts):
+        """Probability of "positive" for each text."""
+        return 1.0 / (1.0 + np.exp(-self.logits(texts)))
+
+    def save(self, path):
+        np.savez_compressed(path, weights=self.weights, bias=np.float32(self.bias),
+                            threshold=np.float32(self.threshold), meta=np.array(json.dumps(self.meta)))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["weights"], float(data["bias"]), float(data["threshold"]), json.loads(str(data["meta"])))
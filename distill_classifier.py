@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Distill the DistilBERT review classifier into the hashed n-gram student
+served by deployment/triage.py.
+
+The teacher (the exported model in deployment/models/classification)
+scores every review of the corpora once. Its logits are cached per corpus,
+so the student can be re-tuned without re-running DistilBERT. The student
+is then fitted to the teacher's temperature-softened probabilities with
+AdaGrad. A held-out split picks the confidence threshold at which the
+student agrees with the teacher on at least --target-agreement of the
+reviews it keeps; those are the reviews it may answer alone.
+
+    python distill_classifier.py courses_events_review.json services_review.json reviews.json
+    CLASSIFIER_TIER=triage python deployment/app.py      # serve with the fast tier
+
+Writes deployment/models/triage/student.npz and distill_report.json.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from safetensors.torch import load_file
+from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+
+from review_corpus import read_texts
+
+DEPLOYMENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "deployment")
+sys.path.insert(0, DEPLOYMENT_DIR)
+from tokenization import predict_logits  # noqa: E402
+from triage import NUM_FEATURES, HashedNgramClassifier, features  # noqa: E402
+
+DATA_FILES = ["courses_events_review.json", "services_review.json"]
+TEACHER_DIR = os.path.join(DEPLOYMENT_DIR, "models", "classification")
+OUTPUT_DIR = os.path.join(DEPLOYMENT_DIR, "models", "triage")
+CACHE_DIR = os.path.join(".cache", "teacher_logits")
+
+TEMPERATURE = 2.0
+EPOCHS = 8
+LEARNING_RATE = 0.5
+L2 = 1e-6
+
+
+def load_teacher(model_dir=TEACHER_DIR):
+    """The classifier exactly as deployment/app.py loads it."""
+    with open(os.path.join(model_dir, "finalReviewClassifierConfig.json")) as f:
+        config = AutoConfig.from_pretrained("distilbert-base-uncased", **json.load(f))
+    model = AutoModelForSequenceClassification.from_config(config)
+    model.load_state_dict(load_file(os.path.join(model_dir, "finalReviewClassifier.safetensors")))
+    model.eval()
+    return model, AutoTokenizer.from_pretrained("distilbert-base-uncased")
+
+
+def teacher_logits(texts, model_dir=TEACHER_DIR, cache_dir=CACHE_DIR):
+    """(logits array, reviews/s or None when read from the cache)."""
+    digest = hashlib.sha256()
+    digest.update(str(os.path.getmtime(os.path.join(model_dir, "finalReviewClassifier.safetensors"))).encode())
+    for text in texts:
+        digest.update(text.encode("utf-8") + b"\0")
+    path = os.path.join(cache_dir, digest.hexdigest()[:16] + ".npy")
+    if os.path.exists(path):
+        return np.load(path), None
+
+    model, tokenizer = load_teacher(model_dir)
+    start = time.perf_counter()
+    logits = predict_logits(model, tokenizer, texts, mode="chunk").numpy()
+    speed = len(texts) / (time.perf_counter() - start)
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(path, logits)
+    return logits, speed
+
+
+def soft_targets(logits, temperature=TEMPERATURE):
+    """Teacher probability of "positive" at the given temperature."""
+    scaled = logits / temperature
+    scaled -= scaled.max(axis=1, keepdims=True)
+    probs = np.exp(scaled)
+    return probs[:, 1] / probs.sum(axis=1)
+
+
+def train_student(feats, targets, epochs=EPOCHS, lr=LEARNING_RATE, l2=L2, seed=42):
+    """Logistic regression on soft targets with per-feature AdaGrad steps."""
+    rng = np.random.default_rng(seed)
+    weights = np.zeros(NUM_FEATURES, dtype=np.float32)
+    grad_sq = np.full(NUM_FEATURES, 1e-8, dtype=np.float32)
+    bias, bias_grad_sq = 0.0, 1e-8
+    for _ in range(epochs):
+        for i in rng.permutation(len(feats)):
+            indices, values = feats[i]
+            z = float(np.dot(weights[indices], values)) + bias
+            error = 1.0 / (1.0 + np.exp(-z)) - targets[i]
+            grad = error * values + l2 * weights[indices]
+            grad_sq[indices] += grad * grad
+            weights[indices] -= lr * grad / np.sqrt(grad_sq[indices])
+            bias_grad_sq += error * error
+            bias -= lr * error / np.sqrt(bias_grad_sq)
+    return weights, bias
+
+
+def pick_threshold(probs, teacher_labels, target_agreement):
+    """Lowest confidence threshold whose kept reviews agree with the teacher often enough."""
+    confidence = np.maximum(probs, 1 - probs)
+    agree = (probs >= 0.5) == teacher_labels
+    order = np.argsort(-confidence)
+    running = np.cumsum(agree[order]) / np.arange(1, len(order) + 1)
+    ok = np.nonzero(running >= target_agreement)[0]
+    if len(ok) == 0:
+        return 1.0, 0.0, None
+    # Last prefix that still meets the target
+    last = ok[-1]
+    return float(confidence[order[last]]), (last + 1) / len(order), float(running[last])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill the review classifier into the fast triage student")
+    parser.add_argument("files", nargs="*", default=DATA_FILES, help="JSON/JSON Lines review corpora with a text field")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--teacher-dir", default=TEACHER_DIR)
+    parser.add_argument("--temperature", type=float, default=TEMPERATURE)
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--holdout", type=float, default=0.1, help="share of reviews used to pick the threshold")
+    parser.add_argument("--target-agreement", type=float, default=0.98)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    texts = read_texts(args.files)
+    print(f"🔄 Scoring {len(texts)} reviews with the teacher...")
+    logits, teacher_speed = teacher_logits(texts, args.teacher_dir)
+    targets = soft_targets(logits, args.temperature)
+    teacher_labels = logits.argmax(axis=1) == 1
+
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(texts))
+    n_holdout = max(1, int(len(texts) * args.holdout))
+    holdout, train = order[:n_holdout], order[n_holdout:]
+
+    start = time.perf_counter()
+    feats = [features(text) for text in texts]
+    weights, bias = train_student([feats[i] for i in train], targets[train], args.epochs, seed=args.seed)
+    train_seconds = time.perf_counter() - start
+
+    student = HashedNgramClassifier(weights, bias)
+    start = time.perf_counter()
+    probs = student.predict_proba([texts[i] for i in holdout])
+    student_speed = len(holdout) / (time.perf_counter() - start)
+
+    threshold, coverage, kept_agreement = pick_threshold(probs, teacher_labels[holdout], args.target_agreement)
+    student.threshold = threshold
+    student.meta = {
+        "teacher": os.path.abspath(args.teacher_dir),
+        "reviews": len(texts),
+        "temperature": args.temperature,
+        "epochs": args.epochs,
+        "holdout_agreement": float(np.mean((probs >= 0.5) == teacher_labels[holdout])),
+        "holdout_coverage": coverage,
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+    student.save(os.path.join(args.output_dir, "student.npz"))
+
+    report = {
+        **student.meta,
+        "threshold": threshold,
+        "kept_agreement": kept_agreement,
+        "train_seconds": round(train_seconds, 2),
+        "student_reviews_per_second": round(student_speed, 1),
+        "teacher_reviews_per_second": round(teacher_speed, 1) if teacher_speed else "cached",
+    }
+    with open(os.path.join(args.output_dir, "distill_report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"✅ Student saved to '{args.output_dir}'. With TRIAGE_THRESHOLD={threshold:.3f} it answers "
+          f"{coverage:.0%} of reviews alone")
+
+
+if __name__ == "__main__":
+    main()
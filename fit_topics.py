@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Refit the BERTopic review labeler and export it for deployment/app.py.
+
+Script version of TopicModeling.ipynb: same embedding model, UMAP/HDBSCAN
+settings and KeyBERT + MMR representations, with these changes:
+
+  * review embeddings are cached on disk, keyed by their text, so a refit
+    only embeds reviews that were not there last time;
+  * everything runs on CPU. Topics are labeled from their KeyBERT keywords
+    by default, or with a small local model (--label-model) instead of the
+    4-bit Llama-2-7B, which needs a GPU;
+  * the model, representative docs and 2D embeddings are written (in the
+    pickle-free formats of deployment/artifacts.py) to a staging directory
+    and published as a new topic version of the model registry
+    (deployment/registry.py), then promoted, so the running app loads and
+    swaps it in. Nothing already served is modified.
+
+    python fit_topics.py courses_events_review.json services_review.json
+    python fit_topics.py data/*.json --label-model google/flan-t5-base --threads 8
+    python fit_topics.py --no-promote     # publish only, e.g. to shadow it first
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import torch
+from bertopic import BERTopic
+from bertopic.representation import KeyBERTInspired, MaximalMarginalRelevance, TextGeneration
+from hdbscan import HDBSCAN
+from sentence_transformers import SentenceTransformer
+from transformers import pipeline
+from umap import UMAP
+
+from review_corpus import read_texts
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "deployment"))
+from artifacts import save_embeddings, save_rep_docs  # noqa: E402
+from registry import ModelRegistry  # noqa: E402
+
+EMBEDDING_MODEL = "BAAI/bge-small-en"
+DATA_FILES = ["courses_events_review.json", "services_review.json"]
+REGISTRY_DIR = os.path.join("deployment", "models", "registry")
+CACHE_DIR = os.path.join(".cache", "topic_embeddings")
+
+# Shorter than the notebook's Llama-2 prompt: small models follow it better without the chat template
+LABEL_PROMPT = """The following student reviews talk about a common topic:
+[DOCUMENTS]
+The topic is described by the following keywords: '[KEYWORDS]'.
+Write a short label (2 to 5 words) for this topic. Only return the label."""
+
+
+class EmbeddingCache:
+    """Document embeddings on disk (embeddings.npy + keys.json), one row per review text."""
+
+    def __init__(self, model, model_name, cache_dir=CACHE_DIR):
+        self.model = model
+        self.dir = os.path.join(cache_dir, model_name.replace("/", "--"))
+        self.cache = {}
+        keys_path = os.path.join(self.dir, "keys.json")
+        vectors_path = os.path.join(self.dir, "embeddings.npy")
+        if os.path.exists(keys_path) and os.path.exists(vectors_path):
+            with open(keys_path) as f:
+                keys = json.load(f)
+            self.cache = dict(zip(keys, np.load(vectors_path)))
+
+    @staticmethod
+    def key(text):
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def embed(self, texts, batch_size=64):
+        """(embeddings in `texts` order, number of texts that had to be embedded)."""
+        keys = [self.key(text) for text in texts]
+        missing = [i for i, key in enumerate(keys) if key not in self.cache]
+        if missing:
+            vectors = self.model.encode([texts[i] for i in missing], batch_size=batch_size,
+                                        show_progress_bar=True, convert_to_numpy=True).astype(np.float32)
+            self.cache.update(zip((keys[i] for i in missing), vectors))
+
+        # Keep only the reviews still in the corpus
+        self.cache = {key: self.cache[key] for key in keys}
+        os.makedirs(self.dir, exist_ok=True)
+        embeddings = np.stack([self.cache[key] for key in keys])
+        np.save(os.path.join(self.dir, "embeddings.npy"), embeddings)
+        with open(os.path.join(self.dir, "keys.json"), "w") as f:
+            json.dump(keys, f)
+        return embeddings, len(missing)
+
+
+def build_model(embedding_model, label_model=None, seed=42, threads=None):
+    umap_model = UMAP(n_neighbors=15, n_components=6, min_dist=0.0, metric="cosine", random_state=seed,
+                      low_memory=True)
+    hdbscan_model = HDBSCAN(min_cluster_size=6, metric="euclidean", cluster_selection_method="eom",
+                            prediction_data=True, core_dist_n_jobs=threads or -1)
+    representation_model = {
+        "KeyBERT": KeyBERTInspired(),
+        "MMR": MaximalMarginalRelevance(diversity=0.3),
+    }
+    if label_model:
+        task = "text2text-generation" if "t5" in label_model.lower() else "text-generation"
+        generator = pipeline(task, model=label_model, device=-1)
+        representation_model["LLM"] = TextGeneration(generator, prompt=LABEL_PROMPT, nr_docs=3, doc_length=60,
+                                                     tokenizer="whitespace",
+                                                     pipeline_kwargs={"max_new_tokens": 16, "do_sample": False})
+    return BERTopic(
+        embedding_model=embedding_model,
+        umap_model=umap_model,
+        hdbscan_model=hdbscan_model,
+        representation_model=representation_model,
+        top_n_words=7,
+        verbose=True,
+    )
+
+
+def topic_labels(topic_model):
+    """One label per topic, in topic_labels_ order: the LLM's, else the top KeyBERT keywords."""
+    aspects = topic_model.get_topics(full=True)
+    labels = []
+    for topic_id in topic_model.topic_labels_:
+        label = ""
+        if "LLM" in aspects:
+            label = aspects["LLM"][topic_id][0][0].split("\n")[0].strip().strip('"')
+        if not label:
+            words = [word for word, _ in aspects["KeyBERT"][topic_id][:3] if word]
+            label = " / ".join(words).title() or topic_model.topic_labels_[topic_id]
+        labels.append(label)
+    return labels
+
+
+def export(topic_model, reduced_embeddings, report, registry, embedding_model_name, promote=True):
+    """Publish the artifacts app.py loads as a new topic version; returns the version."""
+    os.makedirs(registry.root, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".fit-topics-", dir=registry.root)
+    try:
+        topic_model.save(os.path.join(staging, "final"), serialization="safetensors", save_ctfidf=True,
+                         save_embedding_model=embedding_model_name)
+        save_rep_docs(staging, topic_model.representative_docs_)
+        save_embeddings(staging, reduced_embeddings.astype(np.float32))
+        with open(os.path.join(staging, "topic_report.json"), "w") as f:
+            json.dump(report, f, indent=2)
+        version = registry.publish("topic", staging)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    if promote:
+        registry.promote("topic", version)
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refit the BERTopic review labeler and export it for deployment")
+    parser.add_argument("files", nargs="*", default=DATA_FILES, help="JSON/JSON Lines review corpora with a text field")
+    parser.add_argument("--registry", default=REGISTRY_DIR, help="model registry to publish the new version to")
+    parser.add_argument("--no-promote", action="store_true", help="publish without serving it")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--embedding-model", default=EMBEDDING_MODEL)
+    parser.add_argument("--label-model", help="small local generation model for the labels (default: KeyBERT keywords)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--threads", type=int, help="torch CPU threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    started = time.perf_counter()
+
+    reviews = read_texts(args.files)
+    embedding_model = SentenceTransformer(args.embedding_model, device="cpu")
+    start = time.perf_counter()
+    embeddings, embedded = EmbeddingCache(embedding_model, args.embedding_model, args.cache_dir).embed(reviews)
+    embed_seconds = time.perf_counter() - start
+    print(f"✅ Embeddings ready: {embedded} new, {len(reviews) - embedded} from cache")
+
+    start = time.perf_counter()
+    topic_model = build_model(embedding_model, args.label_model, args.seed, args.threads)
+    topic_model.fit_transform(reviews, embeddings)
+    topic_model.set_topic_labels(topic_labels(topic_model))
+    fit_seconds = time.perf_counter() - start
+
+    # 2D projection kept next to the model for plotting, as in the notebook
+    start = time.perf_counter()
+    reduced_embeddings = UMAP(n_neighbors=15, n_components=2, min_dist=0.0, metric="cosine",
+                              random_state=args.seed, low_memory=True).fit_transform(embeddings)
+    reduce_seconds = time.perf_counter() - start
+
+    report = {
+        "data_files": args.files,
+        "reviews": len(reviews),
+        "embedded": embedded,
+        "topics": len(topic_model.topic_labels_) - (-1 in topic_model.topic_labels_),
+        "outliers": int(sum(topic == -1 for topic in topic_model.topics_)),
+        "labels": dict(zip(map(str, topic_model.topic_labels_), topic_model.custom_labels_)),
+        "label_model": args.label_model or "keybert",
+        "embed_seconds": round(embed_seconds, 2),
+        "fit_seconds": round(fit_seconds, 2),
+        "reduce_seconds": round(reduce_seconds, 2),
+        "total_seconds": round(time.perf_counter() - started, 2),
+    }
+    version = export(topic_model, reduced_embeddings, report, ModelRegistry(args.registry), args.embedding_model,
+                     promote=not args.no_promote)
+    print(json.dumps(report, indent=2))
+    if args.no_promote:
+        print(f"✅ Topic model published as topic {version}; serve it with "
+              f"cd deployment && python registry.py promote topic {version}")
+    else:
+        print(f"✅ Topic model published and promoted as topic {version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic student reviews for the sentiment classifier.
+
+Script version of generate_synthetic_data.ipynb. It uses the same prompts,
+tones and JSON Lines output ({"text", "label"}, label 1 = positive), but:
+
+  * prompts go through the pipeline in batches instead of one call per review;
+  * each accepted review is appended to the output file as soon as its batch
+    is done, so a crash loses at most one batch;
+  * re-running resumes: reviews already in the file count towards the target
+    and seed the duplicate filter;
+  * near-identical generations (small models repeat themselves a lot) are
+    dropped with a MinHash/LSH filter over word shingles.
+
+    python generate_synthetic_data.py --per-class 500
+    python generate_synthetic_data.py --model ./models/qwen2.5-0.5b-instruct --batch-size 4
+
+Runs on CPU when no GPU is available; a small local instruct model keeps
+that practical. Gated Hub models read the token from HF_TOKEN.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+import torch
+from transformers import pipeline
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "deployment"))
+from minhash import MinHashLSH, words  # noqa: E402
+
+DEFAULT_MODEL = "meta-llama/Llama-3.2-1B-Instruct"
+OUTPUT_FILE = "reviews.json"
+
+labels = ["positive", "negative"]
+tones = {
+    "positive": ["enthusiastic", "gushing", "casual", "grateful"],
+    "negative": ["frustrated", "sarcastic", "disappointed", "blunt"]
+}
+
+gen_review_messages = lambda x: [
+    {
+        "role": "user",
+        "content": f"""
+Write a short, realistic, and specific review (3 to 6 lines) from a **student** who attended a course or event.
+The review should be clearly **{x}** in tone — do not include mixed feelings.
+Use a **{random.choice(tones[x])}** writing style.
+
+If the review is positive, explain what made it valuable or enjoyable.
+If negative, describe what was disappointing or frustrating — be specific, and **don’t soften the critique**.
+
+Keep the voice natural and conversational. You can use casual expressions, slang, humor, or even minor typos.
+Do not use names or placeholders."""
+    },
+    {"role": "assistant", "content": "review:"}
+]
+
+# Generation settings from the notebook; 3 to 6 lines fit well within 192 tokens
+GENERATION = {"max_new_tokens": 192, "top_k": 60, "top_p": 0.85, "do_sample": True}
+
+MIN_CHARS = 40
+MAX_CHARS = 1200
+PREFIX_RE = re.compile(r"^\W*review\W*:\s*", re.IGNORECASE)
+PLACEHOLDER_RE = re.compile(r"\[[^\]]*\]|\{[^}]*\}|<[^>]*>")
+
+# Estimated Jaccard similarity of the word shingles (deployment/minhash.py) at
+# which a generation counts as a near-duplicate of one already kept
+THRESHOLD = 0.7
+
+
+class NearDuplicateFilter:
+    """Exact and MinHash/LSH near-duplicate check over the reviews kept so far."""
+
+    def __init__(self, threshold=THRESHOLD, seed=0):
+        self.lsh = MinHashLSH(seed)
+        self.threshold = threshold
+        self.exact = set()
+
+    def add(self, text):
+        """Index `text`; False (and not indexed) when it is a near-duplicate of an indexed text."""
+        tokens = words(text)
+        key = " ".join(tokens)
+        if key in self.exact:
+            return False
+        signature = self.lsh.signature(tokens)
+        if self.lsh.best_match(signature, self.threshold) is not None:
+            return False
+
+        self.lsh.add(signature)
+        self.exact.add(key)
+        return True
+
+
+def clean_review(generated):
+    """Review text from a generation, or None if it should be rejected."""
+    text = PREFIX_RE.sub("", generated.strip()).strip().strip('"').strip()
+    if not MIN_CHARS <= len(text) <= MAX_CHARS or PLACEHOLDER_RE.search(text):
+        return None
+    return text
+
+
+def load_existing(path, dedup):
+    """Per-label counts of the reviews already in `path`, registering them with `dedup`."""
+    counts = {label: 0 for label in labels}
+    if not os.path.exists(path):
+        return counts
+    # Drop a partially written last line left by an interrupted run
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            dedup.add(record["text"])
+            counts["positive" if record["label"] == 1 else "negative"] += 1
+    return counts
+
+
+def load_generator(model, threads=None):
+    if threads:
+        torch.set_num_threads(threads)
+    cuda = torch.cuda.is_available()
+    generator = pipeline("text-generation", model=model, device=0 if cuda else -1,
+                         torch_dtype=torch.float16 if cuda else torch.float32, token=os.environ.get("HF_TOKEN"))
+    # Batched generation needs padding on the left of decoder-only prompts
+    generator.tokenizer.padding_side = "left"
+    if generator.tokenizer.pad_token is None:
+        generator.tokenizer.pad_token = generator.tokenizer.eos_token
+    return generator
+
+
+def generate_dataset(generator, num_samples_per_class=50, output=OUTPUT_FILE, batch_size=8, max_attempts=4):
+    """
+    Append reviews to `output` until it holds `num_samples_per_class` per label.
+    Gives up on a label after `max_attempts` times its missing count in generations.
+    """
+    dedup = NearDuplicateFilter()
+    counts = load_existing(output, dedup)
+    print(f"Resuming with {counts} reviews in '{output}'")
+    rejected = {"invalid": 0, "duplicate": 0}
+
+    with open(output, "a", encoding="utf-8") as f:
+        for label in labels:
+            missing = num_samples_per_class - counts[label]
+            budget = max(0, missing) * max_attempts
+            while counts[label] < num_samples_per_class and budget > 0:
+                size = min(batch_size, budget)
+                budget -= size
+                start = time.perf_counter()
+                results = generator([gen_review_messages(label) for _ in range(size)],
+                                    batch_size=size, **GENERATION)
+                for result in results:
+                    review = clean_review(result[0]["generated_text"][-1]["content"])
+                    if review is None:
+                        rejected["invalid"] += 1
+                    elif not dedup.add(review):
+                        rejected["duplicate"] += 1
+                    elif counts[label] < num_samples_per_class:
+                        f.write(json.dumps({"text": review, "label": 1 if label == "positive" else 0},
+                                           ensure_ascii=False) + "\n")
+                        counts[label] += 1
+                f.flush()
+                os.fsync(f.fileno())
+                print(f"{label}: {counts[label]}/{num_samples_per_class} "
+                      f"({size / (time.perf_counter() - start):.2f} reviews/s, rejected {rejected})")
+            if counts[label] < num_samples_per_class:
+                print(f"⚠️ Stopped {label} at {counts[label]} reviews: too many rejected generations")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic student reviews as JSON Lines")
+    parser.add_argument("--per-class", type=int, default=50, help="target number of reviews per label")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Hub id or local path of an instruct model")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--threads", type=int, help="torch CPU threads")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+        torch.manual_seed(args.seed)
+
+    generator = load_generator(args.model, args.threads)
+    counts = generate_dataset(generator, args.per_class, args.output, args.batch_size)
+    print(f"✅ '{args.output}' holds {counts['positive']} positive and {counts['negative']} negative reviews")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Review corpora shared by the offline scripts (fit_topics.py, distill_classifier.py).
+"""
+import json
+
+
+def read_texts(paths):
+    """Review texts (deduplicated, in order) from JSON Lines or JSON array files."""
+    texts, seen = [], set()
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+        try:
+            records = json.loads(content)
+            records = records if isinstance(records, list) else [records]
+        except json.JSONDecodeError:
+            records = [json.loads(line) for line in content.splitlines() if line.strip()]
+        for record in records:
+            text = record.get("text") if isinstance(record, dict) else record
+            if isinstance(text, str) and text.strip() and text not in seen:
+                seen.add(text)
+                texts.append(text)
+    return texts
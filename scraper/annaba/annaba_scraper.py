@@ -82,7 +82,7 @@ def extract_faculties(soup):
             faculties.append({"name": name, "link": href})
     return faculties
 
-def main():
+def scrape_annaba():
     soup = fetch_soup(BASE_URL)
 
     # 1) News
@@ -96,12 +96,16 @@ def main():
     # 3) Faculties
     faculties = extract_faculties(soup)             # :contentReference[oaicite:1]{index=1}
 
-    data = {
+    return {
         "news":      news,
         "events":    events,
         "faculties": faculties
     }
 
+def main():
+    data = scrape_annaba()
+    news, events, faculties = data["news"], data["events"], data["faculties"]
+
     # Write out to JSON
     with open("annaba.json", "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
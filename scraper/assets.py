@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Mirror the images referenced by scraped news and events.
+
+The El Oued, ENSIA, Ghardaia and Annaba outputs point at images on the
+universities' own (slow) servers, in `image` or `image_url` fields (the
+Ghardaia ones still wrapped in CSS url('...')). This stage:
+
+  * downloads every referenced image concurrently over a keep-alive
+    session, at most HOST_CONNECTIONS at a time per host;
+  * stores each one under assets/originals by the SHA-256 of its content,
+    so the same picture behind several URLs is kept once;
+  * makes a JPEG thumbnail of each new picture in a process pool, so
+    resizing runs on every core while downloads continue;
+  * writes `image_local` and `thumbnail_local` next to the remote URL in
+    the scraper outputs (and in merged_records.jsonl with --merged).
+
+assets/manifest.json maps each URL to its content hash, so re-runs only
+download URLs that were not mirrored yet, and only make the thumbnails
+missing at the current --thumb-size. A download Pillow can't decode is not
+kept: its original is deleted and its URLs stay in the manifest marked
+undecodable, so they are not fetched again (delete those entries to retry).
+Records whose picture is not mirrored lose any stale local fields.
+Scrapers rewrite their outputs without the local fields, so run this after
+them (it is cheap on re-runs).
+
+    python assets.py                             # mirror, local URLs under /assets
+    python assets.py --base-url https://cdn.example.org/assets --merged
+"""
+import argparse
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import requests
+from PIL import Image, ImageOps
+
+from merge import OUTPUT_FILE as MERGED_FILE
+from sources import SCRAPER_DIR
+
+ASSET_DIR = os.path.join(SCRAPER_DIR, "assets")
+BASE_URL = "/assets"
+
+# Scraper outputs holding news/event records, with the indent their scraper writes them with
+ASSET_SOURCES = [
+    ("el_oued/eloued_events.json", 4),
+    ("el_oued/eloued_news.json", 4),
+    ("ensia/ensia_news.json", 4),
+    ("ghardaia/faculties.json", 2),
+    ("annaba/annaba.json", 2),
+]
+IMAGE_FIELDS = ("image", "image_url")
+LOCAL_FIELDS = ("image_local", "thumbnail_local")
+CSS_URL_RE = re.compile(r"""^url\(\s*['"]?(.*?)['"]?\s*\)$""")
+
+DOWNLOAD_WORKERS = 8
+HOST_CONNECTIONS = 2
+TIMEOUT = 20
+MAX_BYTES = 15 * 1024 * 1024
+THUMB_SIZE = 400
+THUMB_QUALITY = 80
+HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                   "AppleWebKit/537.36 (KHTML, like Gecko) "
+                   "Chrome/113.0.0.0 Safari/537.36")
+}
+
+
+def image_url(value):
+    """The absolute http(s) URL in an image field, or None."""
+    if not isinstance(value, str):
+        return None
+    value = value.strip().strip("'\"")
+    match = CSS_URL_RE.match(value)
+    if match:
+        value = match.group(1)
+    return value if urlsplit(value).scheme in ("http", "https") else None
+
+
+def image_records(data):
+    """Every dict in `data` (recursively) that has an image field."""
+    if isinstance(data, list):
+        for item in data:
+            yield from image_records(item)
+    elif isinstance(data, dict):
+        if any(image_url(data.get(field)) for field in IMAGE_FIELDS):
+            yield data
+        for value in data.values():
+            if isinstance(value, (list, dict)):
+                yield from image_records(value)
+
+
+def record_url(record):
+    for field in IMAGE_FIELDS:
+        url = image_url(record.get(field))
+        if url:
+            return url
+    return None
+
+
+def make_thumbnail(source, target, size=THUMB_SIZE, quality=THUMB_QUALITY):
+    """Runs in a worker process. Returns `target`, or None when Pillow can't read the image."""
+    try:
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((size, size))
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            tmp = target + ".tmp"
+            image.save(tmp, "JPEG", quality=quality, optimize=True)
+        os.replace(tmp, target)
+        return target
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+class AssetMirror:
+    def __init__(self, asset_dir=ASSET_DIR, base_url=BASE_URL, workers=DOWNLOAD_WORKERS, thumb_size=THUMB_SIZE):
+        self.asset_dir = asset_dir
+        self.base_url = base_url.rstrip("/")
+        self.workers = workers
+        self.thumb_size = thumb_size
+        self.manifest_path = os.path.join(asset_dir, "manifest.json")
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        self.by_digest = {entry["sha256"]: entry for entry in self.manifest.values() if "original" in entry}
+        self.undecodable = {entry["sha256"] for entry in self.manifest.values() if entry.get("undecodable")}
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.host_slots = {}
+        self.lock = threading.Lock()
+        self.stats = {"urls": 0, "cached": 0, "downloaded": 0, "duplicates": 0, "failed": 0, "thumbnails": 0,
+                      "undecodable": 0}
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            return self.host_slots.setdefault(host, threading.Semaphore(HOST_CONNECTIONS))
+
+    def thumbnail_path(self, entry):
+        # Named after the size, so a different --thumb-size makes new thumbnails
+        digest = entry["sha256"]
+        return os.path.join("thumbs", digest[:2], f"{digest}_{self.thumb_size}.jpg")
+
+    def mirrored(self, url):
+        """True for URLs downloaded before, including those found undecodable."""
+        entry = self.manifest.get(url)
+        if entry is None:
+            return False
+        return entry.get("undecodable", False) or os.path.exists(os.path.join(self.asset_dir, entry["original"]))
+
+    def has_thumbnail(self, url):
+        entry = self.manifest[url]
+        return entry.get("undecodable", False) or os.path.exists(os.path.join(self.asset_dir,
+                                                                              self.thumbnail_path(entry)))
+
+    def discard(self, digest):
+        """Delete a picture Pillow can't read, and mark every URL pointing at it undecodable."""
+        with self.lock:
+            entry = self.by_digest.pop(digest, None)
+            self.undecodable.add(digest)
+            for url in [url for url, known in self.manifest.items() if known["sha256"] == digest]:
+                self.manifest[url] = {"sha256": digest, "undecodable": True}
+        if entry and os.path.exists(os.path.join(self.asset_dir, entry["original"])):
+            os.remove(os.path.join(self.asset_dir, entry["original"]))
+
+    def download(self, url):
+        """Stream `url` to a temp file while hashing it; (digest, ext, temp path) or raises."""
+        with self._host_slot(url):
+            response = self.session.get(url, timeout=TIMEOUT, stream=True)
+            try:
+                response.raise_for_status()
+                content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+                if content_type and not content_type.startswith("image/"):
+                    raise ValueError(f"not an image ({content_type})")
+                digest, size = hashlib.sha256(), 0
+                fd, tmp = tempfile.mkstemp(dir=self.asset_dir, suffix=".part")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        for chunk in response.iter_content(64 * 1024):
+                            size += len(chunk)
+                            if size > MAX_BYTES:
+                                raise ValueError("larger than MAX_BYTES")
+                            digest.update(chunk)
+                            f.write(chunk)
+                except BaseException:
+                    os.remove(tmp)
+                    raise
+            finally:
+                response.close()
+        ext = (mimetypes.guess_extension(content_type) if content_type else None) \
+            or os.path.splitext(urlsplit(url).path)[1].lower()[:6] or ".img"
+        return digest.hexdigest(), ext, tmp
+
+    def store(self, url, digest, ext, tmp):
+        """Keep the download under its content hash; True if the content was new."""
+        with self.lock:
+            known = self.by_digest.get(digest)
+            if digest in self.undecodable:
+                # Same bytes as a picture already found undecodable
+                self.manifest[url] = {"sha256": digest, "undecodable": True}
+                os.remove(tmp)
+                return False
+        original = known["original"] if known else os.path.join("originals", digest[:2], digest + ext)
+        path = os.path.join(self.asset_dir, original)
+        new = not os.path.exists(path)
+        if new:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp, path)
+        else:
+            os.remove(tmp)
+        with self.lock:
+            self.manifest[url] = {"sha256": digest, "original": original}
+            self.by_digest.setdefault(digest, self.manifest[url])
+        return new
+
+    def mirror(self, urls):
+        """Download what isn't mirrored yet and thumbnail the pictures that have none."""
+        os.makedirs(self.asset_dir, exist_ok=True)
+        urls = sorted(set(urls))
+        todo = [url for url in urls if not self.mirrored(url)]
+        self.stats["urls"] += len(urls)
+        self.stats["cached"] += len(urls) - len(todo)
+
+        thumbs, queued = {}, set()
+
+        def thumbnail(url):
+            entry = self.manifest[url]
+            if entry["sha256"] in queued:
+                return
+            queued.add(entry["sha256"])
+            target = os.path.join(self.asset_dir, self.thumbnail_path(entry))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            future = resizers.submit(make_thumbnail, os.path.join(self.asset_dir, entry["original"]),
+                                     target, self.thumb_size)
+            thumbs[future] = entry["sha256"]
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="asset") as downloads, \
+                ProcessPoolExecutor() as resizers:
+            futures = {downloads.submit(self.download, url): url for url in todo}
+            # Mirrored before, but the thumbnail is gone or was never made
+            for url in set(urls) - set(todo):
+                if not self.has_thumbnail(url):
+                    thumbnail(url)
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    digest, ext, tmp = future.result()
+                except (requests.RequestException, ValueError, OSError) as e:
+                    self.stats["failed"] += 1
+                    print(f"Error fetching {url}: {e}")
+                    continue
+                new = self.store(url, digest, ext, tmp)
+                if self.manifest[url].get("undecodable"):
+                    self.stats["undecodable"] += 1
+                elif new:
+                    self.stats["downloaded"] += 1
+                else:
+                    self.stats["duplicates"] += 1
+                if not self.has_thumbnail(url):
+                    thumbnail(url)
+            for future in as_completed(thumbs):
+                if future.result():
+                    self.stats["thumbnails"] += 1
+                else:
+                    # Not a picture after all; dropped rather than served without a thumbnail
+                    self.stats["undecodable"] += 1
+                    self.discard(thumbs[future])
+                    print(f"⚠️ Dropped {thumbs[future][:12]}: Pillow can't decode it")
+
+        self.save_manifest()
+
+    def save_manifest(self):
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    def local_fields(self, url):
+        entry = self.manifest.get(url)
+        if entry is None or entry.get("undecodable"):
+            return {}
+        fields = {"image_local": f"{self.base_url}/{entry['original']}".replace(os.sep, "/")}
+        thumbnail = self.thumbnail_path(entry)
+        if os.path.exists(os.path.join(self.asset_dir, thumbnail)):
+            fields["thumbnail_local"] = f"{self.base_url}/{thumbnail}".replace(os.sep, "/")
+        return fields
+
+    def rewrite(self, records):
+        """
+        Set the local fields on each record, and drop those left from an
+        earlier run that no longer apply; returns how many records changed.
+        """
+        changed = 0
+        for record in records:
+            fields = self.local_fields(record_url(record))
+            if any(record.get(key) != fields.get(key) for key in LOCAL_FIELDS):
+                for key in LOCAL_FIELDS:
+                    if key in fields:
+                        record[key] = fields[key]
+                    else:
+                        record.pop(key, None)
+                changed += 1
+        return changed
+
+
+def load_json_sources(scraper_dir=SCRAPER_DIR):
+    for path, indent in ASSET_SOURCES:
+        path = os.path.join(scraper_dir, path)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                yield path, indent, json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mirror scraped news/event images and write local URLs back")
+    parser.add_argument("--asset-dir", default=ASSET_DIR)
+    parser.add_argument("--base-url", default=BASE_URL, help="URL the asset directory is served under")
+    parser.add_argument("--workers", type=int, default=DOWNLOAD_WORKERS, help="concurrent downloads")
+    parser.add_argument("--thumb-size", type=int, default=THUMB_SIZE, help="thumbnail bounding box in pixels")
+    parser.add_argument("--merged", action="store_true", help="also rewrite merged_records.jsonl")
+    args = parser.parse_args()
+
+    mirror = AssetMirror(args.asset_dir, args.base_url, args.workers, args.thumb_size)
+    sources = list(load_json_sources())
+    merged = []
+    if args.merged and os.path.exists(MERGED_FILE):
+        with open(MERGED_FILE, encoding="utf-8") as f:
+            merged = [json.loads(line) for line in f]
+
+    urls = [record_url(record) for _, _, data in sources for record in image_records(data)]
+    urls += [record_url(record) for record in image_records(merged)]
+    mirror.mirror(urls)
+
+    for path, indent, data in sources:
+        if mirror.rewrite(image_records(data)):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=indent)
+    if merged and mirror.rewrite(image_records(merged)):
+        with open(MERGED_FILE, "w", encoding="utf-8") as f:
+            for record in merged:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    print(json.dumps(mirror.stats, indent=2))
+    print(f"✅ Assets mirrored to '{args.asset_dir}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Crawl benchmark: run the scrapers against the mock sites and measure them.
+
+Every run starts the mock server (mock_sites.py) in this process and each
+scraper in a fresh child process, with its HTTP calls redirected to the
+server and crawl telemetry on. The child reports its own CPU time, peak
+RSS and the telemetry split between network and parsing; the server counts
+the pages it served. Nothing leaves the machine and the scrapers' output
+files are not touched, so numbers are comparable before and after a change
+to fetching or parsing:
+
+    pages/s        pages served / wall time of the scraper call
+    cpu ms/page    the child's CPU time (all threads) per page
+    peak MB        the child's peak RSS, and how much the crawl added to it
+
+    python benchmark/bench.py                                  # every mocked scraper, 3 runs
+    python benchmark/bench.py mit oxford --latency 50 --jitter 20 --items 40 --padding-kb 60
+    python benchmark/bench.py --report bench.json --repeat 5
+    python benchmark/bench.py --pipeline --latency 50        # the same sites through pipeline.py
+
+With --pipeline the CPU time includes the parser processes; the telemetry
+columns stay empty, as it doesn't see the pipeline's async requests.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+from mock_sites import MockServer, Site, redirect  # noqa: E402
+from pipeline import SITES as PIPELINE_SITES, run as run_pipeline  # noqa: E402
+from sources import load_function, run_scraper  # noqa: E402
+
+# Scrapers with a mock site that return their data (those writing their own files are left out)
+SCRAPERS = ["el_oued_events", "el_oued_news", "oxford", "mit", "ensia_programs"]
+REPEAT = 3
+RUN_TIMEOUT = 600
+
+
+def _rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def _cpu_seconds():
+    """CPU time of this process and its finished children (the pipeline's parser pool)."""
+    return sum(usage.ru_utime + usage.ru_stime
+               for usage in map(resource.getrusage, (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)))
+
+
+def _run(name, port, results, pipeline=False):
+    """Child process: one scraper (or pipeline) run against the mock server."""
+    from telemetry import instrument
+
+    redirect(port)
+    telemetry = instrument()
+    if not pipeline:
+        load_function(name)  # imports aren't part of the crawl
+    baseline = _rss_mb()
+    cpu, start = _cpu_seconds(), time.perf_counter()
+    error = None
+    try:
+        with telemetry.scraper(name):
+            if pipeline:
+                with tempfile.TemporaryDirectory() as output:
+                    data = dict(run_pipeline([name], output))
+            else:
+                data = run_scraper(name, save=False)
+    except Exception as e:
+        data, error = None, f"{type(e).__name__}: {e}"
+    wall, cpu = time.perf_counter() - start, _cpu_seconds() - cpu
+    scraped = telemetry.summary()["scrapers"].get(name, {})
+    results.put({
+        "wall": wall, "cpu": cpu, "peak_mb": _rss_mb(), "added_mb": _rss_mb() - baseline,
+        "network": scraped.get("network_seconds", 0.0), "parse": scraped.get("parse_seconds", 0.0),
+        "records": len(data) if isinstance(data, (list, dict)) else 0, "error": error,
+    })
+
+
+def bench(name, server, repeat=REPEAT, pipeline=False):
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for _ in range(repeat):
+        server.reset()
+        results = context.Queue()
+        child = context.Process(target=_run, args=(name, server.port, results, pipeline))
+        child.start()
+        try:
+            run = results.get(timeout=RUN_TIMEOUT)
+        except queue.Empty:
+            child.terminate()
+            run = {"wall": RUN_TIMEOUT, "cpu": 0.0, "peak_mb": 0.0, "added_mb": 0.0, "network": 0.0,
+                   "parse": 0.0, "records": 0, "error": f"no result after {RUN_TIMEOUT}s (exit code {child.exitcode})"}
+        child.join()
+        run.update(server.stats)
+        runs.append(run)
+
+    pages = statistics.median(run["pages"] for run in runs)
+    wall = statistics.median(run["wall"] for run in runs)
+    cpu = statistics.median(run["cpu"] for run in runs)
+    return {
+        "runs": repeat,
+        "pages": pages,
+        "kb_per_page": round(statistics.median(run["bytes"] for run in runs) / 1024 / pages, 1) if pages else 0,
+        "not_found": max(run["not_found"] for run in runs),
+        "pages_per_sec": round(pages / wall, 1) if wall else None,
+        "wall_seconds": round(wall, 3),
+        "cpu_ms_per_page": round(1000 * cpu / pages, 2) if pages else None,
+        "network_seconds": round(statistics.median(run["network"] for run in runs), 3),
+        "parse_seconds": round(statistics.median(run["parse"] for run in runs), 3),
+        "peak_mb": round(max(run["peak_mb"] for run in runs), 1),
+        "added_mb": round(max(run["added_mb"] for run in runs), 1),
+        "errors": sorted({run["error"] for run in runs if run["error"]}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against local mock sites")
+    parser.add_argument("scrapers", nargs="*", help=f"scrapers to run (default: {', '.join(SCRAPERS)})")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="runs per scraper (medians are reported)")
+    parser.add_argument("--items", type=int, default=20, help="records per listing page")
+    parser.add_argument("--padding-kb", type=int, default=20, help="navigation filler added to every page")
+    parser.add_argument("--latency", type=float, default=0, help="ms before each response")
+    parser.add_argument("--jitter", type=float, default=0, help="extra random ms before each response")
+    parser.add_argument("--pipeline", action="store_true", help="crawl through pipeline.py instead")
+    parser.add_argument("--report", help="also write the results as JSON")
+    args = parser.parse_args()
+    available = list(PIPELINE_SITES) if args.pipeline else SCRAPERS
+    unknown = [name for name in args.scrapers if name not in available]
+    if unknown:
+        parser.error(f"no mock site for: {', '.join(unknown)}")
+
+    site = Site(args.items, args.padding_kb, args.latency / 1000, args.jitter / 1000)
+    results = {}
+    with MockServer(site) as server:
+        print(f"Mock sites on http://127.0.0.1:{server.port} "
+              f"({args.items} items/page, {args.padding_kb} KB padding, {args.latency:g}+{args.jitter:g} ms)")
+        for name in args.scrapers or available:
+            results[name] = bench(name, server, args.repeat, args.pipeline)
+
+    print(f"\n{'scraper':<16}{'pages':>7}{'KB/page':>9}{'pages/s':>9}{'cpu ms/pg':>10}"
+          f"{'network':>9}{'parse':>8}{'peak MB':>9}{'+MB':>6}")
+    for name, r in results.items():
+        print(f"{name:<16}{r['pages']:>7g}{r['kb_per_page']:>9}{r['pages_per_sec'] or 0:>9}"
+              f"{r['cpu_ms_per_page'] or 0:>10}{r['network_seconds']:>9}{r['parse_seconds']:>8}"
+              f"{r['peak_mb']:>9}{r['added_mb']:>6}")
+        for error in r["errors"]:
+            print(f"  {name} failed: {error}")
+        if r["not_found"]:
+            print(f"  {name}: {r['not_found']} requests for pages that aren't mocked")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "scrapers": results}, f, indent=2)
+        print(f"\nReport saved to '{args.report}'")
+
+
+if __name__ == "__main__":
+    main()
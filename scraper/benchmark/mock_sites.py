@@ -0,0 +1,305 @@
+"""
+Synthetic copies of the university sites, served from a local HTTP server.
+
+Each page generator mimics the markup the scrapers select on: the El Oued
+`tpg-post-holder` listings and their article pages, the timetable pages
+with their specialty accordions, the Oxford
+`az-listing` pages and events list, the MIT schools list, department
+`groups` sections, RSS feed and calendar, and the ENSIA `table.tg`
+program tables. Content is random but seeded by the URL, so every run
+serves the same pages.
+
+`redirect(port)` rewrites every http(s) URL requested through requests,
+httpx (sync and async) or feedparser to http://127.0.0.1:<port>/<host>/<path>, so the
+scrapers run unmodified against the mock sites and never reach the real
+ones (unknown hosts get a 404).
+
+    Site(items=20, padding_kb=40, latency=0.05, jitter=0.02)   # per-page knobs
+"""
+import random
+import re
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+WORDS = ("university faculty research student campus seminar conference science engineering "
+         "computer mathematics physics chemistry biology economics law medicine architecture "
+         "workshop doctoral master licence program laboratory innovation energy water desert "
+         "agriculture artificial intelligence data network security health culture sport").split()
+FIRST_DAY = datetime(2024, 9, 1)
+
+
+class Site:
+    """Page generators for every mocked host; `items` and `padding_kb` set the page size."""
+
+    def __init__(self, items=20, padding_kb=20, latency=0.0, jitter=0.0):
+        self.items = items
+        self.padding_kb = padding_kb
+        self.latency = latency
+        self.jitter = jitter
+        self.routes = [
+            (r"(www\.)?univ-eloued\.dz", r"/en/(meet|event2023)/", self.eloued_listing),
+            (r"(www\.)?univ-eloued\.dz", r"/en/tim_tab/", self.eloued_timetables),
+            (r"(www\.)?univ-eloued\.dz", r"/en/faculty/\d+/schedules/?", self.eloued_faculty),
+            (r"(www\.)?univ-eloued\.dz", r"/en/[\w-]+/", self.eloued_article),
+            (r"(www\.)?ox\.ac\.uk", r"/events-list", self.oxford_events),
+            (r"(www\.)?ox\.ac\.uk", r"/admissions/.+", self.oxford_listing),
+            (r"web\.mit\.edu", r"/education/schools-and-departments/", self.mit_schools),
+            (r"news\.mit\.edu", r"/rss", self.mit_rss),
+            (r"calendar\.mit\.edu", r"/", self.mit_calendar),
+            (r"[\w-]+\.mit\.edu", r"/", self.mit_department),
+            (r"(www\.)?ensia\.edu\.dz", r"/program/", self.ensia_programs),
+        ]
+        self.routes = [(re.compile(host), re.compile(path), handler) for host, path, handler in self.routes]
+
+    def page(self, host, path):
+        """(content type, body bytes) for a URL of a mocked site, or None."""
+        for host_re, path_re, handler in self.routes:
+            if host_re.fullmatch(host) and path_re.fullmatch(path):
+                rng = random.Random(f"{host}{path}")
+                content_type, body = handler(rng, host, path)
+                return content_type, body.encode("utf-8")
+        return None
+
+    # --- helpers -------------------------------------------------------------------
+
+    def html(self, rng, title, body):
+        return (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{title}</title></head>"
+                f"<body>{self.chrome(rng)}<main>{body}</main></body></html>")
+
+    def chrome(self, rng):
+        """Navigation and footer filler, so pages weigh about padding_kb like the real ones."""
+        links, size = [], 0
+        while size < self.padding_kb * 1024:
+            link = f"<li class=\"menu-item\"><a href=\"/{rng.choice(WORDS)}/\">{sentence(rng, 3)}</a></li>"
+            links.append(link)
+            size += len(link)
+        return f"<nav class=\"site-navigation\"><ul>{''.join(links)}</ul></nav>"
+
+    # --- El Oued: spec-driven listings and article pages -------------------------
+
+    def eloued_listing(self, rng, host, path):
+        kind = path.strip("/").split("/")[-1]
+        holders = []
+        for i in range(self.items):
+            slug = f"{kind}-{i}-{rng.choice(WORDS)}"
+            holders.append(
+                "<div class=\"rt-col-md-4 rt-holder tpg-post-holder\"><div class=\"rt-detail rt-el-content-wrapper\">"
+                f"<div class=\"entry-title-wrapper\"><h3 class=\"entry-title\">"
+                f"<a href=\"https://{host}/en/{slug}/\">{sentence(rng, 8).title()}</a></h3></div>"
+                "<div class=\"post-meta-tags rt-el-post-meta\">"
+                f"<span class=\"date\"><a href=\"#\">{day(rng).strftime('%B %d, %Y')}</a></span></div>"
+                "</div></div>"
+            )
+        return "text/html", self.html(rng, kind, f"<div class=\"rt-row rt-content-loader\">{''.join(holders)}</div>")
+
+    def eloued_article(self, rng, host, path):
+        headings = "".join(f"<h3>{sentence(rng, 12)}</h3>" for _ in range(4))
+        paragraphs = "".join(f"<p>{sentence(rng, 40)}</p>" for _ in range(6))
+        body = (
+            f"<div class=\"elementor-widget-container\"><h1>{sentence(rng, 8)}</h1>{headings}</div>"
+            f"<div class=\"elementor-widget-image\"><img src=\"https://{host}/wp-content/uploads/"
+            f"{rng.randrange(10 ** 6)}.jpg\"></div>"
+            f"<div class=\"entry-content\">{paragraphs}</div>"
+        )
+        return "text/html", self.html(rng, path, body)
+
+    def eloued_timetables(self, rng, host, path):
+        links = "".join(f"<li><a href=\"/en/faculty/{i}/schedules/\">{sentence(rng, 4).title()}</a></li>"
+                        for i in range(max(1, self.items // 4)))
+        return "text/html", self.html(rng, "Timetables", f"<ul class=\"faculties\">{links}</ul>")
+
+    def eloued_faculty(self, rng, host, path):
+        specialties = "".join(
+            "<div class=\"accordion-item\"><h2 class=\"accordion-header\">"
+            f"<button class=\"accordion-button\" data-bs-target=\"#spec-{i}\">{sentence(rng, 4).title()}</button>"
+            f"</h2><div id=\"spec-{i}\" class=\"accordion-collapse\"><ul><li>"
+            f"<a href=\"/wp-content/uploads/timetable-{i}.pdf\">Timetable</a></li></ul></div></div>"
+            for i in range(self.items)
+        )
+        body = f"<h1>Faculty of {rng.choice(WORDS).title()}</h1><div class=\"accordion\">{specialties}</div>"
+        return "text/html", self.html(rng, path, body)
+
+    # --- Oxford: A-Z listings and events ------------------------------------------
+
+    def oxford_listing(self, rng, host, path):
+        links = "".join(f"<li><a href=\"{path.rstrip('/')}/{rng.choice(WORDS)}-{i}\">{sentence(rng, 4).title()}</a></li>"
+                        for i in range(self.items))
+        return "text/html", self.html(rng, path, f"<div class=\"az-listing\"><ul>{links}</ul></div>")
+
+    def oxford_events(self, rng, host, path):
+        events = "".join(
+            f"<div class=\"event-item\"><a href=\"/event/{i}\">{sentence(rng, 6).title()}</a>"
+            f"<span class=\"event-date\">{day(rng).strftime('%A %d %B %Y')}</span></div>"
+            for i in range(self.items)
+        )
+        return "text/html", self.html(rng, path, events)
+
+    # --- MIT: schools, department groups, news feed, calendar --------------------
+
+    def mit_schools(self, rng, host, path):
+        schools = []
+        for s in range(max(1, self.items // 4)):
+            departments = "".join(
+                f"<li class=\"sortable-list__item\"><a href=\"https://dept{s}-{d}.mit.edu/\">"
+                f"{sentence(rng, 3).title()}</a></li>"
+                for d in range(4)
+            )
+            schools.append(f"<li><a href=\"/school-{s}\">School of {rng.choice(WORDS).title()}</a>"
+                           f"<ul>{departments}</ul></li>")
+        return "text/html", self.html(rng, "Schools", f"<h2>Schools &amp; Departments</h2><ul>{''.join(schools)}</ul>")
+
+    def mit_department(self, rng, host, path):
+        groups = "".join(
+            "<div class=\"field__item\"><div class=\"field field--name-field-url\">"
+            f"<a href=\"/groups/{i}\">{sentence(rng, 3).title()} Group</a></div></div>"
+            for i in range(max(1, self.items // 4))
+        )
+        body = ("<div class=\"container\"><h2 id=\"groups\">Groups</h2>"
+                f"<div class=\"field field--name-field-large-links\">{groups}</div></div>")
+        return "text/html", self.html(rng, host, body)
+
+    def mit_rss(self, rng, host, path):
+        items = "".join(
+            f"<item><title>{sentence(rng, 8)}</title><link>https://news.mit.edu/{i}</link>"
+            f"<pubDate>{format_datetime(day(rng).replace(tzinfo=timezone.utc))}</pubDate></item>"
+            for i in range(self.items)
+        )
+        return "application/rss+xml", (f"<?xml version=\"1.0\"?><rss version=\"2.0\"><channel>"
+                                       f"<title>MIT News</title>{items}</channel></rss>")
+
+    def mit_calendar(self, rng, host, path):
+        events = "".join(
+            f"<div><h3><a href=\"/event/{i}\">{sentence(rng, 6).title()}</a></h3>"
+            f"<p>{day(rng).strftime('%A, %B %d, %Y %I:%M %p')}</p></div>"
+            for i in range(self.items)
+        )
+        return "text/html", self.html(rng, "Calendar", events)
+
+    # --- ENSIA: program tables ------------------------------------------------------
+
+    def ensia_programs(self, rng, host, path):
+        tables = []
+        for _ in range(max(1, self.items // 5)):
+            rows = "".join(
+                "<tr>" + f"<td><a href=\"/module/{rng.randrange(1000)}\">{sentence(rng, 4)}</a></td>"
+                + "".join(f"<td>{rng.randrange(1, 60)}</td>" for _ in range(10)) + "</tr>"
+                for _ in range(self.items)
+            )
+            tables.append(f"<table class=\"tg\"><thead><tr><th>UE</th></tr></thead><tbody>{rows}</tbody></table>")
+        return "text/html", self.html(rng, "Program", "".join(tables))
+
+
+def sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def day(rng):
+    return FIRST_DAY + timedelta(days=rng.randrange(365), hours=rng.randrange(8, 18))
+
+
+class MockServer:
+    """Threaded HTTP/1.1 server for a Site; counts the pages and bytes it served."""
+
+    def __init__(self, site, port=0):
+        self.site = site
+        self.lock = threading.Lock()
+        self.reset()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, as the real sites do
+
+            def do_GET(self):
+                host, _, path = self.path.lstrip("/").partition("/")
+                page = site.page(host, "/" + urlsplit(path).path)
+                if site.latency or site.jitter:
+                    time.sleep(site.latency + random.uniform(0, site.jitter))
+                status, (content_type, body) = (200, page) if page else (404, ("text/plain", b"not mocked"))
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server.count(status, len(body))
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="mock-sites", daemon=True)
+
+    def reset(self):
+        with self.lock:
+            self.stats = {"pages": 0, "bytes": 0, "not_found": 0}
+
+    def count(self, status, nbytes):
+        with self.lock:
+            self.stats["pages"] += 1
+            self.stats["bytes"] += nbytes
+            self.stats["not_found"] += status == 404
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def local_url(url, port):
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or parts.hostname == "127.0.0.1":
+        return url
+    return f"http://127.0.0.1:{port}/{parts.hostname}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else "")
+
+
+def redirect(port):
+    """Send every request made through requests, httpx and feedparser to the mock server."""
+    import requests.adapters
+
+    send = requests.adapters.HTTPAdapter.send
+
+    def local_send(adapter, request, *args, **kwargs):
+        request = request.copy()
+        request.url = local_url(request.url, port)
+        return send(adapter, request, *args, **kwargs)
+
+    requests.adapters.HTTPAdapter.send = local_send
+
+    try:
+        import httpx
+    except ImportError:
+        pass  # not installed, so no scraper uses it
+    else:
+        handle_request = httpx.HTTPTransport.handle_request
+        handle_async_request = httpx.AsyncHTTPTransport.handle_async_request
+
+        def local_handle_request(transport, request):
+            request.url = httpx.URL(local_url(str(request.url), port))
+            return handle_request(transport, request)
+
+        async def local_handle_async_request(transport, request):
+            request.url = httpx.URL(local_url(str(request.url), port))
+            return await handle_async_request(transport, request)
+
+        httpx.HTTPTransport.handle_request = local_handle_request
+        httpx.AsyncHTTPTransport.handle_async_request = local_handle_async_request
+
+    try:
+        import feedparser
+    except ImportError:
+        pass
+    else:
+        parse = feedparser.parse
+
+        def local_parse(source, *args, **kwargs):
+            return parse(local_url(source, port) if isinstance(source, str) else source, *args, **kwargs)
+
+        feedparser.parse = local_parse
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Run the scrapers with crawl telemetry and write the per-host/per-scraper report.
+
+    python crawl.py                               # every scraper in sources.py
+    python crawl.py ghardaia mit --selectors      # a subset, timing bs4 lookups too
+    python crawl.py --records crawl_requests.jsonl
+"""
+import argparse
+import os
+
+from sources import SCRAPER_DIR, SCRAPERS, run_scraper
+from telemetry import instrument
+
+REPORT_FILE = os.path.join(SCRAPER_DIR, "crawl_report.json")
+
+
+def crawl(names, telemetry, save=True):
+    for name in names:
+        print(f"Crawling {name}...")
+        try:
+            with telemetry.scraper(name):
+                run_scraper(name, save)
+        except Exception as e:
+            print(f"{name} failed: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scrapers and report where the crawl time goes")
+    parser.add_argument("scrapers", nargs="*", help=f"scrapers to run (default: all of {', '.join(SCRAPERS)})")
+    parser.add_argument("--report", default=REPORT_FILE, help="summary JSON")
+    parser.add_argument("--records", help="also write every request as JSON Lines")
+    parser.add_argument("--selectors", action="store_true", help="time find/select calls per selector")
+    parser.add_argument("--no-save", action="store_true", help="don't overwrite the scrapers' output files")
+    args = parser.parse_args()
+    unknown = [name for name in args.scrapers if name not in SCRAPERS]
+    if unknown:
+        parser.error(f"unknown scraper(s): {', '.join(unknown)}")
+
+    telemetry = instrument(selectors=args.selectors)
+    crawl(args.scrapers or list(SCRAPERS), telemetry, save=not args.no_save)
+
+    telemetry.write(args.report)
+    if args.records:
+        telemetry.write_records(args.records)
+
+    summary = telemetry.summary()
+    print(f"\n{'scraper':<18}{'requests':>9}{'errors':>8}{'seconds':>9}{'network':>9}{'parse':>8}")
+    for name, entry in summary["scrapers"].items():
+        print(f"{name:<18}{entry['requests']:>9}{entry['errors']:>8}{entry.get('duration', 0):>9.1f}"
+              f"{entry['network_seconds']:>9.1f}{entry['parse_seconds']:>8.1f}")
+    print(f"\n{summary['requests']} requests, {summary['bytes'] / 1024:.0f} KB, "
+          f"error rate {summary['error_rate']:.1%}. Report saved to '{args.report}'")
+
+
+if __name__ == "__main__":
+    main()
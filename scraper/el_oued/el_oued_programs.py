@@ -5,7 +5,53 @@ import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 
-def scrape_and_save_faculty_schedule(base_url):
+def parse_faculty_links(html, base_url):
+    """Sorted URLs of the individual faculty schedule pages linked from the timetable page."""
+    soup = BeautifulSoup(html, "html.parser")
+    
+    # Find all links that match the pattern of individual faculty schedule pages.
+    faculty_links = set()
+    for a in soup.find_all("a", href=True):
+        href = a["href"]
+        if "/faculty/" in href and "schedules" in href:
+            faculty_links.add(urljoin(base_url, href))
+    return sorted(faculty_links)
+
+def parse_faculty_page(html, faculty_url):
+    """Faculty name and its specialties (name and in-page URL) from a faculty schedule page."""
+    fac_soup = BeautifulSoup(html, "html.parser")
+    
+    # Attempt to get a friendly faculty name from an <h1> tag
+    faculty_name_tag = fac_soup.find("h1")
+    if faculty_name_tag:
+        faculty_name = faculty_name_tag.get_text(strip=True)
+    else:
+        # Fallback: extract faculty id from URL
+        parts = faculty_url.strip("/").split("/")
+        faculty_name = parts[-2] if len(parts) >= 2 else "faculty"
+    
+    specialties = []
+    # Find accordion items (each representing a specialty)
+    for item in fac_soup.find_all("div", class_="accordion-item"):
+        button = item.find("button", class_="accordion-button")
+        if button:
+            # Use data-bs-target for the in-page anchor if present
+            anchor_target = button.get("data-bs-target", "")
+            specialties.append({
+                "specialty_name": button.get_text(strip=True),
+                "specialty_url": faculty_url.rstrip("/") + anchor_target if anchor_target else faculty_url
+            })
+    return faculty_name.strip(), specialties
+
+def parse_timetable(html, faculty_url):
+    """Absolute URL of the timetable PDF on a specialty page, or None."""
+    spec_soup = BeautifulSoup(html, "html.parser")
+    # This uses a simple search for an <a> tag with an href ending with ".pdf".
+    pdf_anchor = spec_soup.find("a", href=re.compile(r'\.pdf$'))
+    # Convert relative URL to absolute.
+    return urljoin(faculty_url, pdf_anchor["href"]) if pdf_anchor else None
+
+def scrape_and_save_faculty_schedule(base_url, output_dir="faculty_schedules"):
     # Define the faculties timetable route
     faculties_path = "tim_tab/"
     faculties_url = urljoin(base_url, faculties_path)
@@ -17,25 +63,15 @@ def scrape_and_save_faculty_schedule(base_url):
         print(f"Error fetching faculties timetable page: {err}")
         return
     
-    soup = BeautifulSoup(response.content, "html.parser")
-    
-    # Find all links that match the pattern of individual faculty schedule pages.
-    faculty_links = set()
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        if "/faculty/" in href and "schedules" in href:
-            full_url = urljoin(base_url, href)
-            faculty_links.add(full_url)
-    
+    faculty_links = parse_faculty_links(response.content, base_url)
     if not faculty_links:
         print("No faculty schedule links found at:", faculties_url)
         return
     
-    # Create an output directory (optional)
-    output_dir = "faculty_schedules"
+    # Create the output directory (relative to the working directory by default)
     os.makedirs(output_dir, exist_ok=True)
     
-    for faculty_url in sorted(faculty_links):
+    for faculty_url in faculty_links:
         print(f"\nProcessing Faculty Page: {faculty_url}")
         try:
             fac_response = requests.get(faculty_url)
@@ -44,66 +80,26 @@ def scrape_and_save_faculty_schedule(base_url):
             print(f"Error fetching faculty page {faculty_url}: {err}")
             continue
         
-        fac_soup = BeautifulSoup(fac_response.content, "html.parser")
-        
-        # Attempt to get a friendly faculty name from an <h1> tag
-        faculty_name_tag = fac_soup.find("h1")
-        if faculty_name_tag:
-            faculty_name = faculty_name_tag.get_text(strip=True)
-        else:
-            # Fallback: extract faculty id from URL
-            parts = faculty_url.strip("/").split("/")
-            faculty_name = parts[-2] if len(parts) >= 2 else "faculty"
-        
-        faculty_name = faculty_name.strip()
+        faculty_name, specialties = parse_faculty_page(fac_response.content, faculty_url)
         print("Faculty Name:", faculty_name)
-        
-        # Initialize a list to store specialties info
-        specialties = []
-        
-        # Find accordion items (each representing a specialty)
-        accordion_items = fac_soup.find_all("div", class_="accordion-item")
-        if not accordion_items:
+        if not specialties:
             print("No specialties found on this faculty page.")
             continue
         
-        for item in accordion_items:
-            button = item.find("button", class_="accordion-button")
-            if button:
-                specialty_name = button.get_text(strip=True)
-                # Use data-bs-target for the in-page anchor if present
-                anchor_target = button.get("data-bs-target", "")
-                if anchor_target:
-                    # Remove any extra '/' if needed before appending the fragment
-                    specialty_url = faculty_url.rstrip("/") + anchor_target
+        for specialty_dict in specialties:
+            specialty_name = specialty_dict["specialty_name"]
+            # Now, try to fetch the specialty page to extract the timetable PDF link.
+            try:
+                spec_response = requests.get(specialty_dict["specialty_url"])
+                spec_response.raise_for_status()
+                pdf_link = parse_timetable(spec_response.content, faculty_url)
+                if pdf_link:
+                    specialty_dict["timetable"] = pdf_link
+                    print(f"Found timetable for {specialty_name}: {pdf_link}")
                 else:
-                    specialty_url = faculty_url
-                    
-                specialty_dict = {
-                    "specialty_name": specialty_name,
-                    "specialty_url": specialty_url
-                }
-                
-                # Now, try to fetch the specialty page to extract the timetable PDF link.
-                try:
-                    spec_response = requests.get(specialty_url)
-                    spec_response.raise_for_status()
-                    spec_soup = BeautifulSoup(spec_response.content, "html.parser")
-                    
-                    # Locate the list item row containing the PDF timetable link.
-                    # This uses a simple search for an <a> tag with an href ending with ".pdf".
-                    pdf_anchor = spec_soup.find("a", href=re.compile(r'\.pdf$'))
-                    if pdf_anchor:
-                        # Convert relative URL to absolute.
-                        pdf_link = urljoin(faculty_url, pdf_anchor["href"])
-                        specialty_dict["timetable"] = pdf_link
-                        print(f"Found timetable for {specialty_name}: {pdf_link}")
-                    else:
-                        print(f"No timetable PDF link found for {specialty_name}")
-                except Exception as err:
-                    print(f"Error fetching specialty page {specialty_url}: {err}")
-                
-                specialties.append(specialty_dict)
+                    print(f"No timetable PDF link found for {specialty_name}")
+            except Exception as err:
+                print(f"Error fetching specialty page {specialty_dict['specialty_url']}: {err}")
         
         # Save the specialties data into a JSON file,
         # using the faculty name as the file name (sanitized).
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Declarative extraction engine for the site scrapers.
+
+A site is described by a JSON spec in specs/ instead of a script:
+
+    {
+      "university": "University of El Oued",        whose records these are (not read by the engine)
+      "url": "https://www.univ-eloued.dz/en/meet/",
+      "items": "div.rt-holder.tpg-post-holder",     CSS selector, one match per record
+      "max_items": 10,                              only look at the first 10 matches
+      "require": ["link"],                          drop records missing these fields
+      "fields": {
+        "title": "h3.entry-title a",                text of the first match
+        "link": {"select": "h3.entry-title a", "attr": "href"}
+      },
+      "detail": {"url": "link", "fields": {...}},   fields read from each record's own page
+      "pagination": {"next": "a.next", "max_pages": 3}
+    }
+
+"limit" caps the number of records kept, "scope" restricts the items to the
+first element matching it and "ignore_errors" returns no records instead of
+raising when the listing page cannot be fetched. A spec with "sections"
+holds several such extractions, keyed by output key, on top of "defaults"
+they share and constant "data" (see specs/oxford.json).
+
+Pages are fetched with the spec's top-level "user_agent" (null sends the
+requests default) and "timeout" in seconds, which apply to every section;
+without them a desktop Chrome User-Agent and a 15 s timeout are used.
+
+Field rules: "select" (relative to the record or page; without it the
+record element itself is read), "attr" (default: the text), "separator" for
+the text, "all" for every match with optional "limit" and "join",
+"absolute" to resolve URLs against the page, "within" to read from the
+first container matching it that holds at least "min" matches, "default"
+when nothing matches and "fallback": "page" to use the whole page's text.
+
+Selectors are compiled once with soupsieve and reused for every page, and
+detail pages are fetched concurrently over one keep-alive session.
+
+    python engine.py el_oued_events                   # print the records
+    python engine.py specs/new_site.json -o out.json
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from importlib.util import find_spec
+from urllib.parse import urljoin
+
+import requests
+import soupsieve
+from bs4 import BeautifulSoup
+
+SCRAPER_DIR = os.path.dirname(os.path.abspath(__file__))
+SPEC_DIR = os.path.join(SCRAPER_DIR, "specs")
+
+PARSER = "lxml" if find_spec("lxml") else "html.parser"
+CONCURRENCY = 4
+TIMEOUT = 15
+HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                   "AppleWebKit/537.36 (KHTML, like Gecko) "
+                   "Chrome/113.0.0.0 Safari/537.36")
+}
+
+
+@lru_cache(maxsize=None)
+def compile_selector(selector):
+    return soupsieve.compile(selector)
+
+
+class Field:
+    def __init__(self, name, rule):
+        if isinstance(rule, str):
+            rule = {"select": rule}
+        self.name = name
+        self.select = compile_selector(rule["select"]) if rule.get("select") else None
+        self.within = compile_selector(rule["within"]) if rule.get("within") else None
+        self.min = rule.get("min", 1)
+        self.attr = rule.get("attr")
+        self.separator = rule.get("separator", "")
+        self.all = rule.get("all", False)
+        self.limit = rule.get("limit") or 0
+        self.join = rule.get("join")
+        self.absolute = rule.get("absolute", False)
+        self.default = rule.get("default", [] if self.all and self.join is None else "")
+        self.fallback = rule.get("fallback")
+
+    def matches(self, scope):
+        if self.select is None:
+            return [scope]
+        if self.all:
+            return self.select.select(scope, limit=self.limit)
+        match = self.select.select_one(scope)
+        return [match] if match is not None else []
+
+    def read(self, node, page_url):
+        if self.attr:
+            value = node.get(self.attr)
+            value = " ".join(value) if isinstance(value, list) else (value or "").strip()
+        else:
+            value = node.get_text(separator=self.separator, strip=True)
+        if value and self.absolute:
+            value = urljoin(page_url, value)
+        return value
+
+    def extract(self, scope, page_url, page):
+        if self.within is not None:
+            scope = next((container for container in self.within.select(scope)
+                          if self.select is None or len(self.select.select(container, limit=self.min)) >= self.min),
+                         None)
+        matches = self.matches(scope) if scope is not None else []
+        if not matches:
+            if self.fallback == "page" and page is not None:
+                return page.get_text(separator=self.separator, strip=True)
+            return self.default
+        values = [self.read(node, page_url) for node in matches]
+        if not self.all:
+            return values[0] or self.default
+        return self.join.join(values) if self.join is not None else values
+
+
+def parse_html(content):
+    # Bytes, so BeautifulSoup can use the page's own <meta charset>
+    return BeautifulSoup(content, PARSER)
+
+
+class Extraction:
+    """One listing (with optional detail pages and pagination) compiled from a spec."""
+
+    def __init__(self, spec):
+        self.url = spec["url"]
+        self.scope = compile_selector(spec["scope"]) if spec.get("scope") else None
+        self.items = compile_selector(spec["items"])
+        self.limit = spec.get("limit")
+        self.max_items = spec.get("max_items") or 0
+        self.require = spec.get("require", [])
+        self.ignore_errors = spec.get("ignore_errors", False)
+        self.fields = [Field(name, rule) for name, rule in spec["fields"].items()]
+
+        detail = spec.get("detail") or {}
+        self.detail_url = detail.get("url")
+        self.detail_fields = [Field(name, rule) for name, rule in detail.get("fields", {}).items()]
+
+        pagination = spec.get("pagination") or {}
+        self.next_page = (Field("next", {"select": pagination["next"], "attr": "href", "absolute": True})
+                          if pagination.get("next") else None)
+        self.max_pages = pagination.get("max_pages", 1)
+
+    def run(self, fetcher):
+        try:
+            records = self.listing(fetcher)
+        except requests.RequestException as e:
+            if not self.ignore_errors:
+                raise
+            print(f"Error fetching {self.url}: {e}")
+            return []
+
+        if self.detail_fields:
+            urls = [record.get(self.detail_url) for record in records]
+            for record, page, url in zip(records, fetcher.soups(urls), urls):
+                self.parse_detail(record, page, url)
+        return records
+
+    def listing(self, fetcher):
+        records = []
+        url, visited = self.url, set()
+        for _ in range(self.max_pages):
+            visited.add(url)
+            page_records, url = self.parse_listing(fetcher.soup(url), url)
+            records += page_records
+            if self.limit and len(records) >= self.limit:
+                return records[:self.limit]
+            if not url or url in visited:
+                break
+        return records
+
+    def parse_listing(self, page, url):
+        """Records on one parsed listing page, and the next page's URL (None on the last)."""
+        records = []
+        scope = self.scope.select_one(page) if self.scope else page
+        for item in self.items.select(scope, limit=self.max_items) if scope is not None else ():
+            record = {field.name: field.extract(item, url, page) for field in self.fields}
+            if all(record.get(name) for name in self.require):
+                records.append(record)
+        next_url = self.next_page.extract(page, url, page) if self.next_page else None
+        return records, next_url or None
+
+    def parse_detail(self, record, page, url):
+        """Fill the detail fields of `record` from its parsed page (defaults when `page` is None)."""
+        for field in self.detail_fields:
+            record[field.name] = field.extract(page, url, page) if page is not None else field.default
+        return record
+
+
+class Fetcher:
+    """Keep-alive session plus a thread pool for fetching pages concurrently."""
+
+    def __init__(self, headers=HEADERS, concurrency=CONCURRENCY, timeout=TIMEOUT):
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fetch")
+        self.timeout = timeout
+
+    def soup(self, url):
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return parse_html(response.content)
+
+    def soups(self, urls):
+        """Parsed pages in `urls` order; None for missing URLs and failed fetches."""
+        def fetch(url):
+            if not url:
+                return None
+            try:
+                return self.soup(url)
+            except requests.RequestException as e:
+                print(f"Error fetching {url}: {e}")
+                return None
+        return list(self.pool.map(fetch, urls))
+
+    def close(self):
+        self.pool.shutdown()
+        self.session.close()
+
+
+def spec_path(name):
+    return name if name.endswith(".json") else os.path.join(SPEC_DIR, name + ".json")
+
+
+@lru_cache(maxsize=None)
+def read_spec(name):
+    with open(spec_path(name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def spec_fetcher(name):
+    """Fetcher with the spec's "user_agent" and "timeout"."""
+    spec = read_spec(name)
+    user_agent = spec.get("user_agent", HEADERS["User-Agent"])
+    headers = {"User-Agent": user_agent} if user_agent else {}
+    return Fetcher(headers, timeout=spec.get("timeout", TIMEOUT))
+
+
+@lru_cache(maxsize=None)
+def load_spec(name):
+    """Compiled spec: an Extraction, or (data, {key: Extraction}) for a sectioned spec."""
+    spec = read_spec(name)
+    if "sections" not in spec:
+        return Extraction(spec)
+    defaults = spec.get("defaults", {})
+    sections = {key: Extraction({**defaults, **section}) for key, section in spec["sections"].items()}
+    return spec.get("data", {}), sections
+
+
+def run_spec(name, fetcher=None):
+    """Records of spec `name` (a file in specs/ or a path)."""
+    compiled = load_spec(name)
+    own_fetcher = fetcher is None
+    fetcher = fetcher or spec_fetcher(name)
+    try:
+        if isinstance(compiled, Extraction):
+            return compiled.run(fetcher)
+        data, sections = compiled
+        result = dict(data)
+        for key, extraction in sections.items():
+            result[key] = extraction.run(fetcher)
+        return result
+    finally:
+        if own_fetcher:
+            fetcher.close()
+
+
+def run_section(name, key, fetcher=None):
+    """Records of one section of a sectioned spec."""
+    _, sections = load_spec(name)
+    own_fetcher = fetcher is None
+    fetcher = fetcher or spec_fetcher(name)
+    try:
+        return sections[key].run(fetcher)
+    finally:
+        if own_fetcher:
+            fetcher.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a site spec and print or save its records")
+    parser.add_argument("spec", help="spec name in specs/ or path to a spec file")
+    parser.add_argument("-o", "--output", help="write the records to this JSON file")
+    args = parser.parse_args()
+
+    data = run_spec(args.spec)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+        print(f"Saved {len(data)} records to '{args.output}'")
+    else:
+        print(json.dumps(data, ensure_ascii=False, indent=4))
+
+
+if __name__ == "__main__":
+    main()
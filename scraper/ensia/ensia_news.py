@@ -3,7 +3,7 @@ from bs4 import BeautifulSoup
 import json
 import urllib.parse
 
-def scrape_ensia_news():
+def scrape_ensia_news(output_file='ensia_news.json'):
     base_url = 'https://www.ensia.edu.dz'
     news_path = '/news/'
     news_url = urllib.parse.urljoin(base_url, news_path)
@@ -68,7 +68,7 @@ def scrape_ensia_news():
     json_data = json.dumps(news_items, ensure_ascii=False, indent=4)
 
     # Save the JSON data to a file
-    with open('ensia_news.json', 'w', encoding='utf-8') as json_file:
+    with open(output_file, 'w', encoding='utf-8') as json_file:
         json_file.write(json_data)
 
     return json_data
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Time-indexed store of the events of every university.
+
+The scrapers keep events as free-text dates in separate JSON files (El Oued
+events, Ghardaia featured_events, the MIT and Oxford outputs, database.json).
+This store reads them through the merge stage's readers, parses each date
+once, and keeps per university a list of (start, id) keys sorted with bisect.
+
+"Upcoming events in a range across these universities" is then a binary
+search per university for the range bounds, and a heapq.merge of those
+slices: a page of N events touches about N keys, however many events are
+stored. Pages resume from a cursor (the last key returned), so a page stays
+correct while events are added.
+
+Refreshes are incremental: only source files whose mtime changed are
+re-read, and only new or re-dated events touch the index; scheduler.py
+refreshes the store after each pass that ran scrapers. The parsed store is
+saved to event_store.json, so a restart doesn't parse the dates again.
+
+    python event_store.py                                # refresh, then list the next events
+    python event_store.py --university ENSIA --university "University of El Oued" \\
+        --since 2025-03-01 --until 2025-04-01 --limit 20
+"""
+import argparse
+import heapq
+import json
+import os
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timezone
+from itertools import islice
+
+from merge import SOURCES, canonical_url, digest, normalize, read_universities
+from sources import SCRAPER_DIR
+
+STORE_FILE = os.path.join(SCRAPER_DIR, "event_store.json")
+# Outputs that aren't in the merge stage's SOURCES but hold events
+EXTRA_FILES = ["mit/mit.json", "oxford/oxford.json"]
+PAGE_SIZE = 50
+FIELDS = ("university", "source", "title", "url", "date", "date_text", "description", "content",
+          "image", "image_local", "thumbnail_local")
+
+
+def event_time(iso):
+    """Naive UTC datetime for an ISO date from merge.parse_date, so all keys compare."""
+    if not iso:
+        return None
+    value = datetime.fromisoformat(iso)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def event_id(record):
+    url = canonical_url(record.get("url"))
+    if url:
+        return digest(url).hex()
+    return record.get("fingerprint") or digest(f"{record['university']}\x1f{record.get('title')}").hex()
+
+
+def event_readers(scraper_dir=SCRAPER_DIR):
+    """(path, reader) for every source file that holds events, fuller per-site outputs first."""
+    for _, path, reader in SOURCES:
+        yield os.path.join(scraper_dir, path), reader
+    for path in EXTRA_FILES:
+        yield os.path.join(scraper_dir, path), read_universities
+
+
+def source_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+# Like in merge.py, an event seen in several files is kept from the first one
+SOURCE_RANK = {source_name(path): rank for rank, (path, _) in enumerate(event_readers())}
+
+
+class EventStore:
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self.events = {}        # id -> event record
+        self.timeline = {}      # university -> sorted [(start, id)]
+        self.undated = {}       # university -> {id}, events whose date couldn't be parsed
+        self.mtimes = {}        # source path -> mtime when it was last read
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self.events)
+
+    def universities(self):
+        return sorted(set(self.timeline) | set(self.undated))
+
+    def _unindex(self, eid):
+        old = self.events.pop(eid, None)
+        if old is None:
+            return
+        when = event_time(old.get("date"))
+        if when is None:
+            self.undated.get(old["university"], set()).discard(eid)
+            return
+        keys = self.timeline[old["university"]]
+        i = bisect_left(keys, (when, eid))
+        if i < len(keys) and keys[i] == (when, eid):
+            del keys[i]
+
+    def add(self, record):
+        """Insert or update one normalized event; True if the store changed."""
+        if not record.get("university"):
+            return False
+        event = {field: record.get(field) for field in FIELDS}
+        eid = event["id"] = record.get("id") or event_id(record)
+        old = self.events.get(eid)
+        if old == event:
+            return False
+        if old and SOURCE_RANK.get(old["source"], -1) < SOURCE_RANK.get(event["source"], -1):
+            return False
+        self._unindex(eid)
+        self.events[eid] = event
+        when = event_time(event["date"])
+        if when is None:
+            self.undated.setdefault(event["university"], set()).add(eid)
+        else:
+            insort(self.timeline.setdefault(event["university"], []), (when, eid))
+        return True
+
+    def refresh(self, scraper_dir=SCRAPER_DIR):
+        """Re-read the source files that changed since the last refresh; returns how many events changed."""
+        changed = 0
+        for path, reader in event_readers(scraper_dir):
+            if not os.path.exists(path):
+                continue
+            mtime = os.path.getmtime(path)
+            if self.mtimes.get(path) == mtime:
+                continue
+            source = source_name(path)
+            for kind, raw, university in reader(path):
+                if kind == "event":
+                    changed += self.add(normalize(raw, kind, university, source))
+            self.mtimes[path] = mtime
+        return changed
+
+    def upcoming(self, since=None, until=None, universities=None, limit=PAGE_SIZE, after=None):
+        """
+        Events starting in [since, until) for `universities` (all by default),
+        in start order. Returns (events, cursor); pass the cursor back as
+        `after` for the next page, it is None on the last one.
+        """
+        since = event_time(since) if isinstance(since, str) else since
+        until = event_time(until) if isinstance(until, str) else until
+        if after is not None:
+            after = (event_time(after[0]), after[1]) if isinstance(after[0], str) else tuple(after)
+        slices = []
+        for university in universities or self.timeline:
+            keys = self.timeline.get(university)
+            if not keys:
+                continue
+            lo = bisect_right(keys, after) if after is not None else 0
+            if since is not None:
+                lo = max(lo, bisect_left(keys, (since,)))
+            hi = bisect_left(keys, (until,)) if until is not None else len(keys)
+            if lo < hi:
+                slices.append(islice(keys, lo, hi))
+        page = list(islice(heapq.merge(*slices), limit + 1))
+        events = [self.events[eid] for _, eid in page[:limit]]
+        cursor = None
+        if len(page) > limit:
+            when, eid = page[limit - 1]
+            cursor = (when.isoformat(), eid)
+        return events, cursor
+
+    def undated_events(self, universities=None):
+        return [self.events[eid] for university in universities or self.undated
+                for eid in sorted(self.undated.get(university, ()))]
+
+    def load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.mtimes = data.get("sources", {})
+        # Bulk load: append everything, then sort each timeline once
+        for event in data.get("events", []):
+            eid = event["id"]
+            self.events[eid] = event
+            when = event_time(event["date"])
+            if when is None:
+                self.undated.setdefault(event["university"], set()).add(eid)
+            else:
+                self.timeline.setdefault(event["university"], []).append((when, eid))
+        for keys in self.timeline.values():
+            keys.sort()
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"sources": self.mtimes, "events": list(self.events.values())}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the event store and list events in a date range")
+    parser.add_argument("--store", default=STORE_FILE)
+    parser.add_argument("--scraper-dir", default=SCRAPER_DIR)
+    parser.add_argument("--university", action="append", help="repeat to select several (default: all)")
+    parser.add_argument("--since", default=None, help="ISO date (default: now)")
+    parser.add_argument("--until", default=None, help="ISO date")
+    parser.add_argument("--limit", type=int, default=PAGE_SIZE)
+    parser.add_argument("--after", nargs=2, metavar=("START", "ID"), help="cursor printed by the previous page")
+    args = parser.parse_args()
+
+    store = EventStore(args.store)
+    changed = store.refresh(args.scraper_dir)
+    if changed or not os.path.exists(args.store):
+        store.save()
+    print(f"{len(store)} events from {len(store.universities())} universities ({changed} new or updated)")
+
+    # Event dates are naive UTC (see event_time)
+    since = args.since or datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+    events, cursor = store.upcoming(since, args.until, args.university, args.limit, args.after)
+    for event in events:
+        print(f"  {event['date'][:16]}  {event['university']}: {event['title']}")
+    if cursor:
+        print(f"Next page: --after {cursor[0]} {cursor[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import json
+import re
+
+_WHITESPACE = " \t\r\n"
+_STRUCTURAL = re.compile(r'["{}\[\],]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+def iter_array(path, key=None, chunk_size=1 << 16):
+    """
+    Yield the elements of a JSON array one at a time without loading the
+    whole file.
+
+    With `key`, the array is the value of that key in the top-level object
+    (e.g. "universities" in database.json); otherwise the file itself must be
+    an array. If the key is missing, nothing is yielded.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def more():
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        more()
+        if key is not None:
+            # Track the nesting depth (skipping strings) so only a key of the top-level
+            # object matches, not one of the same name inside an earlier value
+            depth, in_string, expect_key, key_start, current, i = 0, False, False, None, None, pos
+            while True:
+                match = (_STRING_SPECIAL if in_string else _STRUCTURAL).search(buf, i)
+                if match is None or (match.group() == "\\" and match.end() == len(buf)):
+                    # Read on, keeping a key (or an escape) that is cut off at the end of the buffer
+                    scanned = match.start() if match else len(buf)
+                    pos = key_start if key_start is not None else scanned
+                    # more() drops everything before pos
+                    i, key_start = scanned - pos, None if key_start is None else 0
+                    if not more():
+                        return
+                    continue
+                token, i = match.group(), match.end()
+                if in_string:
+                    if token == "\\":
+                        i += 1
+                    else:
+                        in_string = False
+                        if key_start is not None:
+                            current, key_start, expect_key = json.loads(buf[key_start:i]), None, False
+                elif token == '"':
+                    in_string = True
+                    if depth == 1 and expect_key:
+                        key_start = match.start()
+                    elif depth == 1:
+                        current = None
+                elif token in "{[":
+                    if depth == 1 and token == "[" and current == key:
+                        pos = i
+                        break
+                    if depth == 1:
+                        current = None
+                    depth += 1
+                    expect_key = depth == 1 and token == "{"
+                elif token in "}]":
+                    depth -= 1
+                    if depth == 0:
+                        return
+                elif depth == 1:
+                    expect_key, current = True, None
+        else:
+            while True:
+                while pos < len(buf) and buf[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buf) or not more():
+                    break
+            if pos >= len(buf) or buf[pos] != "[":
+                raise ValueError(f"{path}: expected a JSON array")
+            pos += 1
+
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE + ",":
+                pos += 1
+            if pos >= len(buf):
+                if not more():
+                    raise ValueError(f"{path}: unterminated JSON array")
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if not more():
+                    raise
+                continue
+            # A number or literal is only complete once a delimiter follows it: "4.5e3" cut
+            # after "4." decodes as 4, with the rest still in the next chunk
+            if not isinstance(item, (dict, list, str)) and not eof \
+                    and (end == len(buf) or buf[end] not in _WHITESPACE + ",]"):
+                more()
+                continue
+            yield item
+            pos = end
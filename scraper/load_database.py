@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Bulk-load scraped universities, faculties and specialties into the
+unisphere schema (unisphere/database.sql).
+
+The scraper JSON files are streamed, the university -> faculty -> specialty
+foreign keys are resolved in memory, and rows are written with batched
+multi-row upserts inside a single transaction. Upserts are keyed on natural
+keys (university name, faculty name per university, specialty name per
+faculty), so re-running the loader is idempotent. A MySQL database created
+from an older database.sql lacks those unique keys; add them with
+unisphere/add_unique_keys.sql first.
+
+    python load_database.py --sqlite unisphere.db    # local stand-in
+    python load_database.py --mysql                   # uses DB_HOST/DB_USER/...
+"""
+import argparse
+import glob
+import os
+import sqlite3
+import time
+
+from jsonstream import iter_array
+
+SCRAPER_DIR = os.path.dirname(os.path.abspath(__file__))
+BATCH_SIZE = 500
+
+EL_OUED = "University of El Oued"
+GHARDAIA = "University of Ghardaia"
+
+# Minimal SQLite equivalent of the three tables we populate
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS university (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name VARCHAR(255) NOT NULL UNIQUE,
+  location VARCHAR(255),
+  description TEXT,
+  logo_image VARCHAR(255),
+  website VARCHAR(255),
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS faculty (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  university_id INT NOT NULL REFERENCES university(id) ON DELETE CASCADE,
+  name VARCHAR(255) NOT NULL,
+  description TEXT,
+  logo_image VARCHAR(255),
+  website VARCHAR(255),
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE (university_id, name)
+);
+CREATE TABLE IF NOT EXISTS specialty (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  faculty_id INT NOT NULL REFERENCES faculty(id) ON DELETE CASCADE,
+  university_id INT NOT NULL REFERENCES university(id) ON DELETE CASCADE,
+  name VARCHAR(255) NOT NULL,
+  description TEXT,
+  degree_level TEXT CHECK (degree_level IN ('bachelor', 'master', 'phd', 'other')),
+  time_table_link VARCHAR(255),
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE (faculty_id, name)
+);
+"""
+
+
+def _clean(value):
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    return value if value and value != "N/A" else None
+
+
+class Catalog:
+    """Natural-key rows collected from the scraper outputs, deduplicated in memory."""
+
+    def __init__(self):
+        self.universities = {}  # name -> website
+        self.faculties = {}     # (university, faculty) -> website
+        self.specialties = {}   # (university, faculty, specialty) -> timetable link
+        self.skipped = 0
+
+    def add_university(self, name, website=None):
+        name = _clean(name)
+        if name:
+            self.universities[name] = _clean(website) or self.universities.get(name)
+        return name
+
+    def add_faculty(self, university, name, website=None):
+        name = _clean(name)
+        if university and name:
+            key = (university, name)
+            self.faculties[key] = _clean(website) or self.faculties.get(key)
+        return name
+
+    def add_specialty(self, university, faculty, name, timetable=None):
+        name = _clean(name)
+        if not (university and faculty and name):
+            self.skipped += 1
+            return
+        key = (university, faculty, name)
+        self.specialties[key] = _clean(timetable) or self.specialties.get(key)
+
+
+def read_universities(catalog, path):
+    """database.json and the unified scraper output share the `universities` layout."""
+    for univ in iter_array(path, "universities"):
+        university = catalog.add_university(univ.get("name"), univ.get("url"))
+        for fac in univ.get("faculties", []):
+            if isinstance(fac, str):
+                fac = {"name": fac}
+            catalog.add_faculty(university, fac.get("name"), fac.get("url"))
+
+        # Specialties hang off departments, and departments name their faculty
+        department_faculty = {
+            dep.get("name"): dep.get("faculty")
+            for dep in univ.get("departments", []) if isinstance(dep, dict)
+        }
+        for spec in univ.get("specialties", []):
+            faculty = _clean(department_faculty.get(spec.get("department")))
+            if faculty:
+                catalog.add_faculty(university, faculty)
+            catalog.add_specialty(university, faculty, spec.get("name"), spec.get("url"))
+
+
+def read_faculty_schedule(catalog, path):
+    # El Oued writes one file per faculty, named after the faculty
+    university = catalog.add_university(EL_OUED)
+    faculty = catalog.add_faculty(university, os.path.splitext(os.path.basename(path))[0])
+    for spec in iter_array(path):
+        catalog.add_specialty(university, faculty, spec.get("specialty_name"), spec.get("timetable"))
+
+
+def read_ghardaia(catalog, path):
+    university = catalog.add_university(GHARDAIA)
+    for fac in iter_array(path, "faculties"):
+        catalog.add_faculty(university, fac.get("name"), fac.get("url"))
+
+
+def collect(scraper_dir=SCRAPER_DIR, extra_files=()):
+    catalog = Catalog()
+    for path in [os.path.join(scraper_dir, "database.json"), *extra_files]:
+        if os.path.exists(path):
+            read_universities(catalog, path)
+    schedules = os.path.join(scraper_dir, "el_oued", "faculty_schedules", "*.json")
+    for path in sorted(glob.glob(schedules)):
+        read_faculty_schedule(catalog, path)
+    ghardaia = os.path.join(scraper_dir, "ghardaia", "faculties.json")
+    if os.path.exists(ghardaia):
+        read_ghardaia(catalog, ghardaia)
+    return catalog
+
+
+class Writer:
+    """Batched multi-row upserts for SQLite (`ON CONFLICT`) or MySQL (`ON DUPLICATE KEY`)."""
+
+    def __init__(self, conn, dialect):
+        self.conn = conn
+        self.dialect = dialect
+        self.mark = "?" if dialect == "sqlite" else "%s"
+
+    def upsert(self, table, columns, key_columns, rows):
+        cursor = self.conn.cursor()
+        updates = [c for c in columns if c not in key_columns]
+        row_marks = "(" + ", ".join([self.mark] * len(columns)) + ")"
+        if self.dialect == "sqlite":
+            assignments = ", ".join(
+                f"{c} = COALESCE(excluded.{c}, {table}.{c})" for c in updates
+            ) + ", updated_at = CURRENT_TIMESTAMP"
+            suffix = f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {assignments}"
+        else:
+            assignments = ", ".join(f"{c} = COALESCE(VALUES({c}), {c})" for c in updates)
+            suffix = f"ON DUPLICATE KEY UPDATE {assignments or 'id = id'}"
+
+        for start in range(0, len(rows), BATCH_SIZE):
+            batch = rows[start:start + BATCH_SIZE]
+            sql = (
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+                + ", ".join([row_marks] * len(batch)) + " " + suffix
+            )
+            cursor.execute(sql, [value for row in batch for value in row])
+
+    def ids(self, table, key_columns, parent_column=None, parent_ids=()):
+        """Map natural keys back to ids, one query per batch of parents."""
+        cursor = self.conn.cursor()
+        select = f"SELECT id, {', '.join(key_columns)} FROM {table}"
+        if parent_column is None:
+            cursor.execute(select)
+            return {tuple(row[1:]): row[0] for row in cursor.fetchall()}
+        mapping = {}
+        parent_ids = list(parent_ids)
+        for start in range(0, len(parent_ids), BATCH_SIZE):
+            batch = parent_ids[start:start + BATCH_SIZE]
+            marks = ", ".join([self.mark] * len(batch))
+            cursor.execute(f"{select} WHERE {parent_column} IN ({marks})", batch)
+            mapping.update({tuple(row[1:]): row[0] for row in cursor.fetchall()})
+        return mapping
+
+
+def load(conn, dialect, catalog):
+    writer = Writer(conn, dialect)
+    try:
+        writer.upsert("university", ["name", "website"], ["name"],
+                      [(name, website) for name, website in catalog.universities.items()])
+        university_ids = {
+            name: uid for (name,), uid in writer.ids("university", ["name"]).items()
+            if name in catalog.universities
+        }
+
+        writer.upsert("faculty", ["university_id", "name", "website"], ["university_id", "name"],
+                      [(university_ids[univ], name, website)
+                       for (univ, name), website in catalog.faculties.items()])
+        faculty_ids = writer.ids("faculty", ["university_id", "name"],
+                                 "university_id", university_ids.values())
+
+        rows = []
+        for (univ, faculty, name), timetable in catalog.specialties.items():
+            faculty_id = faculty_ids.get((university_ids[univ], faculty))
+            if faculty_id is None:
+                catalog.skipped += 1
+                continue
+            rows.append((faculty_id, university_ids[univ], name, timetable))
+        writer.upsert("specialty", ["faculty_id", "university_id", "name", "time_table_link"],
+                      ["faculty_id", "name"], rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(rows)
+
+
+def connect(args):
+    if args.sqlite:
+        conn = sqlite3.connect(args.sqlite)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.executescript(SQLITE_SCHEMA)
+        return conn, "sqlite"
+
+    import pymysql
+    conn = pymysql.connect(
+        host=os.environ.get("DB_HOST", "localhost"),
+        user=os.environ.get("DB_USER", "root"),
+        password=os.environ.get("DB_PASSWORD", ""),
+        database=os.environ.get("DB_NAME", "unisphere"),
+        charset="utf8mb4",
+        autocommit=False,
+    )
+    return conn, "mysql"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--sqlite", metavar="PATH", help="load into a local SQLite database")
+    target.add_argument("--mysql", action="store_true", help="load into MySQL using DB_* env vars")
+    parser.add_argument("--scraper-dir", default=SCRAPER_DIR)
+    parser.add_argument("files", nargs="*", help="extra files in the `universities` layout")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    catalog = collect(args.scraper_dir, args.files)
+    conn, dialect = connect(args)
+    try:
+        specialties = load(conn, dialect, catalog)
+    finally:
+        conn.close()
+
+    print(f"Loaded {len(catalog.universities)} universities, {len(catalog.faculties)} faculties "
+          f"and {specialties} specialties in {time.perf_counter() - start:.2f}s "
+          f"({catalog.skipped} specialties skipped without a faculty)")
+
+
+if __name__ == "__main__":
+    main()
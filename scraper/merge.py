@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Merge the news and event records of every scraper into one schema.
+
+Each scraper names its fields differently (`link` vs `url`, `date` vs
+`datetime` vs `published`, `image` vs `image_url`) and re-crawls repeat
+records. This stage maps all of them onto:
+
+    {"kind", "university", "source", "title", "url", "date", "date_text",
+     "description", "content", "image", "image_local", "thumbnail_local",
+     "pdf_url", "fingerprint"}
+
+where `date` is an ISO timestamp parsed once here. Records are deduplicated
+by canonical URL and by a fingerprint of their content, both kept as hashed
+indexes, and streamed to a JSON Lines file.
+
+    python merge.py                       # writes merged_records.jsonl
+    python merge.py --append              # only add records not merged yet
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit
+
+from jsonstream import iter_array
+
+SCRAPER_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_FILE = os.path.join(SCRAPER_DIR, "merged_records.jsonl")
+
+FIELDS = ("kind", "university", "source", "title", "url", "date", "date_text",
+          "description", "content", "image", "image_local", "thumbnail_local", "pdf_url", "fingerprint")
+PLACEHOLDERS = {"", "N/A", "n/a", "None", "null"}
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid)$")
+
+MONTHS = {
+    # French
+    "janvier": "january", "février": "february", "fevrier": "february",
+    "mars": "march", "avril": "april", "mai": "may", "juin": "june",
+    "juillet": "july", "août": "august", "aout": "august",
+    "septembre": "september", "octobre": "october", "novembre": "november",
+    "décembre": "december", "decembre": "december",
+    # Arabic (Maghreb and Mashriq names)
+    "جانفي": "january", "يناير": "january", "فيفري": "february", "فبراير": "february",
+    "مارس": "march", "أفريل": "april", "أبريل": "april", "ابريل": "april",
+    "ماي": "may", "مايو": "may", "جوان": "june", "يونيو": "june",
+    "جويلية": "july", "يوليو": "july", "أوت": "august", "أغسطس": "august",
+    "سبتمبر": "september", "أكتوبر": "october", "نوفمبر": "november", "ديسمبر": "december",
+}
+MONTH_RE = re.compile(r"\b(?:%s)\b" % "|".join(sorted(map(re.escape, MONTHS), key=len, reverse=True)))
+WEEKDAY_RE = re.compile(
+    r"\b(mon|tue|wed|thu|fri|sat|sun)[a-z]*\b|\b(lundi|mardi|mercredi|jeudi|vendredi|samedi|dimanche)\b"
+)
+RFC2822_RE = re.compile(r"^[A-Za-z]{3}, \d{1,2} [A-Za-z]{3} \d{4}")
+DATE_FORMATS = (
+    "%B %d %Y %I:%M %p", "%B %d %Y %H:%M", "%B %d %Y", "%b %d %Y",
+    "%d %B %Y %H:%M", "%d %B %Y", "%d %b %Y",
+    "%d/%m/%Y %H:%M", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%Y/%m/%d",
+)
+
+
+def clean(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return None if value in PLACEHOLDERS else value
+
+
+@lru_cache(maxsize=4096)
+def parse_date(text):
+    """Parse the free-text dates the scrapers emit into an ISO timestamp, or None."""
+    text = clean(text)
+    if not text:
+        return None
+    try:
+        return datetime.fromisoformat(text).isoformat()
+    except ValueError:
+        pass
+    if RFC2822_RE.match(text):
+        try:
+            return parsedate_to_datetime(text).isoformat()  # RSS `published`
+        except (TypeError, ValueError, IndexError):
+            pass
+
+    normalized = MONTH_RE.sub(lambda m: MONTHS[m.group(0)], text.lower())
+    normalized = WEEKDAY_RE.sub(" ", normalized)
+    normalized = re.sub(r"(\d)(st|nd|rd|th)\b", r"\1", normalized)
+    normalized = " ".join(normalized.replace(",", " ").split())
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(normalized, fmt).isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def canonical_url(url):
+    """Normalise a URL for deduplication: scheme, host, percent-encoding, tracking params."""
+    url = clean(url)
+    if not url:
+        return None
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = quote(unquote(parts.path), safe="/:@!$&'()*+,;=-._~").rstrip("/") or "/"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAMS.match(k)
+    )
+    return f"{host}{path}" + (f"?{urlencode(query)}" if query else "")
+
+
+def digest(text):
+    """8-byte blake2b of `text`; also keys the event store (event_store.py)."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+
+
+def fingerprint(record):
+    """Content fingerprint; None when there is no title to fingerprint."""
+    title = " ".join((record.get("title") or "").lower().split())
+    if not title:
+        return None
+    body = " ".join((record.get("content") or record.get("description") or "").lower().split())
+    day = (record.get("date") or "")[:10] or (record.get("date_text") or "")
+    return digest("\x1f".join((title, day, body[:500]))).hex()
+
+
+def normalize(raw, kind, university, source):
+    """Map one scraped news/event item onto the merged schema."""
+    date_text = clean(raw.get("date") or raw.get("datetime") or raw.get("published"))
+    image = clean(raw.get("image") or raw.get("image_url"))
+    if image:
+        image = image.strip("'\"")  # Ghardaia images come from CSS url('...')
+    record = {
+        "kind": kind,
+        "university": university,
+        "source": source,
+        "title": clean(raw.get("title")),
+        "url": clean(raw.get("link") or raw.get("url")),
+        "date": parse_date(date_text),
+        "date_text": date_text,
+        "description": clean(raw.get("description")),
+        "content": clean(raw.get("content")),
+        "image": image,
+        # Mirrored copies, once assets.py has run over the scraper outputs
+        "image_local": clean(raw.get("image_local")),
+        "thumbnail_local": clean(raw.get("thumbnail_local")),
+        "pdf_url": clean(raw.get("pdf_url")),
+    }
+    record["fingerprint"] = fingerprint(record)
+    return record
+
+
+# --- Per-scraper readers: each yields (kind, raw item, university) ---------------
+
+def read_list(kind, university):
+    def read(path):
+        for item in iter_array(path):
+            yield kind, item, university
+    return read
+
+
+def read_keys(university, **kinds):
+    def read(path):
+        for key, kind in kinds.items():
+            for item in iter_array(path, key):
+                yield kind, item, university
+    return read
+
+
+def read_universities(path):
+    """database.json / unified scraper output, or a single MIT/Oxford-style university."""
+    with open(path, "r", encoding="utf-8") as f:
+        head = f.read(4096)
+    if '"universities"' in head:
+        universities = iter_array(path, "universities")
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            universities = [json.load(f)]
+    for univ in universities:
+        for kind, key in (("news", "news"), ("event", "events")):
+            for item in univ.get(key, []):
+                yield kind, item, univ.get("name")
+
+
+# Fresh per-site outputs come first so their fuller records win over the
+# summaries repeated in database.json.
+SOURCES = [
+    ("el_oued_news", "el_oued/eloued_news.json", read_list("news", "University of El Oued")),
+    ("el_oued_events", "el_oued/eloued_events.json", read_list("event", "University of El Oued")),
+    ("ensia_news", "ensia/ensia_news.json", read_list("news", "ENSIA")),
+    ("ghardaia_events", "ghardaia/faculties.json",
+     read_keys("University of Ghardaia", featured_events="event")),
+    ("annaba", "annaba/annaba.json", read_keys("University of Annaba", news="news", events="event")),
+    ("database", "database.json", read_universities),
+]
+
+
+class Deduplicator:
+    """Hashed indexes over canonical URLs and content fingerprints."""
+
+    def __init__(self):
+        self.urls = set()
+        self.fingerprints = set()
+        self.duplicates = 0
+
+    def add(self, record):
+        url = canonical_url(record.get("url"))
+        url_key = digest(url) if url else None
+        fp = record.get("fingerprint")
+        if (url_key and url_key in self.urls) or (fp and fp in self.fingerprints):
+            self.duplicates += 1
+            return False
+        if url_key:
+            self.urls.add(url_key)
+        if fp:
+            self.fingerprints.add(fp)
+        return True
+
+
+def iter_sources(scraper_dir=SCRAPER_DIR, extra_files=()):
+    for source, path, reader in SOURCES:
+        path = os.path.join(scraper_dir, path)
+        if os.path.exists(path):
+            for kind, raw, university in reader(path):
+                yield normalize(raw, kind, university, source)
+    for path in extra_files:
+        source = os.path.splitext(os.path.basename(path))[0]
+        for kind, raw, university in read_universities(path):
+            yield normalize(raw, kind, university, source)
+
+
+def merge(output=OUTPUT_FILE, scraper_dir=SCRAPER_DIR, extra_files=(), append=False):
+    dedup = Deduplicator()
+    if append and os.path.exists(output):
+        with open(output, "r", encoding="utf-8") as f:
+            for line in f:
+                dedup.add(json.loads(line))
+    dedup.duplicates = 0
+
+    written = 0
+    with open(output, "a" if append else "w", encoding="utf-8") as out:
+        for record in iter_sources(scraper_dir, extra_files):
+            if dedup.add(record):
+                out.write(json.dumps({k: record[k] for k in FIELDS}, ensure_ascii=False) + "\n")
+                written += 1
+    return written, dedup.duplicates
+
+
+def iter_merged(path=OUTPUT_FILE, kind=None):
+    """Stream merged records back, optionally only one kind ("news" or "event")."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if kind is None or record["kind"] == kind:
+                yield record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge scraped news and events into one schema")
+    parser.add_argument("files", nargs="*", help="extra university JSON files (unified, MIT or Oxford output)")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--scraper-dir", default=SCRAPER_DIR)
+    parser.add_argument("--append", action="store_true", help="keep existing output and add only new records")
+    args = parser.parse_args()
+
+    written, duplicates = merge(args.output, args.scraper_dir, args.files, args.append)
+    print(f"Merged {written} records into '{args.output}' ({duplicates} duplicates dropped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ import feedparser
 import json
 from urllib.parse import urljoin
 
+NEWS_URL = "https://news.mit.edu/rss"
+CALENDAR_URL = "https://calendar.mit.edu/"
+
 def extract_specialties(dept_url):
     """
     Fetches a department page and extracts the Groups section
@@ -24,8 +27,11 @@ def extract_specialties(dept_url):
         resp.raise_for_status()
     except requests.RequestException:
         return []
+    return parse_specialties(resp.text, dept_url)
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+def parse_specialties(html, dept_url):
+    """Groups of an already fetched department page (see extract_specialties)."""
+    soup = BeautifulSoup(html, "html.parser")
     specialties = []
     
     # Look for the dedicated "Groups" section
@@ -87,53 +93,64 @@ def scrape_mit():
     # 1. Faculties & Departments (with URLs)
     resp = requests.get(data["url"])
     resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "html.parser")
+    faculties, departments = parse_schools(resp.text, data["url"])
+    data["faculties"] = faculties
+
+    for dept_name, dept_url in departments:
+        specs = extract_specialties(dept_url)
+        data["departments"].append({
+            "name": dept_name,
+            "url": dept_url,
+            "specialties": specs
+        })
+        # Optionally aggregate all specialties at the root level.
+        for s in specs:
+            if s not in data["specialties"]:
+                data["specialties"].append(s)
+
+    # 2. News (latest 5)
+    data["news"] = parse_news(feedparser.parse(NEWS_URL))
+
+    # 3. Events (first 5)
+    resp = requests.get(CALENDAR_URL)
+    resp.raise_for_status()
+    data["events"] = parse_events(resp.text, CALENDAR_URL)
+
+    return data
+
+def parse_schools(html, url):
+    """School names and (department name, URL) pairs from the Schools & Departments page."""
+    soup = BeautifulSoup(html, "html.parser")
 
     schools_h2 = soup.find("h2", string=lambda t: t and "Schools & Departments" in t)
     schools_ul = schools_h2.find_next("ul") if schools_h2 else None
     if not schools_ul:
         raise RuntimeError("Could not find Schools & Departments list")
 
+    faculties, departments = [], []
     for school_li in schools_ul.find_all("li", recursive=False):
         a_school = school_li.find("a")
         if not a_school:
             continue
-        school_name = a_school.get_text(strip=True)
-        data["faculties"].append(school_name)
+        faculties.append(a_school.get_text(strip=True))
 
         # Look for department items within the school.
         for dept_li in school_li.find_all("li", class_="sortable-list__item"):
             a = dept_li.find("a", href=True)
             if not a:
                 continue
-            dept_name = a.get_text(strip=True)
-            dept_url = urljoin(data["url"], a["href"])
-            specs = extract_specialties(dept_url)
-            data["departments"].append({
-                "name": dept_name,
-                "url": dept_url,
-                "specialties": specs
-            })
-            # Optionally aggregate all specialties at the root level.
-            for s in specs:
-                if s not in data["specialties"]:
-                    data["specialties"].append(s)
-
-    # 2. News (latest 5)
-    feed = feedparser.parse("https://news.mit.edu/rss")
-    for entry in feed.entries[:5]:
-        data["news"].append({
-            "title": entry.title,
-            "url": entry.link,
-            "published": entry.published
-        })
-
-    # 3. Events (first 5)
-    ev_url = "https://calendar.mit.edu/"
-    resp = requests.get(ev_url)
-    resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "html.parser")
-
+            departments.append((a.get_text(strip=True), urljoin(url, a["href"])))
+    return faculties, departments
+
+def parse_news(feed, limit=5):
+    """Latest `limit` entries of the parsed news feed."""
+    return [{"title": entry.title, "url": entry.link, "published": entry.published}
+            for entry in feed.entries[:limit]]
+
+def parse_events(html, ev_url, limit=5):
+    """First `limit` events of the calendar page."""
+    soup = BeautifulSoup(html, "html.parser")
+    events = []
     count = 0
     for h3 in soup.find_all("h3"):
         a = h3.find("a", href=True)
@@ -157,16 +174,16 @@ def scrape_mit():
                 date = txt
                 break
 
-        data["events"].append({
+        events.append({
             "title": title,
             "url": event_url,
             "datetime": date
         })
         count += 1
-        if count >= 5:
+        if count >= limit:
             break
 
-    return data
+    return events
 
 if __name__ == "__main__":
     result = scrape_mit()
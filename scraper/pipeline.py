@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Staged fetch -> parse -> write pipeline for the scrapers.
+
+The scrapers fetch a page, parse it, then fetch the next one in a single
+thread, so the network sits idle while BeautifulSoup runs and the CPU sits
+idle while a slow university server answers. Here the stages run apart:
+
+    fetchers   FETCHERS asyncio tasks on one httpx.AsyncClient, at most
+               HOST_CONNECTIONS requests per host; raw pages go into a
+               bounded queue, so fetching pauses when parsing falls behind
+    parsers    a process pool running the scrapers' own parse functions
+               (engine specs, mit_scraper, el_oued_programs) on those pages;
+               they return records plus the follow-up pages to fetch
+    writers    one JSON Lines file per site and stream, appended as records
+               arrive (in completion order, not page order)
+
+so the network and every core are busy at the same time. Failed fetches
+still go through their parse function with no page, which is how detail
+records get their defaults like in the engine.
+
+    python pipeline.py el_oued_events el_oued_news oxford mit
+    python pipeline.py el_oued_programs --fetchers 32 --parsers 4 --output /tmp/crawl
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+import httpx
+
+from engine import HEADERS, Extraction, load_spec, parse_html
+from sources import EL_OUED_URL, SCRAPER_DIR
+
+OUTPUT_DIR = os.path.join(SCRAPER_DIR, "pipeline_output")
+FETCHERS = 16
+HOST_CONNECTIONS = 4
+PARSE_PROCESSES = os.cpu_count() or 2
+TIMEOUT = 15
+FLUSH_EVERY = 100
+
+# `kind` names the parse function in PARSERS; `meta` is what it needs besides the page
+Request = namedtuple("Request", "url kind meta")
+
+
+# --- Parse stage: runs in the worker processes ----------------------------------
+# Each parser takes (content or None, url, meta) and returns
+# ([(stream, record), ...], [Request, ...]).
+
+def _extraction(meta):
+    compiled = load_spec(meta["spec"])
+    return compiled if isinstance(compiled, Extraction) else compiled[1][meta["section"]]
+
+
+def parse_spec_listing(content, url, meta):
+    if content is None:
+        return [], []
+    extraction = _extraction(meta)
+    records, next_url = extraction.parse_listing(parse_html(content), url)
+    if extraction.limit:
+        records = records[:extraction.limit - meta["count"]]
+    count = meta["count"] + len(records)
+    stream = meta["section"] or "records"
+
+    out, follow = [], []
+    for record in records:
+        if extraction.detail_fields and record.get(extraction.detail_url):
+            follow.append(Request(record[extraction.detail_url], "spec_detail", {**meta, "record": record}))
+        else:
+            out.append((stream, extraction.parse_detail(record, None, None) if extraction.detail_fields else record))
+    more = not extraction.limit or count < extraction.limit
+    if next_url and more and meta["page"] + 1 < extraction.max_pages and next_url not in meta["visited"]:
+        follow.append(Request(next_url, "spec_listing", {**meta, "count": count, "page": meta["page"] + 1,
+                                                         "visited": meta["visited"] + [next_url]}))
+    return out, follow
+
+
+def parse_spec_detail(content, url, meta):
+    page = parse_html(content) if content is not None else None
+    return [(meta["section"] or "records", _extraction(meta).parse_detail(meta["record"], page, url))], []
+
+
+def parse_mit_schools(content, url, meta):
+    from mit.mit_scraper import parse_schools
+
+    if content is None:
+        return [], []
+    faculties, departments = parse_schools(content, url)
+    return ([("faculties", {"name": name}) for name in faculties],
+            [Request(dept_url, "mit_department", {"name": name}) for name, dept_url in departments])
+
+
+def parse_mit_department(content, url, meta):
+    from mit.mit_scraper import parse_specialties
+
+    specialties = parse_specialties(content, url) if content is not None else []
+    return [("departments", {"name": meta["name"], "url": url, "specialties": specialties})], []
+
+
+def parse_mit_news(content, url, meta):
+    import feedparser
+    from mit.mit_scraper import parse_news
+
+    return ([("news", item) for item in parse_news(feedparser.parse(content))] if content is not None else []), []
+
+
+def parse_mit_events(content, url, meta):
+    from mit.mit_scraper import parse_events
+
+    return ([("events", item) for item in parse_events(content, url)] if content is not None else []), []
+
+
+def parse_eloued_faculties(content, url, meta):
+    from el_oued.el_oued_programs import parse_faculty_links
+
+    if content is None:
+        return [], []
+    return [], [Request(link, "eloued_faculty", {}) for link in parse_faculty_links(content, meta["base_url"])]
+
+
+def parse_eloued_faculty(content, url, meta):
+    from el_oued.el_oued_programs import parse_faculty_page, parse_timetable
+
+    if content is None:
+        return [], []
+    faculty, specialties = parse_faculty_page(content, url)
+    # Specialty URLs are anchors into the faculty page: their timetable is the one on the page we have
+    timetable = parse_timetable(content, url)
+    out, follow = [], []
+    for specialty in specialties:
+        record = {"faculty": faculty, "faculty_url": url, **specialty}
+        if urldefrag(specialty["specialty_url"])[0].rstrip("/") == urldefrag(url)[0].rstrip("/"):
+            out.append(("specialties", {**record, **({"timetable": timetable} if timetable else {})}))
+        else:
+            follow.append(Request(specialty["specialty_url"], "eloued_specialty", {"record": record}))
+    return out, follow
+
+
+def parse_eloued_specialty(content, url, meta):
+    from el_oued.el_oued_programs import parse_timetable
+
+    record = meta["record"]
+    timetable = parse_timetable(content, record["faculty_url"]) if content is not None else None
+    return [("specialties", {**record, **({"timetable": timetable} if timetable else {})})], []
+
+
+PARSERS = {
+    "spec_listing": parse_spec_listing,
+    "spec_detail": parse_spec_detail,
+    "mit_schools": parse_mit_schools,
+    "mit_department": parse_mit_department,
+    "mit_news": parse_mit_news,
+    "mit_events": parse_mit_events,
+    "eloued_faculties": parse_eloued_faculties,
+    "eloued_faculty": parse_eloued_faculty,
+    "eloued_specialty": parse_eloued_specialty,
+}
+
+
+def parse_page(request, content):
+    return PARSERS[request.kind](content, request.url, request.meta)
+
+
+# --- Seeds: the first requests of each site ---------------------------------------
+
+def spec_seeds(name):
+    def seeds():
+        compiled = load_spec(name)
+        sections = {None: compiled} if isinstance(compiled, Extraction) else compiled[1]
+        return [Request(extraction.url, "spec_listing",
+                        {"spec": name, "section": key, "count": 0, "page": 0, "visited": [extraction.url]})
+                for key, extraction in sections.items()]
+    return seeds
+
+
+def mit_seeds():
+    from mit.mit_scraper import CALENDAR_URL, NEWS_URL
+
+    return [Request("https://web.mit.edu/education/schools-and-departments/", "mit_schools", {}),
+            Request(NEWS_URL, "mit_news", {}),
+            Request(CALENDAR_URL, "mit_events", {})]
+
+
+def eloued_programs_seeds():
+    return [Request(urljoin(EL_OUED_URL, "tim_tab/"), "eloued_faculties", {"base_url": EL_OUED_URL})]
+
+
+SITES = {
+    "el_oued_events": spec_seeds("el_oued_events"),
+    "el_oued_news": spec_seeds("el_oued_news"),
+    "oxford": spec_seeds("oxford"),
+    "mit": mit_seeds,
+    "el_oued_programs": eloued_programs_seeds,
+}
+
+
+# --- Fetch and write stages -----------------------------------------------------------
+
+class Writers:
+    """One JSON Lines file per (site, stream), opened on its first record."""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.files = {}
+        self.counts = Counter()
+
+    def write(self, site, stream, record):
+        key = (site, stream)
+        f = self.files.get(key)
+        if f is None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            f = self.files[key] = open(os.path.join(self.output_dir, f"{site}.{stream}.jsonl"), "w", encoding="utf-8")
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.counts[f"{site}.{stream}"] += 1
+        if self.counts[f"{site}.{stream}"] % FLUSH_EVERY == 0:
+            f.flush()
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+
+class Pipeline:
+    def __init__(self, output_dir=OUTPUT_DIR, fetchers=FETCHERS, parsers=PARSE_PROCESSES, timeout=TIMEOUT):
+        self.output_dir = output_dir
+        self.fetchers = fetchers
+        self.parsers = parsers
+        self.timeout = timeout
+        self.host_slots = {}
+        self.stats = Counter()
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.host_slots:
+            self.host_slots[host] = asyncio.Semaphore(HOST_CONNECTIONS)
+        return self.host_slots[host]
+
+    async def fetch(self, client, frontier, pages):
+        while True:
+            site, request = await frontier.get()
+            content = None
+            try:
+                async with self._host_slot(request.url):
+                    response = await client.get(urldefrag(request.url)[0])
+                response.raise_for_status()
+                content = response.content
+                self.stats["pages"] += 1
+                self.stats["bytes"] += len(content)
+            except Exception as e:
+                # Any failure still hands the page on (as None): the parse stage marks it done,
+                # or frontier.join() would wait for it forever
+                self.stats["failed"] += 1
+                print(f"Error fetching {request.url}: {type(e).__name__}: {e}")
+            # Waits while the parsers are a full queue of pages behind
+            await pages.put((site, request, content))
+
+    async def parse(self, pool, frontier, pages, records):
+        loop = asyncio.get_running_loop()
+        while True:
+            site, request, content = await pages.get()
+            try:
+                out, follow = await loop.run_in_executor(pool, parse_page, request, content)
+            except Exception as e:
+                self.stats["parse_errors"] += 1
+                print(f"Error parsing {request.url}: {type(e).__name__}: {e}")
+                out, follow = [], []
+            for follow_request in follow:
+                frontier.put_nowait((site, follow_request))
+            for stream, record in out:
+                await records.put((site, stream, record))
+            # Only now, so the frontier can't look finished while follow-ups are being queued
+            frontier.task_done()
+
+    async def write(self, writers, records):
+        while True:
+            site, stream, record = await records.get()
+            writers.write(site, stream, record)
+            records.task_done()
+
+    async def run(self, sites):
+        frontier = asyncio.Queue()
+        pages = asyncio.Queue(maxsize=2 * self.parsers)
+        records = asyncio.Queue(maxsize=FLUSH_EVERY * self.parsers)
+        for site in sites:
+            for request in SITES[site]():
+                frontier.put_nowait((site, request))
+
+        writers = Writers(self.output_dir)
+        limits = httpx.Limits(max_connections=self.fetchers, max_keepalive_connections=self.fetchers)
+        with ProcessPoolExecutor(max_workers=self.parsers) as pool:
+            async with httpx.AsyncClient(headers=HEADERS, timeout=self.timeout, limits=limits,
+                                         follow_redirects=True) as client:
+                tasks = [asyncio.create_task(self.fetch(client, frontier, pages)) for _ in range(self.fetchers)]
+                # Twice the pool size keeps every worker busy while results come back
+                tasks += [asyncio.create_task(self.parse(pool, frontier, pages, records))
+                          for _ in range(2 * self.parsers)]
+                tasks.append(asyncio.create_task(self.write(writers, records)))
+                await frontier.join()
+                await records.join()
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        writers.close()
+        return writers.counts
+
+
+def run(sites, output_dir=OUTPUT_DIR, fetchers=FETCHERS, parsers=PARSE_PROCESSES):
+    """Crawl `sites` through the pipeline; returns {"<site>.<stream>": records written}."""
+    return asyncio.run(Pipeline(output_dir, fetchers, parsers).run(sites))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl sites with concurrent fetching and multi-process parsing")
+    parser.add_argument("sites", nargs="*", help=f"sites to crawl (default: all of {', '.join(SITES)})")
+    parser.add_argument("--output", default=OUTPUT_DIR, help="directory for the <site>.<stream>.jsonl files")
+    parser.add_argument("--fetchers", type=int, default=FETCHERS, help="concurrent requests")
+    parser.add_argument("--parsers", type=int, default=PARSE_PROCESSES, help="parser processes")
+    args = parser.parse_args()
+    unknown = [name for name in args.sites if name not in SITES]
+    if unknown:
+        parser.error(f"unknown site(s): {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    pipeline = Pipeline(args.output, args.fetchers, args.parsers)
+    counts = asyncio.run(pipeline.run(args.sites or list(SITES)))
+    elapsed = time.perf_counter() - start
+    print(f"Fetched {pipeline.stats['pages']} pages ({pipeline.stats['bytes'] / 1024:.0f} KB, "
+          f"{pipeline.stats['failed']} failed) in {elapsed:.1f}s, {pipeline.stats['pages'] / elapsed:.1f} pages/s")
+    for stream, count in sorted(counts.items()):
+        print(f"  {stream}: {count} records")
+    print(f"✅ Records written to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
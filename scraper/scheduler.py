@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Crawl scheduler: a persistent URL frontier that re-runs the scrapers only
+when the pages behind them change.
+
+Each job below re-runs one scraper from sources.py, or one section of it.
+Its seed URLs are the listing and program pages the scraper starts from.
+They are kept in a SQLite frontier together with the article and PDF links
+harvested from the job's output. When a URL is due it is re-checked with a
+conditional request: ETag / Last-Modified first, then a hash of the page
+text (PDFs only get a HEAD). A job runs only when one of its URLs changed.
+
+Each kind of URL starts at its own refresh interval. The interval then
+adapts per URL within the kind's bounds: it halves when the page had changed
+since the last check and grows by half when it had not. Busy news listings
+end up checked every few minutes and term-long program tables every few
+months.
+
+    python scheduler.py                   # run as a daemon
+    python scheduler.py --once            # check what is due, run jobs, exit
+    python scheduler.py --status          # frontier overview
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from urllib.parse import urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+
+from event_store import EventStore
+from sources import SCRAPER_DIR, run_scraper
+
+FRONTIER_DB = os.path.join(SCRAPER_DIR, "frontier.sqlite")
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Refresh interval bounds (seconds) per kind of URL; lower priority is checked first
+POLICIES = {
+    "listing": {"interval": HOUR, "min": 15 * 60, "max": DAY, "priority": 0},
+    "program": {"interval": 7 * DAY, "min": DAY, "max": 120 * DAY, "priority": 1},
+    "article": {"interval": DAY, "min": 6 * HOUR, "max": 30 * DAY, "priority": 2},
+    "pdf": {"interval": 30 * DAY, "min": 7 * DAY, "max": 180 * DAY, "priority": 3},
+}
+SEED_KINDS = ("listing", "program")
+CHANGED_FACTOR = 0.5
+UNCHANGED_FACTOR = 1.5
+
+BATCH = 50            # URLs checked per pass
+HOST_DELAY = 1.0      # seconds between two requests to the same host
+TIMEOUT = 15
+MAX_SLEEP = 300
+MAX_HARVEST = 200     # article/PDF links tracked per job
+
+HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                   "AppleWebKit/537.36 (KHTML, like Gecko) "
+                   "Chrome/113.0.0.0 Safari/537.36")
+}
+
+EL_OUED = "https://www.univ-eloued.dz/en/"
+OXFORD = "https://www.ox.ac.uk"
+
+# job -> scraper in sources.py (optionally one section function and its output key),
+# seed URLs by kind, and whether to track the article/PDF links found in its output
+JOBS = {
+    "el_oued_news": {"scraper": "el_oued_news", "listing": [EL_OUED + "event2023/"], "harvest": True},
+    "el_oued_events": {"scraper": "el_oued_events", "listing": [EL_OUED + "meet/"], "harvest": True},
+    "el_oued_programs": {"scraper": "el_oued_programs", "program": [EL_OUED + "tim_tab/"]},
+    "ensia_news": {"scraper": "ensia_news", "listing": ["https://www.ensia.edu.dz/news/"]},
+    "ensia_programs": {"scraper": "ensia_programs", "program": ["https://www.ensia.edu.dz/program/"]},
+    "ghardaia": {"scraper": "ghardaia", "listing": ["https://www.univ-ghardaia.edu.dz/en/"], "harvest": True},
+    "annaba": {"scraper": "annaba", "listing": ["https://www.univ-annaba.dz/"]},
+    "mit": {"scraper": "mit", "listing": ["https://news.mit.edu/rss", "https://calendar.mit.edu/"],
+            "program": ["https://web.mit.edu/education/schools-and-departments/"]},
+    "oxford_events": {"scraper": "oxford", "function": "scrape_events", "key": "events",
+                      "listing": [OXFORD + "/events-list"]},
+    "oxford_graduate_courses": {"scraper": "oxford", "function": "scrape_graduate_courses",
+                                "key": "graduate_courses",
+                                "program": [OXFORD + "/admissions/graduate/courses/courses-a-z-listing"]},
+    "oxford_graduate_colleges": {"scraper": "oxford", "function": "scrape_graduate_colleges",
+                                 "key": "graduate_colleges",
+                                 "program": [OXFORD + "/admissions/graduate/colleges/college-listing"]},
+    "oxford_undergraduate_courses": {"scraper": "oxford", "function": "scrape_undergraduate_courses",
+                                     "key": "undergraduate_courses",
+                                     "program": [OXFORD + "/admissions/undergraduate/courses/course-listing"]},
+    "oxford_undergraduate_colleges": {"scraper": "oxford", "function": "scrape_undergraduate_colleges",
+                                      "key": "undergraduate_colleges",
+                                      "program": [OXFORD + "/admissions/undergraduate/colleges/a-z-of-colleges"]},
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    url TEXT PRIMARY KEY,
+    job TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    interval REAL NOT NULL,
+    next_due REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fingerprint TEXT,
+    checks INTEGER NOT NULL DEFAULT 0,
+    changes INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0,
+    last_checked REAL,
+    last_changed REAL
+);
+CREATE INDEX IF NOT EXISTS frontier_due ON frontier (priority, next_due);
+CREATE TABLE IF NOT EXISTS jobs (
+    name TEXT PRIMARY KEY,
+    runs INTEGER NOT NULL DEFAULT 0,
+    last_run REAL,
+    last_duration REAL,
+    last_error TEXT
+);
+"""
+
+
+class Frontier:
+    """URLs to re-check, ordered by kind priority then due time."""
+
+    def __init__(self, path=FRONTIER_DB):
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def add(self, url, job, kind, due):
+        policy = POLICIES[kind]
+        self.db.execute(
+            "INSERT OR IGNORE INTO frontier (url, job, kind, priority, interval, next_due) VALUES (?, ?, ?, ?, ?, ?)",
+            (url, job, kind, policy["priority"], policy["interval"], due),
+        )
+
+    def seed(self, jobs=JOBS):
+        now = time.time()
+        for name, job in jobs.items():
+            for kind in SEED_KINDS:
+                for url in job.get(kind, ()):
+                    self.add(url, name, kind, now)
+        self.db.commit()
+
+    def replace_harvest(self, job, links, now):
+        """Track exactly `links` ((kind, url) pairs) as the job's article/PDF URLs."""
+        urls = {url for _, url in links}
+        stale = [row["url"] for row in self.db.execute(
+            "SELECT url FROM frontier WHERE job = ? AND kind IN ('article', 'pdf')", (job,))
+            if row["url"] not in urls]
+        self.db.executemany("DELETE FROM frontier WHERE url = ?", [(url,) for url in stale])
+        for kind, url in links:
+            # The scraper has just fetched these, so the first check can wait a full interval
+            self.add(url, job, kind, now + POLICIES[kind]["interval"])
+        self.db.commit()
+
+    def due(self, now, limit=BATCH):
+        return self.db.execute(
+            "SELECT * FROM frontier WHERE next_due <= ? ORDER BY priority, next_due LIMIT ?", (now, limit)
+        ).fetchall()
+
+    def seeds(self, job):
+        return self.db.execute(
+            "SELECT * FROM frontier WHERE job = ? AND kind IN ('listing', 'program')", (job,)
+        ).fetchall()
+
+    def next_due(self):
+        return self.db.execute("SELECT MIN(next_due) FROM frontier").fetchone()[0]
+
+    def checked(self, entry, changed, etag, last_modified, fingerprint, now):
+        """Store a check's result; `changed` is None on the first visit, which keeps the interval."""
+        policy = POLICIES[entry["kind"]]
+        interval = entry["interval"]
+        if changed is not None:
+            factor = CHANGED_FACTOR if changed else UNCHANGED_FACTOR
+            interval = min(policy["max"], max(policy["min"], interval * factor))
+        self.db.execute(
+            "UPDATE frontier SET interval = ?, next_due = ?, etag = ?, last_modified = ?, fingerprint = ?, "
+            "checks = checks + 1, changes = changes + ?, failures = 0, last_checked = ?, "
+            "last_changed = CASE WHEN ? THEN ? ELSE last_changed END WHERE url = ?",
+            (interval, now + interval, etag, last_modified, fingerprint, int(bool(changed)), now,
+             int(bool(changed)), now, entry["url"]),
+        )
+        self.db.commit()
+
+    def failed(self, entry, now):
+        # Back off exponentially from a minute, never past the kind's normal interval
+        delay = min(POLICIES[entry["kind"]]["interval"], 60 * 2 ** entry["failures"])
+        self.db.execute("UPDATE frontier SET failures = failures + 1, next_due = ?, last_checked = ? WHERE url = ?",
+                        (now + delay, now, entry["url"]))
+        self.db.commit()
+
+    def job_ran(self, name, started, duration, error):
+        self.db.execute(
+            "INSERT INTO jobs (name, runs, last_run, last_duration, last_error) VALUES (?, 1, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET runs = runs + 1, last_run = excluded.last_run, "
+            "last_duration = excluded.last_duration, last_error = excluded.last_error",
+            (name, started, duration, error),
+        )
+        self.db.commit()
+
+    def status(self):
+        return self.db.execute(
+            "SELECT f.job, f.kind, COUNT(*) AS urls, SUM(f.checks) AS checks, SUM(f.changes) AS changes, "
+            "AVG(f.interval) AS interval, MIN(f.next_due) AS next_due, j.runs, j.last_error "
+            "FROM frontier f LEFT JOIN jobs j ON j.name = f.job GROUP BY f.job, f.kind ORDER BY f.job, f.priority"
+        ).fetchall()
+
+
+def page_fingerprint(response):
+    """Hash of what a reader sees, so rotating tokens and inline scripts don't count as changes."""
+    if "html" in response.headers.get("Content-Type", ""):
+        soup = BeautifulSoup(response.content, "html.parser")
+        for tag in soup(["script", "style", "noscript"]):
+            tag.decompose()
+        content = " ".join(soup.get_text(" ").split()).encode("utf-8")
+    else:
+        content = response.content
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+class Checker:
+    """Conditional re-fetches with a per-host delay."""
+
+    def __init__(self, session=None):
+        self.session = session or requests.Session()
+        self.session.headers.update(HEADERS)
+        self.last_request = {}
+
+    def wait_for(self, host):
+        delay = self.last_request.get(host, 0) + HOST_DELAY - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.last_request[host] = time.monotonic()
+
+    def check(self, entry):
+        """(changed, etag, last_modified, fingerprint); `changed` is None on a first visit."""
+        self.wait_for(urlsplit(entry["url"]).hostname)
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        if entry["kind"] == "pdf":
+            response = self.session.head(entry["url"], headers=headers, timeout=TIMEOUT, allow_redirects=True)
+        else:
+            response = self.session.get(entry["url"], headers=headers, timeout=TIMEOUT)
+        if response.status_code == 304:
+            return False, entry["etag"], entry["last_modified"], entry["fingerprint"]
+        response.raise_for_status()
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if entry["kind"] == "pdf":
+            validators = "|".join(filter(None, (etag, last_modified, response.headers.get("Content-Length"))))
+            fingerprint = hashlib.blake2b(validators.encode(), digest_size=16).hexdigest()
+        else:
+            fingerprint = page_fingerprint(response)
+        changed = None if entry["fingerprint"] is None else fingerprint != entry["fingerprint"]
+        return changed, etag, last_modified, fingerprint
+
+
+def harvest(data, limit=MAX_HARVEST):
+    """(kind, url) of the article and PDF links in a scraper's output."""
+    links, seen = [], set()
+
+    def walk(value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if key in ("url", "link", "pdf_url") and isinstance(item, str) and item.startswith("http"):
+                    if item not in seen:
+                        seen.add(item)
+                        is_pdf = key == "pdf_url" or urlsplit(item).path.lower().endswith(".pdf")
+                        links.append(("pdf" if is_pdf else "article", item))
+                else:
+                    walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+
+    walk(data)
+    return links[:limit]
+
+
+class Scheduler:
+    def __init__(self, frontier, checker, events=None):
+        self.frontier = frontier
+        self.checker = checker
+        self.events = events
+
+    def check(self, entry):
+        """Re-check one URL; True when its job needs to run."""
+        now = time.time()
+        try:
+            changed, etag, last_modified, fingerprint = self.checker.check(entry)
+        except requests.RequestException as e:
+            print(f"Error checking {entry['url']}: {e}")
+            self.frontier.failed(entry, now)
+            return False
+        self.frontier.checked(entry, changed, etag, last_modified, fingerprint, now)
+        # A seed seen for the first time means the job has never run from this frontier
+        return bool(changed) or (changed is None and entry["kind"] in SEED_KINDS)
+
+    def run_pass(self):
+        """Check the due URLs and run the jobs whose pages changed. Returns (checked, jobs run)."""
+        due = self.frontier.due(time.time())
+        triggered = []
+        for entry in due:
+            if self.check(entry) and entry["job"] not in triggered:
+                triggered.append(entry["job"])
+
+        checked = {entry["url"] for entry in due}
+        for name in triggered:
+            # The run fetches all of the job's seeds anyway; record them as seen now so
+            # they don't trigger the same job again on their own next check.
+            for entry in self.frontier.seeds(name):
+                if entry["url"] not in checked:
+                    self.check(entry)
+            self.run_job(name)
+        if triggered and self.events is not None and self.events.refresh():
+            self.events.save()
+        return len(due), triggered
+
+    def run_job(self, name):
+        job = JOBS[name]
+        print(f"Running {name}...")
+        started = time.time()
+        error = None
+        data = None
+        try:
+            data = run_scraper(job["scraper"], function=job.get("function"), key=job.get("key"))
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"{name} failed: {error}")
+        self.frontier.job_ran(name, started, time.time() - started, error)
+
+        if job.get("harvest") and data:
+            if isinstance(data, str):
+                data = json.loads(data)
+            self.frontier.replace_harvest(name, harvest(data), time.time())
+
+    def serve(self):
+        while True:
+            checked, ran = self.run_pass()
+            if checked:
+                print(f"Checked {checked} URLs, ran {len(ran)} jobs: {', '.join(ran) or '-'}")
+                continue
+            next_due = self.frontier.next_due()
+            wait = MAX_SLEEP if next_due is None else next_due - time.time()
+            time.sleep(min(MAX_SLEEP, max(1.0, wait)))
+
+
+def print_status(frontier):
+    print(f"{'job':<32}{'kind':<9}{'urls':>6}{'checks':>8}{'changes':>8}{'interval':>10}  next due")
+    now = time.time()
+    for row in frontier.status():
+        due_in = max(0, row["next_due"] - now)
+        print(f"{row['job']:<32}{row['kind']:<9}{row['urls']:>6}{row['checks']:>8}{row['changes']:>8}"
+              f"{row['interval'] / HOUR:>9.1f}h  in {due_in / HOUR:.1f}h"
+              + (f"  (last run failed: {row['last_error']})" if row["last_error"] else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run the scrapers when the pages they read change")
+    parser.add_argument("--db", default=FRONTIER_DB, help="frontier database")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    parser.add_argument("--status", action="store_true", help="show the frontier and exit")
+    args = parser.parse_args()
+
+    frontier = Frontier(args.db)
+    frontier.seed()
+    if args.status:
+        print_status(frontier)
+        return
+
+    scheduler = Scheduler(frontier, Checker(), EventStore())
+    if args.once:
+        checked, ran = scheduler.run_pass()
+        print(f"Checked {checked} URLs, ran {len(ran)} jobs: {', '.join(ran) or '-'}")
+    else:
+        scheduler.serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Compact columnar snapshot of the unified university dataset.
+
+Instead of re-parsing the pretty-printed database.json, consumers open one
+Parquet file per table (universities, faculties, departments, specialties,
+news, events) and read only the columns and universities they need.
+Repeated strings (university, faculty and department names, sources) are
+dictionary-encoded, which interns them on disk and in memory.
+
+    python snapshot.py                    # database.json + merged_records.jsonl -> snapshot/
+    python snapshot.py unified.json --output snapshot/
+
+    from snapshot import load_table
+    events = load_table("events", columns=["title", "date"], universities=["ENSIA"])
+"""
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from jsonstream import iter_array
+from merge import OUTPUT_FILE as MERGED_FILE, iter_merged, normalize
+
+SCRAPER_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_DIR = os.path.join(SCRAPER_DIR, "snapshot")
+ROW_GROUP_SIZE = 10_000
+
+STRING = pa.string()
+INTERNED = pa.dictionary(pa.int32(), pa.string())
+RECORD_SCHEMA = [
+    ("university", INTERNED), ("source", INTERNED), ("title", STRING), ("url", STRING),
+    ("date", pa.timestamp("us")), ("date_text", STRING), ("description", STRING),
+    ("content", STRING), ("image", STRING), ("pdf_url", STRING),
+]
+SCHEMAS = {
+    "universities": pa.schema([("university", INTERNED), ("url", STRING)]),
+    "faculties": pa.schema([("university", INTERNED), ("name", STRING), ("url", STRING)]),
+    "departments": pa.schema([("university", INTERNED), ("name", STRING), ("faculty", INTERNED)]),
+    "specialties": pa.schema([("university", INTERNED), ("name", STRING), ("department", INTERNED),
+                              ("faculty", INTERNED), ("url", STRING)]),
+    "news": pa.schema(RECORD_SCHEMA),
+    "events": pa.schema(RECORD_SCHEMA),
+}
+
+
+def _timestamp(iso):
+    if not iso:
+        return None
+    value = datetime.fromisoformat(iso)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _bound(value):
+    """A since/until argument (ISO string, date or datetime) as a value of the naive UTC date column."""
+    if isinstance(value, date):
+        value = value.isoformat()
+    return _timestamp(value)
+
+
+def collect(university_files, merged_file=None):
+    rows = {name: [] for name in SCHEMAS}
+    for path in university_files:
+        for univ in iter_array(path, "universities"):
+            name = univ.get("name")
+            rows["universities"].append({"university": name, "url": univ.get("url")})
+            for fac in univ.get("faculties", []):
+                fac = fac if isinstance(fac, dict) else {"name": fac}
+                rows["faculties"].append({"university": name, "name": fac.get("name"), "url": fac.get("url")})
+            department_faculty = {}
+            for dep in univ.get("departments", []):
+                department_faculty[dep.get("name")] = dep.get("faculty")
+                rows["departments"].append({"university": name, "name": dep.get("name"),
+                                            "faculty": dep.get("faculty")})
+            for spec in univ.get("specialties", []):
+                rows["specialties"].append({
+                    "university": name, "name": spec.get("name"), "department": spec.get("department"),
+                    "faculty": department_faculty.get(spec.get("department")), "url": spec.get("url"),
+                })
+            if not merged_file:
+                for kind, key in (("news", "news"), ("event", "events")):
+                    for item in univ.get(key, []):
+                        rows[key].append(normalize(item, kind, name, os.path.basename(path)))
+
+    # The merge stage already normalized and deduplicated news/events from every scraper
+    if merged_file:
+        for record in iter_merged(merged_file):
+            rows["news" if record["kind"] == "news" else "events"].append(record)
+
+    for key in ("news", "events"):
+        for record in rows[key]:
+            record["date"] = _timestamp(record.get("date"))
+    return rows
+
+
+def export(university_files, output=SNAPSHOT_DIR, merged_file=None):
+    os.makedirs(output, exist_ok=True)
+    rows = collect(university_files, merged_file)
+    manifest = {"created_at": datetime.now().isoformat(), "sources": list(university_files), "tables": {}}
+    for name, schema in SCHEMAS.items():
+        # Sorting by university keeps each university in few row groups, so
+        # row filters on it can skip the rest using Parquet statistics.
+        records = [{field: r.get(field) for field in schema.names} for r in rows[name]]
+        if name not in ("news", "events"):
+            # The same university can appear in several input files
+            records = list({tuple(r.values()): r for r in records}.values())
+        records.sort(key=lambda r: r["university"] or "")
+        table = pa.Table.from_pylist(records, schema=schema)
+        path = os.path.join(output, f"{name}.parquet")
+        pq.write_table(table, path, compression="zstd", row_group_size=ROW_GROUP_SIZE)
+        manifest["tables"][name] = {"rows": table.num_rows, "bytes": os.path.getsize(path)}
+    with open(os.path.join(output, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
+
+
+def load_table(name, columns=None, universities=None, since=None, until=None, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Read one snapshot table as a pyarrow Table.
+
+    Only the requested `columns` are decoded, and `universities` / the
+    `since`..`until` date range (news and events; ISO strings, dates or
+    datetimes, read as UTC) are pushed down as Parquet row filters. Use
+    `.to_pylist()` for plain dicts.
+    """
+    filters = []
+    if universities:
+        filters.append(("university", "in", list(universities)))
+    if since is not None:
+        filters.append(("date", ">=", _bound(since)))
+    if until is not None:
+        filters.append(("date", "<", _bound(until)))
+    interned = [f.name for f in SCHEMAS[name] if pa.types.is_dictionary(f.type)]
+    return pq.read_table(
+        os.path.join(snapshot_dir, f"{name}.parquet"), columns=columns,
+        filters=filters or None, memory_map=True, read_dictionary=interned,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the university dataset as a Parquet snapshot")
+    parser.add_argument("files", nargs="*", default=[os.path.join(SCRAPER_DIR, "database.json")],
+                        help="files in the `universities` layout (default: database.json)")
+    parser.add_argument("--output", default=SNAPSHOT_DIR)
+    parser.add_argument("--merged", default=MERGED_FILE,
+                        help="merged news/events from merge.py, used when present")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    merged = args.merged if args.merged and os.path.exists(args.merged) else None
+    manifest = export(args.files, args.output, merged)
+    snapshot_bytes = sum(t["bytes"] for t in manifest["tables"].values())
+    json_bytes = sum(os.path.getsize(p) for p in args.files) + (os.path.getsize(merged) if merged else 0)
+    print(f"Wrote snapshot to '{args.output}' in {time.perf_counter() - start:.2f}s: "
+          f"{snapshot_bytes / 1024:.1f} KiB vs {json_bytes / 1024:.1f} KiB of JSON")
+    for name, table in manifest["tables"].items():
+        print(f"  {name}: {table['rows']} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Registry of the site scrapers, so tooling can run any of them by name.
+
+Each entry names the module and function that does the crawl and, when the
+function returns its data instead of writing it, the JSON file (relative to
+the scraper directory) that the script's own __main__ would have produced.
+Scrapers that write files themselves are given the usual location (under
+their own directory) as an absolute path, so nothing depends on the
+process's working directory and scrapers can run side by side in threads.
+"""
+import importlib
+import json
+import os
+import sys
+
+SCRAPER_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRAPER_DIR not in sys.path:
+    sys.path.insert(0, SCRAPER_DIR)
+
+EL_OUED_URL = "https://www.univ-eloued.dz/en/"
+
+SCRAPERS = {
+    "el_oued_events": {"module": "el_oued.el_oued_events", "function": "scrape_eloued_events",
+                       "output": "el_oued/eloued_events.json"},
+    "el_oued_news": {"module": "el_oued.el_oued_news", "function": "scrape_eloued_news",
+                     "output": "el_oued/eloued_news.json"},
+    # Write these files themselves
+    "el_oued_programs": {"module": "el_oued.el_oued_programs", "function": "scrape_and_save_faculty_schedule",
+                         "args": [EL_OUED_URL, os.path.join(SCRAPER_DIR, "el_oued", "faculty_schedules")]},
+    "ensia_news": {"module": "ensia.ensia_news", "function": "scrape_ensia_news",
+                   "args": [os.path.join(SCRAPER_DIR, "ensia", "ensia_news.json")]},
+    "ensia_programs": {"module": "ensia.ensia_program", "function": "scrape_program_tables",
+                       "output": "ensia/ensia_programs.json"},
+    "ghardaia": {"module": "ghardaia.ghardaia_events", "function": "scrape_ghardaia",
+                 "output": "ghardaia/faculties.json", "indent": 2},
+    "annaba": {"module": "annaba.annaba_scraper", "function": "scrape_annaba",
+               "output": "annaba/annaba.json", "indent": 2},
+    "mit": {"module": "mit.mit_scraper", "function": "scrape_mit", "output": "mit/mit.json"},
+    "oxford": {"module": "oxford.oxford_scraper", "function": "scrape_oxford", "output": "oxford/oxford.json"},
+}
+
+
+def load_function(name):
+    spec = SCRAPERS[name]
+    return getattr(importlib.import_module(spec["module"]), spec["function"])
+
+
+def run_scraper(name, save=True, function=None, key=None):
+    """
+    Run scraper `name` and return its data, saving it to its output file.
+
+    `function` runs a single section function of the scraper module instead
+    (e.g. Oxford's scrape_events); its result replaces `key` of the output.
+    """
+    spec = SCRAPERS[name]
+    if function:
+        fn, args = getattr(importlib.import_module(spec["module"]), function), ()
+    else:
+        fn, args = load_function(name), spec.get("args", ())
+    data = fn(*args)
+    if save and spec.get("output") and isinstance(data, (list, dict)):
+        path = os.path.join(SCRAPER_DIR, spec["output"])
+        output = data
+        if key:
+            output = {}
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    output = json.load(f)
+            output[key] = data
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(output, f, ensure_ascii=False, indent=spec.get("indent", 4))
+    return data
@@ -0,0 +1,387 @@
+"""
+Crawl telemetry shared by all scrapers.
+
+`instrument()` patches the HTTP stack once per process (requests/urllib3,
+httpx, the socket and ssl calls under them, and BeautifulSoup), so every
+scraper is measured without touching its code. Each request becomes a record
+
+    scraper, host, url, method, status, bytes, retries, error,
+    dns, connect, tls, ttfb, download, total, parse      (seconds)
+
+where `ttfb` is the wait for the response headers once connected, `bytes`
+is what came over the wire and `parse` is the BeautifulSoup time spent on
+that response. `retries` counts urllib3's own retries; URLs a scraper had
+to fetch again show up as `refetched` in the summary.
+
+`summary()` aggregates the records per scraper and per host (throughput,
+error rate, timing percentiles, status codes) and lists the slowest pages.
+With `selectors=True` the time spent in find/find_all/select/select_one is
+also broken down per scraper and selector.
+
+    python crawl.py                  # run scrapers with telemetry on
+"""
+import json
+import math
+import socket
+import ssl
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+DEFAULT_SCRAPER = "adhoc"
+TIMINGS = ("dns", "connect", "tls", "ttfb", "download", "total", "parse")
+SLOWEST = 10
+TOP_SELECTORS = 10
+
+_local = threading.local()
+
+
+def _phases(reset=False):
+    """Connection phase times accumulated by the current thread since the request began."""
+    phases = getattr(_local, "phases", None)
+    if phases is None or reset:
+        phases = _local.phases = {"dns": 0.0, "connect": 0.0, "tls": 0.0, "retries": 0}
+    return phases
+
+
+class CrawlTelemetry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.records = []
+        self.runs = {}
+        self.selectors = defaultdict(lambda: [0, 0.0])  # (scraper, selector) -> [calls, seconds]
+        self.unattributed_parse = defaultdict(float)
+        self.current = DEFAULT_SCRAPER
+        self.started = time.time()
+        self.clock = time.perf_counter()
+
+    @contextmanager
+    def scraper(self, name):
+        """Attribute the requests made inside the block to scraper `name`."""
+        previous, self.current = self.current, name
+        run = self.runs[name] = {"start": time.perf_counter(), "end": None, "error": None}
+        try:
+            yield
+        except Exception as e:
+            run["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            run["end"] = time.perf_counter()
+            self.current = previous
+
+    def begin(self, url, method):
+        _phases(reset=True)
+        record = _local.record = {
+            "scraper": self.current, "host": urlsplit(url).hostname or "", "url": url, "method": method,
+            "status": None, "bytes": 0, "retries": 0, "error": None, "parse": 0.0,
+        }
+        return record
+
+    def finish(self, record, phases, start, headers_at, end, status=None, nbytes=0, error=None):
+        connection = phases["dns"] + phases["connect"] + phases["tls"]
+        record.update(
+            status=status, bytes=nbytes, retries=phases["retries"],
+            error=f"{type(error).__name__}: {error}" if error else None,
+            dns=phases["dns"], connect=phases["connect"], tls=phases["tls"],
+            ttfb=max(0.0, headers_at - start - connection), download=end - headers_at, total=end - start,
+        )
+        with self.lock:
+            self.records.append(record)
+
+    def add_parse(self, seconds):
+        record = getattr(_local, "record", None)
+        if record is not None:
+            record["parse"] += seconds
+        else:
+            with self.lock:
+                self.unattributed_parse[self.current] += seconds
+
+    def add_selector(self, key, seconds):
+        with self.lock:
+            entry = self.selectors[(self.current, key)]
+            entry[0] += 1
+            entry[1] += seconds
+
+    def summary(self):
+        with self.lock:
+            records = list(self.records)
+            runs = dict(self.runs)
+            selectors = dict(self.selectors)
+            unattributed = dict(self.unattributed_parse)
+
+        by_scraper, by_host = defaultdict(list), defaultdict(list)
+        for record in records:
+            by_scraper[record["scraper"]].append(record)
+            by_host[record["host"]].append(record)
+
+        scrapers = {}
+        for name in sorted(set(runs) | set(by_scraper)):
+            group = by_scraper.get(name, [])
+            scrapers[name] = entry = _aggregate(group)
+            entry["hosts"] = sorted({r["host"] for r in group})
+            entry["parse_seconds"] = round(entry["parse_seconds"] + unattributed.get(name, 0.0), 3)
+            run = runs.get(name)
+            if run:
+                duration = (run["end"] or time.perf_counter()) - run["start"]
+                entry["duration"] = round(duration, 3)
+                entry["pages_per_sec"] = round(len(group) / duration, 2) if duration else None
+                entry["failed"] = run["error"]
+            ranked = sorted(((key, calls, seconds) for (scraper, key), (calls, seconds) in selectors.items()
+                             if scraper == name), key=lambda item: item[2], reverse=True)
+            if ranked:
+                entry["selectors"] = [{"selector": key, "calls": calls, "seconds": round(seconds, 4)}
+                                      for key, calls, seconds in ranked[:TOP_SELECTORS]]
+
+        totals = _aggregate(records)
+        slowest = sorted(records, key=lambda r: r["total"] + r["parse"], reverse=True)[:SLOWEST]
+        return {
+            "started": datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+            "duration": round(time.perf_counter() - self.clock, 3),
+            "requests": totals["requests"],
+            "errors": totals["errors"],
+            "error_rate": totals["error_rate"],
+            "bytes": totals["bytes"],
+            "scrapers": scrapers,
+            "hosts": {host: _aggregate(group) for host, group in sorted(by_host.items())},
+            "slowest": [_rounded(r) for r in slowest],
+        }
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+
+    def write_records(self, path):
+        with self.lock:
+            records = list(self.records)
+        with open(path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(_rounded(record), ensure_ascii=False) + "\n")
+
+
+def _percentile(ordered, q):
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def _stats(values):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        "mean": round(sum(ordered) / len(ordered), 4),
+        "p50": round(_percentile(ordered, 0.5), 4),
+        "p95": round(_percentile(ordered, 0.95), 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+def _aggregate(records):
+    count = len(records)
+    errors = sum(1 for r in records if r["error"] or (r["status"] or 0) >= 400)
+    network = sum(r["total"] for r in records)
+    nbytes = sum(r["bytes"] for r in records)
+    return {
+        "requests": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "retries": sum(r["retries"] for r in records),
+        "refetched": count - len({r["url"] for r in records}),
+        "bytes": nbytes,
+        "network_seconds": round(network, 3),
+        "parse_seconds": round(sum(r["parse"] for r in records), 3),
+        "kb_per_sec": round(nbytes / 1024 / network, 1) if network else None,
+        "status": dict(Counter(str(r["status"] or "error") for r in records)),
+        "timing": {name: _stats([r[name] for r in records]) for name in TIMINGS},
+    }
+
+
+def _rounded(record):
+    return {k: round(v, 4) if isinstance(v, float) else v for k, v in record.items()}
+
+
+telemetry = CrawlTelemetry()
+
+
+# ---------------------------------------------------------------------------
+# Patches
+
+def _timed_phase(phase, fn, nested=()):
+    """Wrap `fn` so its duration, minus the `nested` phases inside it, counts towards `phase`."""
+    def wrapper(*args, **kwargs):
+        phases = _phases()
+        before = sum(phases[name] for name in nested)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            inner = sum(phases[name] for name in nested) - before
+            phases[phase] += time.perf_counter() - start - inner
+    wrapper.__wrapped__ = fn
+    return wrapper
+
+
+def _patch_socket():
+    socket.getaddrinfo = _timed_phase("dns", socket.getaddrinfo)
+    # httpcore connects through socket.create_connection, urllib3 through its own copy
+    socket.create_connection = _timed_phase("connect", socket.create_connection, nested=("dns",))
+    ssl.SSLContext.wrap_socket = _timed_phase("tls", ssl.SSLContext.wrap_socket)
+
+
+def _patch_requests():
+    import requests.adapters
+    import urllib3.util.connection
+    import urllib3.util.retry
+
+    urllib3.util.connection.create_connection = _timed_phase(
+        "connect", urllib3.util.connection.create_connection, nested=("dns",))
+
+    increment = urllib3.util.retry.Retry.increment
+
+    def counting_increment(retry, *args, **kwargs):
+        new_retry = increment(retry, *args, **kwargs)  # raises when out of retries
+        _phases()["retries"] += 1
+        return new_retry
+
+    urllib3.util.retry.Retry.increment = counting_increment
+
+    send = requests.adapters.HTTPAdapter.send
+
+    # One call per hop: redirects go through Session.send, which calls this again
+    def timed_send(adapter, request, stream=False, **kwargs):
+        record = telemetry.begin(request.url, request.method)
+        start = time.perf_counter()
+        try:
+            response = send(adapter, request, stream=stream, **kwargs)
+        except Exception as e:
+            now = time.perf_counter()
+            telemetry.finish(record, _phases(), start, now, now, error=e)
+            raise
+        headers_at = time.perf_counter()
+        phases = dict(_phases())
+        if stream:
+            nbytes = int(response.headers.get("Content-Length") or 0)
+        else:
+            try:
+                content = response.content
+            except Exception as e:
+                telemetry.finish(record, phases, start, headers_at, time.perf_counter(),
+                                 response.status_code, error=e)
+                raise
+            tell = getattr(response.raw, "tell", None)
+            nbytes = tell() if callable(tell) else len(content)
+        telemetry.finish(record, phases, start, headers_at, time.perf_counter(), response.status_code, nbytes)
+        return response
+
+    requests.adapters.HTTPAdapter.send = timed_send
+
+
+def _patch_httpx():
+    import httpx
+
+    class TimedStream(httpx.SyncByteStream):
+        """Response body that records the request once it has been read and closed."""
+
+        def __init__(self, stream, record, phases, start, headers_at, status):
+            self.stream = stream
+            self.args = (record, phases, start, headers_at)
+            self.status = status
+            self.nbytes = 0
+            self.done = False
+
+        def __iter__(self):
+            for chunk in self.stream:
+                self.nbytes += len(chunk)
+                yield chunk
+
+        def close(self):
+            try:
+                if hasattr(self.stream, "close"):
+                    self.stream.close()
+            finally:
+                if not self.done:
+                    self.done = True
+                    telemetry.finish(*self.args, time.perf_counter(), self.status, self.nbytes)
+
+    handle_request = httpx.HTTPTransport.handle_request
+
+    def timed_handle_request(transport, request):
+        record = telemetry.begin(str(request.url), request.method)
+        start = time.perf_counter()
+        try:
+            response = handle_request(transport, request)
+        except Exception as e:
+            now = time.perf_counter()
+            telemetry.finish(record, _phases(), start, now, now, error=e)
+            raise
+        response.stream = TimedStream(response.stream, record, dict(_phases()), start,
+                                      time.perf_counter(), response.status_code)
+        return response
+
+    httpx.HTTPTransport.handle_request = timed_handle_request
+
+
+def _patch_bs4():
+    from bs4 import BeautifulSoup
+
+    init = BeautifulSoup.__init__
+
+    def timed_init(soup, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            init(soup, *args, **kwargs)
+        finally:
+            telemetry.add_parse(time.perf_counter() - start)
+
+    BeautifulSoup.__init__ = timed_init
+
+
+def _patch_bs4_selectors():
+    from bs4.element import Tag
+
+    def timed_lookup(method, fn):
+        def lookup(tag, *args, **kwargs):
+            # find() calls find_all(); only time the outermost lookup
+            if getattr(_local, "in_lookup", False):
+                return fn(tag, *args, **kwargs)
+            _local.in_lookup = True
+            start = time.perf_counter()
+            try:
+                return fn(tag, *args, **kwargs)
+            finally:
+                _local.in_lookup = False
+                telemetry.add_selector(_selector_key(method, args, kwargs), time.perf_counter() - start)
+        return lookup
+
+    for method in ("find", "find_all", "select", "select_one"):
+        setattr(Tag, method, timed_lookup(method, getattr(Tag, method)))
+
+
+def _selector_key(method, args, kwargs):
+    parts = [repr(a) for a in args] + [f"{k}={v!r}" for k, v in kwargs.items()]
+    return f"{method}({', '.join(parts)})"[:120]
+
+
+_installed = set()
+
+
+def instrument(selectors=False):
+    """
+    Install the patches (once per process) and return the shared telemetry.
+    Selector timing is added by the first call with `selectors=True`, even
+    after an earlier call without it, and stays on from then.
+    """
+    patches = [("socket", _patch_socket), ("requests", _patch_requests), ("httpx", _patch_httpx),
+               ("bs4", _patch_bs4)]
+    if selectors:
+        patches.append(("bs4-selectors", _patch_bs4_selectors))
+    for name, patch in patches:
+        if name in _installed:
+            continue
+        try:
+            patch()
+        except ImportError:
+            continue  # library not installed, so no scraper uses it
+        _installed.add(name)
+    return telemetry
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Train the review sentiment classifier and export it for deployment/app.py.
+
+Script version of ReviewClassification.ipynb: same JSON sources, split,
+checkpoint and hyperparameters, with these changes:
+
+  * the tokenized dataset is cached on disk as Arrow (keyed by the data
+    files, tokenizer and settings), so re-runs skip tokenization;
+  * batches are padded per batch (DataCollatorWithPadding) and grouped by
+    length, instead of padding to the longest review in the set;
+  * evaluation runs once per epoch instead of every 50 steps;
+  * it runs on CPU when there is no GPU;
+  * the model is written in the layout app.py loads
+    (finalReviewClassifier.safetensors + finalReviewClassifierConfig.json),
+    next to a training_report.json with timings and throughput, to a
+    staging directory and published as a new classifier version of the
+    model registry (deployment/registry.py), then promoted, so the running
+    app loads and swaps it in. Nothing already served is modified.
+
+    python train_classifier.py courses_events_review.json services_review.json
+    python train_classifier.py data/*.json --epochs 3 --threads 8
+    python train_classifier.py --no-promote     # publish only, e.g. to shadow it first
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import torch
+from datasets import Dataset, concatenate_datasets, load_from_disk
+from safetensors.torch import save_file
+from transformers import (AutoModelForSequenceClassification, AutoTokenizer, DataCollatorWithPadding, Trainer,
+                          TrainingArguments)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "deployment"))
+from registry import ModelRegistry  # noqa: E402
+
+model_checkpoint = "distilbert-base-uncased"
+DATA_FILES = ["courses_events_review.json", "services_review.json"]
+REGISTRY_DIR = os.path.join("deployment", "models", "registry")
+CACHE_DIR = os.path.join(".cache", "tokenized")
+MAX_LENGTH = 512
+
+
+def cache_key(files, max_length, test_size, seed):
+    """Digest of everything the tokenized splits depend on."""
+    digest = hashlib.sha256()
+    for path in files:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    digest.update(json.dumps([model_checkpoint, max_length, test_size, seed]).encode())
+    return digest.hexdigest()[:16]
+
+
+def load_tokenized(files, tokenizer, max_length=MAX_LENGTH, test_size=0.2, seed=42, cache_dir=CACHE_DIR):
+    """(train/test DatasetDict, seconds spent tokenizing or None on a cache hit)."""
+    path = os.path.join(cache_dir, cache_key(files, max_length, test_size, seed))
+    if os.path.exists(path):
+        return load_from_disk(path), None
+
+    start = time.perf_counter()
+    dataset = concatenate_datasets([Dataset.from_json(f) for f in files])
+    dataset = dataset.shuffle(seed=seed).train_test_split(test_size, seed=seed)
+
+    def preprocess_function(examples):
+        encoded = tokenizer(examples["text"], truncation=True, max_length=max_length)
+        encoded["length"] = [len(ids) for ids in encoded["input_ids"]]
+        return encoded
+
+    # Trainer drops the columns the model doesn't take (text, length) when batching
+    dataset.map(preprocess_function, batched=True).save_to_disk(path)
+    return load_from_disk(path), time.perf_counter() - start
+
+
+def compute_metrics(eval_pred):
+    predictions, labels = eval_pred
+    return {"accuracy": float(np.mean(np.argmax(predictions, axis=1) == labels))}
+
+
+def export(model, report, registry, promote=True):
+    """Publish the weights and config app.py loads as a new classifier version; returns the version."""
+    os.makedirs(registry.root, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".train-classifier-", dir=registry.root)
+    try:
+        state = {name: tensor.detach().cpu().contiguous() for name, tensor in model.state_dict().items()}
+        save_file(state, os.path.join(staging, "finalReviewClassifier.safetensors"))
+        model.config.to_json_file(os.path.join(staging, "finalReviewClassifierConfig.json"))
+        with open(os.path.join(staging, "training_report.json"), "w") as f:
+            json.dump(report, f, indent=2)
+        version = registry.publish("classifier", staging)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    if promote:
+        registry.promote("classifier", version)
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fine-tune the review classifier and export it for deployment")
+    parser.add_argument("files", nargs="*", default=DATA_FILES, help="JSON Lines files with text and label")
+    parser.add_argument("--registry", default=REGISTRY_DIR, help="model registry to publish the new version to")
+    parser.add_argument("--no-promote", action="store_true", help="publish without serving it")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--epochs", type=float, default=2)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--learning-rate", type=float, default=2e-5)
+    parser.add_argument("--max-length", type=int, default=MAX_LENGTH)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--threads", type=int, help="torch CPU threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    started = time.perf_counter()
+
+    tokenizer = AutoTokenizer.from_pretrained(model_checkpoint, use_fast=True)
+    encoded_dataset, tokenize_seconds = load_tokenized(args.files, tokenizer, args.max_length, args.test_size,
+                                                       args.seed, args.cache_dir)
+    print(f"✅ Tokenized dataset {'built' if tokenize_seconds else 'loaded from cache'}: "
+          f"{len(encoded_dataset['train'])} train / {len(encoded_dataset['test'])} test reviews")
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_checkpoint, num_labels=2)
+    training_args = TrainingArguments(
+        os.path.join(args.cache_dir, "trainer"),
+        eval_strategy="epoch",
+        save_strategy="no",
+        learning_rate=args.learning_rate,
+        per_device_train_batch_size=args.batch_size,
+        per_device_eval_batch_size=args.batch_size,
+        warmup_ratio=0.05,
+        logging_steps=50,
+        num_train_epochs=args.epochs,
+        weight_decay=0.01,
+        group_by_length=True,
+        length_column_name="length",
+        use_cpu=not torch.cuda.is_available(),
+        seed=args.seed,
+        report_to="none",
+    )
+    trainer = Trainer(
+        model,
+        training_args,
+        train_dataset=encoded_dataset["train"],
+        eval_dataset=encoded_dataset["test"],
+        data_collator=DataCollatorWithPadding(tokenizer),
+        compute_metrics=compute_metrics,
+    )
+
+    train_metrics = trainer.train().metrics
+    eval_metrics = trainer.evaluate()
+
+    train_tokens = sum(encoded_dataset["train"]["length"]) * args.epochs
+    report = {
+        "data_files": args.files,
+        "device": "cuda" if torch.cuda.is_available() else f"cpu ({torch.get_num_threads()} threads)",
+        "train_examples": len(encoded_dataset["train"]),
+        "test_examples": len(encoded_dataset["test"]),
+        "epochs": args.epochs,
+        "tokenize_seconds": round(tokenize_seconds, 2) if tokenize_seconds else "cached",
+        "train_seconds": round(train_metrics["train_runtime"], 2),
+        "train_samples_per_second": train_metrics["train_samples_per_second"],
+        "train_tokens_per_second": round(train_tokens / train_metrics["train_runtime"], 1),
+        "eval_seconds": round(eval_metrics["eval_runtime"], 2),
+        "eval_samples_per_second": eval_metrics["eval_samples_per_second"],
+        "eval_accuracy": eval_metrics["eval_accuracy"],
+        "train_loss": train_metrics["train_loss"],
+        "total_seconds": round(time.perf_counter() - started, 2),
+    }
+    version = export(trainer.model, report, ModelRegistry(args.registry), promote=not args.no_promote)
+    print(json.dumps(report, indent=2))
+    if args.no_promote:
+        print(f"✅ Classifier published as classifier {version}; serve it with "
+              f"cd deployment && python registry.py promote classifier {version}")
+    else:
+        print(f"✅ Classifier published and promoted as classifier {version}")
+
+
+if __name__ == "__main__":
+    main()
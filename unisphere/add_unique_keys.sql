@@ -0,0 +1,14 @@
+-- Unique natural keys for a unisphere database created before they were added
+-- to database.sql. scraper/load_database.py upserts on these keys, so run this
+-- once before loading into such a database (re-running database.sql instead
+-- drops all data).
+--
+-- The statements fail if duplicates already exist; list them with e.g.
+--   SELECT university_id, name, COUNT(*) FROM faculty GROUP BY university_id, name HAVING COUNT(*) > 1;
+-- and merge or delete them first.
+
+USE unisphere;
+
+ALTER TABLE university ADD UNIQUE KEY unique_university_name (name);
+ALTER TABLE faculty ADD UNIQUE KEY unique_faculty_name (university_id, name);
+ALTER TABLE specialty ADD UNIQUE KEY unique_specialty_name (faculty_id, name);
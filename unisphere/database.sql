@@ -16,7 +16,8 @@ CREATE TABLE university (
   logo_image VARCHAR(255),
   website VARCHAR(255),
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  UNIQUE KEY unique_university_name (name)
 );
 
 -- Faculty table - Academic faculties/departments within universities
@@ -29,7 +30,8 @@ CREATE TABLE faculty (
   website VARCHAR(255),
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-  FOREIGN KEY (university_id) REFERENCES university(id) ON DELETE CASCADE ON UPDATE CASCADE
+  FOREIGN KEY (university_id) REFERENCES university(id) ON DELETE CASCADE ON UPDATE CASCADE,
+  UNIQUE KEY unique_faculty_name (university_id, name)
 );
 
 -- Specialty table - Academic specialties/programs within faculties
@@ -44,7 +46,8 @@ CREATE TABLE specialty (
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
   FOREIGN KEY (faculty_id) REFERENCES faculty(id) ON DELETE CASCADE ON UPDATE CASCADE,
-  FOREIGN KEY (university_id) REFERENCES university(id) ON DELETE CASCADE ON UPDATE CASCADE
+  FOREIGN KEY (university_id) REFERENCES university(id) ON DELETE CASCADE ON UPDATE CASCADE,
+  UNIQUE KEY unique_specialty_name (faculty_id, name)
 );
 
 -- User table - All users with role-based access control